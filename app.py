@@ -1,202 +1,312 @@
 import streamlit as st
 import pandas as pd
-import joblib
 import numpy as np
+import os
 import plotly.graph_objects as go
-from datetime import datetime
+
+from backtest import load_results as load_backtest_results, matches as backtest_matches
+from attribution import contribution_direction
+from batch_predict import INVALID_COLUMN
+from dataset_stats import artifact_version
+from forest_arrays import bundle_params
+from profiling import Profiler
+from ranking import PAGE_SIZES, SORT_OPTIONS, get_page, n_pages, risk_counts
+from recommendations import (
+    DIRECTION_STATUS, MISSING_STATUS, format_feature_value, format_number, get_variable_recommendation,
+    missing_recommendation, status_markdown,
+)
+from risk import HIGH_RISK_THRESHOLD, INCOMPLETE_DISPLAY, MEDIUM_RISK_THRESHOLD, RISK_DISPLAY, classify_risk
+from service import AssetSlot, ServiceClient, build_assets, resolve_artifact_paths
+from uncertainty import INTERVAL, confidence_label
+from whatif import default_ranges, sensitivity_sweep
 
 # ============================================================================
 # PAGE CONFIG & STYLING
 # ============================================================================
 st.set_page_config(page_title="Mitigasi DBD Terpadu", page_icon="🏥", layout="wide")
 
-st.markdown("""
-<style>
-    .stApp { 
-        background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%);
-        color: #f1f5f9; 
-    }
-    .main-header {
-        background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
-        padding: 2.5rem; border-radius: 20px; margin-bottom: 2.5rem;
-        border-left: 8px solid #10b981; box-shadow: 0 8px 25px rgba(0,0,0,0.4);
-        position: relative;
-        overflow: hidden;
-    }
-    .main-header::before {
-        content: "🏥";
-        position: absolute;
-        right: 30px;
-        top: 50%;
-        transform: translateY(-50%);
-        font-size: 5rem;
-        opacity: 0.1;
-    }
-    .metric-card {
-        background: rgba(30, 41, 59, 0.8);
-        padding: 1.8rem; 
-        border-radius: 16px;
-        border: 1px solid #475569;
-        margin-bottom: 1.5rem;
-        backdrop-filter: blur(10px);
-        transition: transform 0.3s ease;
-    }
-    .metric-card:hover {
-        transform: translateY(-5px);
-        border-color: #10b981;
-    }
-    .recommendation-card {
-        padding: 1.8rem; 
-        border-radius: 16px; 
-        margin-top: 1.5rem;
-        border-left: 12px solid;
-        background: rgba(30, 41, 59, 0.9);
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }
-    .high-risk { 
-        background: linear-gradient(135deg, #450a0a 0%, #7f1d1d 100%);
-        border-left-color: #ef4444; 
-        color: #fecaca; 
-    }
-    .med-risk { 
-        background: linear-gradient(135deg, #422006 0%, #92400e 100%);
-        border-left-color: #f59e0b; 
-        color: #fef3c7; 
-    }
-    .low-risk { 
-        background: linear-gradient(135deg, #064e3b 0%, #065f46 100%);
-        border-left-color: #10b981; 
-        color: #d1fae5; 
-    }
-    .var-card {
-        background: rgba(30, 41, 59, 0.8);
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        border: 1px solid #475569;
-    }
-    .feature-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-        gap: 1.2rem;
-        margin-top: 1.5rem;
-    }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2rem;
-        background-color: transparent;
-    }
-    .stTabs [data-baseweb="tab"] {
-        border-radius: 8px 8px 0 0;
-        padding: 1rem 2rem;
-        font-weight: bold;
-        background-color: rgba(30, 41, 59, 0.7);
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #10b981 !important;
-        color: white !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def get_profiler():
+    # Satu profiler per proses server agar persentil terkumpul lintas rerun (aktif bila DBD_PROFILE=1)
+    return Profiler()
+
+profiler = get_profiler()
+profiler.start_run()
+
+with profiler.section('style'):
+    st.markdown("""
+    <style>
+        .stApp { 
+            background: linear-gradient(135deg, #0f172a 0%, #1e293b 100%);
+            color: #f1f5f9; 
+        }
+        .main-header {
+            background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
+            padding: 2.5rem; border-radius: 20px; margin-bottom: 2.5rem;
+            border-left: 8px solid #10b981; box-shadow: 0 8px 25px rgba(0,0,0,0.4);
+            position: relative;
+            overflow: hidden;
+        }
+        .main-header::before {
+            content: "🏥";
+            position: absolute;
+            right: 30px;
+            top: 50%;
+            transform: translateY(-50%);
+            font-size: 5rem;
+            opacity: 0.1;
+        }
+        .metric-card {
+            background: rgba(30, 41, 59, 0.8);
+            padding: 1.8rem; 
+            border-radius: 16px;
+            border: 1px solid #475569;
+            margin-bottom: 1.5rem;
+            backdrop-filter: blur(10px);
+            transition: transform 0.3s ease;
+        }
+        .metric-card:hover {
+            transform: translateY(-5px);
+            border-color: #10b981;
+        }
+        .recommendation-card {
+            padding: 1.8rem; 
+            border-radius: 16px; 
+            margin-top: 1.5rem;
+            border-left: 12px solid;
+            background: rgba(30, 41, 59, 0.9);
+            box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+        }
+        .high-risk { 
+            background: linear-gradient(135deg, #450a0a 0%, #7f1d1d 100%);
+            border-left-color: #ef4444; 
+            color: #fecaca; 
+        }
+        .med-risk { 
+            background: linear-gradient(135deg, #422006 0%, #92400e 100%);
+            border-left-color: #f59e0b; 
+            color: #fef3c7; 
+        }
+        .low-risk { 
+            background: linear-gradient(135deg, #064e3b 0%, #065f46 100%);
+            border-left-color: #10b981; 
+            color: #d1fae5; 
+        }
+        .no-data {
+            background: linear-gradient(135deg, #1e293b 0%, #334155 100%);
+            border-left-color: #94a3b8;
+            color: #e2e8f0;
+        }
+        .var-card {
+            background: rgba(30, 41, 59, 0.8);
+            padding: 1.5rem;
+            border-radius: 12px;
+            margin: 1rem 0;
+            border: 1px solid #475569;
+        }
+        .feature-grid {
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
+            gap: 1.2rem;
+            margin-top: 1.5rem;
+        }
+        .stTabs [data-baseweb="tab-list"] {
+            gap: 2rem;
+            background-color: transparent;
+        }
+        .stTabs [data-baseweb="tab"] {
+            border-radius: 8px 8px 0 0;
+            padding: 1rem 2rem;
+            font-weight: bold;
+            background-color: rgba(30, 41, 59, 0.7);
+        }
+        .stTabs [aria-selected="true"] {
+            background-color: #10b981 !important;
+            color: white !important;
+        }
+    </style>
+    """, unsafe_allow_html=True)
 
 # ============================================================================
 # LOAD ASSETS (Model Robust 88%)
 # ============================================================================
-@st.cache_resource
-def load_assets():
-    bundle = joblib.load('model_robust_bundle.pkl')
-    df = pd.read_csv('df_final_dashboard.csv')
-    return bundle, df
+# Dashboard menjadi klien tipis bila layanan prediksi dipakai (python service.py): model tidak dimuat di sini
+SERVICE_URL = os.environ.get('DBD_SERVICE_URL')
 
-bundle, df_master = load_assets()
+@st.cache_resource
+def get_asset_slot(source):
+    # Satu slot aset per proses Streamlit, dibagi semua sesi: versi baru dimuat di latar lalu ditukar
+    return AssetSlot()
+
+with profiler.section('load_assets'):
+    if SERVICE_URL:
+        # Snapshot aset dari layanan prediksi, sekali per versi artefak yang sedang dilayani
+        client = ServiceClient(SERVICE_URL)
+        latest_version = client.version()
+        load = client.assets
+    else:
+        # Versi aktif registry (python registry.py promote ...) atau artefak default
+        model_path, data_path = resolve_artifact_paths()
+        latest_version = (artifact_version(model_path), artifact_version(data_path))
+        load = lambda: build_assets(model_path, data_path)
+    # Versi yang benar-benar dipakai (versi lama selama versi baru dimuat); juga kunci memo grafik di bawah
+    asset_version, assets = get_asset_slot(SERVICE_URL or 'lokal').get(latest_version, load)
+model_info = assets['model_info']
+bundle, df_master, df_prediksi = assets['bundle'], assets['df'], assets['df_prediksi']
+regions, stats, ranking, explanations = assets['regions'], assets['stats'], assets['ranking'], assets['explanations']
 model = bundle['model']
+n_trees = bundle['n_estimators'] if model is None else model.n_estimators
 features = bundle['features']
 metrics = bundle['metrics']
 
+@st.cache_data(max_entries=1)
+def load_backtest(version):
+    # version hanya kunci cache: hasil backtest baru -> dibaca ulang
+    return load_backtest_results()
+
+# Hasil backtest rolling-origin (python backtest.py) bila tersedia
+with profiler.section('load_backtest'):
+    backtest = load_backtest(artifact_version('backtest')) if os.path.isdir('backtest') else None
+
+# Akurasi yang ditampilkan: R² backtest (latih <= t, prediksi t+1) bila dijalankan untuk model & data (beserta
+# fitur & hyperparameter) yang sedang dipakai, jika tidak R² test split acak
+backtest_current = backtest is not None and backtest_matches(backtest[1], *asset_version, features, bundle_params(bundle))
+if backtest_current:
+    accuracy_label, accuracy = "Akurasi (R² backtest)", backtest[1]['r2']
+else:
+    accuracy_label, accuracy = "Akurasi (R²)", metrics['test_r2']
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
-def format_number(value, is_population=False):
-    """Format angka dengan penanganan untuk nilai None/NaN"""
-    if pd.isna(value) or value is None:
-        return "N/A"
+def format_updated(value, fmt):
+    """Waktu pembaruan model (ISO) dalam format tampilan; teks apa adanya bila bukan tanggal"""
     try:
-        # Coba format sebagai float
-        float_val = float(value)
-
-        # Jika ini data penduduk dalam ribuan, kalikan dengan 1000
-        if is_population:
-            float_val = float_val * 1000
-
-        if float_val >= 1000000:
-            return f"{float_val/1000000:,.2f} juta"
-        elif float_val >= 1000:
-            return f"{float_val:,.0f}"
-        elif float_val.is_integer():
-            return f"{int(float_val):,}"
-        else:
-            return f"{float_val:,.2f}"
-    except:
+        return pd.Timestamp(value).strftime(fmt)
+    except (ValueError, TypeError):
         return str(value)
 
-def get_variable_recommendation(feature_name, current_value, feature_mean):
-    """Menghasilkan rekomendasi spesifik untuk setiap variabel"""
-    recommendations = {
-        'IR_tahun_lalu': {
-            'high': "📈 **Kasus tahun lalu tinggi** → Fokuskan surveilans intensif di wilayah dengan riwayat kasus tinggi",
-            'med': "📊 **Kasus tahun lalu sedang** → Lanjutkan pemantauan rutin dan persiapan respons cepat",
-            'low': "📉 **Kasus tahun lalu rendah** → Pertahankan pencegahan dan waspada peningkatan mendadak"
-        },
-        'kepadatan_penduduk_km2': {
-            'high': "🏙️ **Kepadatan tinggi** → Optimalkan PSN massal, distribusi kelambu, dan pengaturan jarak hunian",
-            'med': "🏘️ **Kepadatan sedang** → Tingkatkan edukasi dan partisipasi masyarakat dalam 3M Plus",
-            'low': "🌳 **Kepadatan rendah** → Fokus pada daerah perkantoran dan fasilitas umum"
-        },
-        'curah_hujan_mm': {
-            'high': "🌧️ **Curah hujan tinggi** → Perketat pemantauan genangan air, perbaiki drainase, sosialisasi PSN",
-            'med': "⛈️ **Curah hujan sedang** → Waspada penampungan air hujan di rumah tangga",
-            'low': "☀️ **Curah hujan rendah** → Perhatikan penampungan air buatan dan penyimpanan air bersih"
-        },
-        'akses_sanitasi_layak_persen': {
-            'high': "✅ **Sanitasi layak tinggi** → Pertahankan dan tingkatkan cakupan",
-            'med': "⚠️ **Sanitasi layak sedang** → Intensifkan sosialisasi sanitasi sehat",
-            'low': "🚨 **Sanitasi layak rendah** → Prioritas intervensi infrastruktur sanitasi"
-        }
-    }
-
-    # Default mapping untuk variabel lain
-    if feature_name not in recommendations:
-        feature_display = feature_name.replace('_', ' ').title()
-        recommendations[feature_name] = {
-            'high': f"📊 **{feature_display} tinggi** → Perlu evaluasi dampaknya terhadap risiko DBD",
-            'med': f"📈 **{feature_display} sedang** → Monitor perkembangan secara berkala",
-            'low': f"📉 **{feature_display} rendah** → Kondisi optimal untuk pencegahan"
-        }
+@st.cache_data(max_entries=256)
+def run_whatif(_model, model_version, region, scenario, ranges):
+    """Prediksi skenario what-if dan kurva sensitivitas, di-memo per (versi model, wilayah, grid)"""
+    ranges = {f: (lo, hi) for f, lo, hi in ranges}
+    if SERVICE_URL:
+        return ServiceClient(SERVICE_URL).whatif(dict(scenario), ranges)
+    return sensitivity_sweep(_model, dict(scenario), list(ranges), ranges)
+
+# Grafik di-memo per versi artefak (+ wilayah/parameter tampilan), dibuat hanya saat tabnya dibuka.
+# Objek figure yang sama dipakai ulang lintas rerun & sesi, sehingga tidak boleh diubah setelah dibuat.
+@st.cache_resource(max_entries=256)
+def importance_figure(asset_version, region, _imp_df):
+    """Bar chart kontribusi variabel untuk satu wilayah"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=_imp_df['Kontribusi'],
+        y=_imp_df['Variabel'],
+        orientation='h',
+        marker=dict(color=['#ef4444' if c > 0 else '#10b981' for c in _imp_df['Kontribusi']]),
+        text=[f"{c:+.1f}" for c in _imp_df['Kontribusi']],
+        textposition='inside',
+        name='Kontribusi'
+    ))
 
-    # Tentukan kategori berdasarkan nilai (hanya jika keduanya numerik)
-    try:
-        current_num = float(current_value)
-        mean_num = float(feature_mean)
+    fig.update_layout(
+        title=f"📈 Kontribusi Variabel terhadap Prediksi {region}",
+        height=500,
+        font=dict(color='white'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title="Kontribusi terhadap Prediksi IR (per 100.000 penduduk)",
+        yaxis_title="Variabel",
+        showlegend=False
+    )
+    return fig
 
-        if current_num > mean_num * 1.3:
-            category = 'high'
-        elif current_num < mean_num * 0.7:
-            category = 'low'
-        else:
-            category = 'med'
-    except:
-        category = 'med'
+@st.cache_resource(max_entries=4)
+def performance_figure(asset_version, train_r2, test_r2):
+    """Perbandingan R² training vs test"""
+    fig = go.Figure()
 
-    return recommendations[feature_name][category]
+    # Add bars for train and test performance
+    fig.add_trace(go.Bar(
+        x=['Training Set', 'Test Set'],
+        y=[train_r2*100, test_r2*100],
+        marker_color=['#60a5fa', '#10b981'],
+        text=[f"{train_r2*100:.1f}%", f"{test_r2*100:.1f}%"],
+        textposition='auto',
+        name='R² Score'
+    ))
+
+    fig.update_layout(
+        title="Perbandingan Performance Model",
+        height=400,
+        font=dict(color='white'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        yaxis_title="R² Score (%)",
+        showlegend=False
+    )
+    return fig
+
+@st.cache_resource(max_entries=512)
+def sensitivity_figure(model_version, region, scenario, feature, _curve):
+    """Kurva sensitivitas satu variabel (garis vertikal = nilai skenario)"""
+    marker = dict(scenario)[feature]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=_curve['nilai'],
+        y=_curve['pred_ir'],
+        mode='lines',
+        line=dict(color='#10b981', width=3),
+        name='Prediksi IR'
+    ))
+    fig.add_vline(x=marker, line_dash='dash', line_color='#f59e0b')
+    fig.add_hline(y=50, line_dash='dot', line_color='#ef4444')
+    fig.add_hline(y=20, line_dash='dot', line_color='#f59e0b')
+    fig.update_layout(
+        title=feature.replace('_', ' ').title(),
+        height=320,
+        font=dict(color='white'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title="Nilai Variabel",
+        yaxis_title="Prediksi IR",
+        showlegend=False
+    )
+    return fig
+
+@st.cache_resource(max_entries=64)
+def heatmap_figure(asset_version, page_regions, _ir_matrix):
+    """Heatmap IR aktual per tahun untuk wilayah di satu halaman peringkat"""
+    heat = _ir_matrix.loc[list(page_regions)]
+    fig = go.Figure(go.Heatmap(
+        z=heat.to_numpy(),
+        x=[str(year) for year in heat.columns],
+        y=heat.index.tolist(),
+        colorscale='YlOrRd',
+        colorbar=dict(title="IR"),
+        hovertemplate="%{y} • %{x}<br>IR: %{z:.1f}<extra></extra>"
+    ))
+    fig.update_layout(
+        height=max(400, 22 * len(heat)),
+        font=dict(color='white'),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis_title="Tahun",
+        yaxis=dict(autorange='reversed'),
+        margin=dict(l=10, r=10, t=30, b=10)
+    )
+    return fig
 
 # ============================================================================
 # SIDEBAR
 # ============================================================================
-with st.sidebar:
+with st.sidebar, profiler.section('sidebar'):
     st.markdown("### 🎯 KONTROL PANEL")
 
     selected_kota = st.selectbox(
         "Pilih Kabupaten/Kota:", 
-        sorted(df_master['Kabupaten/Kota'].unique()),
+        regions,
         help="Pilih wilayah untuk analisis dan prediksi"
     )
 
@@ -207,11 +317,13 @@ with st.sidebar:
 
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Akurasi (R²)", f"{metrics['test_r2']*100:.1f}%")
+        st.metric(accuracy_label, f"{accuracy*100:.1f}%")
     with col2:
         st.metric("Stabilitas", f"{(1-metrics['gap'])*100:.1f}%")
 
-    st.caption(f"🔄 Update terakhir: {datetime.now().strftime('%d %b %Y %H:%M')}")
+    st.caption(f"🔄 Model {model_info['version']} • diperbarui {format_updated(model_info['updated'], '%d %b %Y %H:%M')}")
+    if asset_version != latest_version:
+        st.caption("⏳ Versi model baru sedang dimuat di latar belakang")
 
     st.markdown("---")
     st.markdown("### 📈 LEGENDA STATUS")
@@ -225,392 +337,488 @@ with st.sidebar:
 # MAIN CONTENT
 # ============================================================================
 # Header utama
-st.markdown(f"""
-<div class="main-header">
-    <h1 style="margin-bottom: 0.5rem; font-size: 2.8rem;">🏥 Dashboard Mitigasi DBD</h1>
-    <h2 style="margin-top: 0; color: #10b981; font-size: 1.8rem;">{selected_kota}</h2>
-    <p style="font-size: 1.1rem; opacity: 0.9;">Sistem Rekomendasi Mitigasi Berbasis Predictive Modeling • Akurasi: {metrics['test_r2']*100:.1f}%</p>
-</div>
-""", unsafe_allow_html=True)
-
-# Ambil data terbaru untuk kota tersebut (tahun terakhir)
-data_kota_latest = df_master[df_master['Kabupaten/Kota'] == selected_kota].iloc[-1]
-
-# Debug: Tampilkan kolom yang tersedia
-with st.sidebar:
-    st.markdown("---")
-    st.markdown("### 🔍 DEBUG DATA")
-    st.write(f"Kolom tersedia: {list(data_kota_latest.index)}")
-
-# Lakukan Prediksi
-input_df = pd.DataFrame([data_kota_latest[features]], columns=features)
-pred_ir = model.predict(input_df)[0]
-
-# Tab navigation
-tab1, tab2, tab3 = st.tabs(["🎯 PREDIKSI & REKOMENDASI", "📊 ANALISIS VARIABEL", "🔍 EVALUASI MODEL"])
-
-with tab1:
-    # Kartu prediksi utama
-    col_res, col_stats = st.columns([1.2, 0.8])
-
-    with col_res:
-        # Tentukan kategori risiko
-        if pred_ir > 50:
-            risk_class = "high-risk"
-            risk_label = "🚨 RISIKO TINGGI"
-            risk_icon = "⚠️"
-        elif pred_ir > 20:
-            risk_class = "med-risk"
-            risk_label = "🟡 RISIKO SEDANG"
-            risk_icon = "🔔"
-        else:
-            risk_class = "low-risk"
-            risk_label = "✅ RISIKO RENDAH"
-            risk_icon = "✅"
+with profiler.section('header'):
+    st.markdown(f"""
+    <div class="main-header">
+        <h1 style="margin-bottom: 0.5rem; font-size: 2.8rem;">🏥 Dashboard Mitigasi DBD</h1>
+        <h2 style="margin-top: 0; color: #10b981; font-size: 1.8rem;">{selected_kota}</h2>
+        <p style="font-size: 1.1rem; opacity: 0.9;">Sistem Rekomendasi Mitigasi Berbasis Predictive Modeling • Akurasi: {accuracy*100:.1f}%</p>
+    </div>
+    """, unsafe_allow_html=True)
 
-        st.markdown(f"""
-        <div class="recommendation-card {risk_class}">
-            <div style="display: flex; align-items: center; gap: 1rem; margin-bottom: 1rem;">
-                <div style="font-size: 3rem;">{risk_icon}</div>
-                <div>
-                    <h3 style="margin:0;">PREDIKSI INDEKS MORBIDITAS</h3>
-                    <p style="margin:0; opacity: 0.9;">{selected_kota}</p>
+with profiler.section('prediction'):
+    # Ambil data terbaru untuk kota tersebut (tahun terakhir) dari tabel prediksi
+    data_kota_latest = df_prediksi.loc[selected_kota, df_master.columns]
+
+    # Ambil hasil prediksi yang sudah dihitung saat load_assets
+    pred_ir = df_prediksi.at[selected_kota, 'pred_ir']
+    risk_level = df_prediksi.at[selected_kota, 'kelas_risiko']
+    pi_low, pi_high = df_prediksi.at[selected_kota, 'pi_bawah'], df_prediksi.at[selected_kota, 'pi_atas']
+    prob_high = df_prediksi.at[selected_kota, 'prob_di_atas_50']
+    prob_medium = df_prediksi.at[selected_kota, 'prob_di_atas_20']
+    # Fitur kosong/tidak valid: wilayah tidak diprediksi (pred_ir NaN, kelas risiko kosong)
+    missing_features = df_prediksi.at[selected_kota, INVALID_COLUMN]
+
+# Tab navigation: hanya tab yang sedang dibuka yang dieksekusi (tab lain tidak menghitung atau membuat grafik)
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    "🎯 PREDIKSI & REKOMENDASI", "📊 ANALISIS VARIABEL", "🔍 EVALUASI MODEL", "🧪 SIMULASI WHAT-IF", "🏆 PERINGKAT WILAYAH"
+], key="tab_aktif", on_change="rerun")
+
+if tab1.open:
+    with tab1, profiler.section('tab_prediksi'):
+        # Kartu prediksi utama
+        col_res, col_stats = st.columns([1.2, 0.8])
+
+        with col_res:
+            if missing_features:
+                # Fitur kosong/tidak valid: tidak ada prediksi, interval, maupun kelas risiko untuk ditampilkan
+                risk_class, risk_label, risk_icon = INCOMPLETE_DISPLAY
+                st.markdown(f"""
+                <div class="recommendation-card {risk_class}">
+                    <div style="display: flex; align-items: center; gap: 1rem; margin-bottom: 1rem;">
+                        <div style="font-size: 3rem;">{risk_icon}</div>
+                        <div>
+                            <h3 style="margin:0;">PREDIKSI INDEKS MORBIDITAS</h3>
+                            <p style="margin:0; opacity: 0.9;">{selected_kota}</p>
+                        </div>
+                    </div>
+                    <h3 style="text-align: center; margin: 1rem 0;">{risk_label}</h3>
+                    <p style="text-align: center; opacity: 0.9;">Prediksi tidak dihitung karena data berikut kosong atau tidak valid: {missing_features}</p>
                 </div>
-            </div>
-            <h1 style="font-size: 5rem; margin: 1rem 0; text-align: center;">{pred_ir:.1f}</h1>
-            <h3 style="text-align: center; margin-bottom: 1rem;">{risk_label}</h3>
-            <p style="text-align: center; opacity: 0.9;">per 100.000 penduduk</p>
-        </div>
-        """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
+            else:
+                # Tampilan kartu sesuai kategori risiko
+                risk_class, risk_label, risk_icon = RISK_DISPLAY[risk_level]
 
-    with col_stats:
-        # Statistik ringkas - SESUAI NAMA KOLOM DI DATA
-        st.markdown("### 📈 STATISTIK WILAYAH")
-
-        # Ambil data dengan nama kolom yang benar dari dataframe
-        stats_data = {
-            "Jumlah Penduduk": format_number(data_kota_latest.get('penduduk_ribu'), is_population=True),
-            "Tahun Data": data_kota_latest.get('Tahun', 'N/A'),
-            "Kasus DBD": format_number(data_kota_latest.get('kasus_dbd')),
-            "Kepadatan": f"{data_kota_latest.get('kepadatan_penduduk_km2', 'N/A')} jiwa/km²",
-            "Sanitasi Layak": f"{data_kota_latest.get('akses_sanitasi_layak_persen', 'N/A'):.1f}%"
-        }
+                st.markdown(f"""
+                <div class="recommendation-card {risk_class}">
+                    <div style="display: flex; align-items: center; gap: 1rem; margin-bottom: 1rem;">
+                        <div style="font-size: 3rem;">{risk_icon}</div>
+                        <div>
+                            <h3 style="margin:0;">PREDIKSI INDEKS MORBIDITAS</h3>
+                            <p style="margin:0; opacity: 0.9;">{selected_kota}</p>
+                        </div>
+                    </div>
+                    <h1 style="font-size: 5rem; margin: 1rem 0; text-align: center;">{pred_ir:.1f}</h1>
+                    <h3 style="text-align: center; margin-bottom: 1rem;">{risk_label}</h3>
+                    <p style="text-align: center; opacity: 0.9;">per 100.000 penduduk</p>
+                    <p style="text-align: center; opacity: 0.9;">Interval {INTERVAL[1] - INTERVAL[0]}%: {pi_low:.1f} – {pi_high:.1f}</p>
+                </div>
+                """, unsafe_allow_html=True)
 
-        # Debug info
-        with st.expander("📊 Detail Data", expanded=False):
-            st.write("Data terbaru untuk:", selected_kota)
-            st.dataframe(data_kota_latest, use_container_width=True)
+                # Peluang melewati batas risiko dari sebaran prediksi antar pohon
+                col_p50, col_p20 = st.columns(2)
+                for col, threshold, prob in [(col_p50, HIGH_RISK_THRESHOLD, prob_high), (col_p20, MEDIUM_RISK_THRESHOLD, prob_medium)]:
+                    with col:
+                        st.markdown(f"""
+                        <div class="metric-card">
+                            <div style="font-size: 0.9rem; opacity: 0.8;">Peluang IR &gt; {threshold}</div>
+                            <div style="font-size: 1.5rem; font-weight: bold; color: #10b981;">{prob*100:.0f}%</div>
+                            <div style="font-size: 0.8rem; opacity: 0.8;">{confidence_label(prob)}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                st.caption(f"Dihitung dari sebaran prediksi {n_trees} pohon Random Forest")
+
+        with col_stats:
+            # Statistik ringkas - SESUAI NAMA KOLOM DI DATA
+            st.markdown("### 📈 STATISTIK WILAYAH")
+
+            # Ambil data dengan nama kolom yang benar dari dataframe
+            stats_data = {
+                "Jumlah Penduduk": format_number(data_kota_latest.get('penduduk_ribu'), is_population=True),
+                "Tahun Data": data_kota_latest.get('Tahun', 'N/A'),
+                "Kasus DBD": format_number(data_kota_latest.get('kasus_dbd')),
+                "Kepadatan": f"{data_kota_latest.get('kepadatan_penduduk_km2', 'N/A')} jiwa/km²",
+                "Sanitasi Layak": f"{data_kota_latest.get('akses_sanitasi_layak_persen', 'N/A'):.1f}%"
+            }
+
+            # Debug info
+            with st.expander("📊 Detail Data", expanded=False):
+                st.write("Data terbaru untuk:", selected_kota)
+                st.dataframe(data_kota_latest, use_container_width=True)
+
+            for key, value in stats_data.items():
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div style="font-size: 0.9rem; opacity: 0.8;">{key}</div>
+                    <div style="font-size: 1.5rem; font-weight: bold; color: #10b981;">{value}</div>
+                </div>
+                """, unsafe_allow_html=True)
 
-        for key, value in stats_data.items():
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 0.9rem; opacity: 0.8;">{key}</div>
-                <div style="font-size: 1.5rem; font-weight: bold; color: #10b981;">{value}</div>
-            </div>
-            """, unsafe_allow_html=True)
+        st.markdown("---")
 
-    st.markdown("---")
+        # REKOMENDASI UTAMA BERDASARKAN RISIKO
+        st.markdown("### 🛡️ REKOMENDASI STRATEGIS UTAMA")
 
-    # REKOMENDASI UTAMA BERDASARKAN RISIKO
-    st.markdown("### 🛡️ REKOMENDASI STRATEGIS UTAMA")
-
-    if pred_ir > 50:
-        st.error("""
-        ## 🚨 STATUS DARURAT - TINDAKAN SEGERA DIPERLUKAN
-
-        1. **AKTIFKAN POSKO DARURAT DBD** di tingkat kecamatan dengan anggaran khusus
-        2. **FOGGING INTENSIF** radius 200m dari lokasi kasus baru dalam 24 jam
-        3. **MOBILISASI TENAGA MEDIS** tambahan dan pastikan ketersediaan platelet
-        4. **SURVEILANS HARIAN** oleh Dinas Kesehatan dan lapor ke Gubernur
-        5. **GERAKAN MASSAL 3M PLUS** melibatkan TNI/Polri dan organisasi masyarakat
-        """)
-    elif pred_ir > 20:
-        st.warning("""
-        ## 🟡 STATUS WASPADA - TINGKATKAN PENCEGAHAN
-
-        1. **INTENSIFKAN PSN** (Pembersihan Sarang Nyamuk) serentak seminggu sekali
-        2. **DISTRIBUSI ABATE/LARVASIDA** ke seluruh rumah di wilayah rawan
-        3. **SOSIALISASI MASIF** 3M Plus melalui media lokal dan kader
-        4. **PEMANTAUAN JENTIK** mingguan dengan cakupan >80% rumah
-        5. **SIAGA RUJUKAN** di fasilitas kesehatan dengan bed khusus DBD
-        """)
-    else:
-        st.success("""
-        ## ✅ STATUS AMAN - PERTAHANKAN DAN OPTIMALKAN
-
-        1. **LANJUTKAN PEMANTAUAN RUTIN** jentik oleh Jumantik terlatih
-        2. **EDUKASI BERKELANJUTAN** di sekolah dan perkantoran
-        3. **PERTAHANKAN SANITASI** dan drainase lingkungan
-        4. **KAPASITAS RESPONS CEPAT** yang siap diaktifkan jika diperlukan
-        5. **DOKUMENTASI BEST PRACTICE** untuk replikasi ke wilayah lain
-        """)
-
-with tab2:
-    st.markdown("### 📊 ANALISIS DETAIL VARIABEL PREDIKTOR")
-    st.markdown("Analisis mendalam setiap variabel yang mempengaruhi prediksi risiko DBD")
-
-    # Feature Importance Visualization
-    feature_names_display = [f.replace('_', ' ').title() for f in features]
-
-    # Cari nilai saat ini dengan penanganan missing values
-    current_values = []
-    for f in features:
-        val = data_kota_latest.get(f)
-        if pd.isna(val):
-            current_values.append(np.nan)
+        # Daftar tindakan per status risiko (teks yang sama dengan brief ekspor)
+        if missing_features:
+            st.info(f"Lengkapi data {missing_features} untuk wilayah ini agar prediksi dan rekomendasi dapat dihitung")
         else:
-            try:
-                current_values.append(float(val))
-            except:
-                current_values.append(np.nan)
-
-    imp_df = pd.DataFrame({
-        'Variabel': feature_names_display,
-        'Kepentingan': model.feature_importances_,
-        'Nilai Saat Ini': current_values
-    }).sort_values('Kepentingan', ascending=False)
-
-    # Plot feature importance
-    fig_imp = go.Figure()
-    fig_imp.add_trace(go.Bar(
-        x=imp_df['Kepentingan'],
-        y=imp_df['Variabel'],
-        orientation='h',
-        marker=dict(
-            color=imp_df['Kepentingan'],
-            colorscale='Viridis',
-            showscale=True,
-            colorbar=dict(title="Kepentingan")
-        ),
-        text=[f"{imp*100:.1f}%" for imp in imp_df['Kepentingan']],
-        textposition='inside',
-        name='Feature Importance'
-    ))
+            show_status = {'tinggi': st.error, 'sedang': st.warning}.get(risk_level, st.success)
+            show_status(status_markdown(risk_level))
 
-    fig_imp.update_layout(
-        title="📈 Variabel Paling Berpengaruh dalam Prediksi",
-        height=500,
-        font=dict(color='white'),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_title="Tingkat Kepentingan",
-        yaxis_title="Variabel",
-        showlegend=False
-    )
-    st.plotly_chart(fig_imp, use_container_width=True)
-
-    st.markdown("---")
-    st.markdown("### 💡 REKOMENDASI SPESIFIK PER VARIABEL")
-
-    # Hitung rata-rata untuk setiap feature (abaikan NaN)
-    feature_means = df_master[features].apply(lambda x: pd.to_numeric(x, errors='coerce')).mean()
-
-    # Tampilkan rekomendasi untuk 5 variabel terpenting
-    top_features = imp_df.head(5)
+if tab2.open:
+    with tab2, profiler.section('tab_variabel'):
+        st.markdown("### 📊 ANALISIS DETAIL VARIABEL PREDIKTOR")
+        st.markdown("Analisis mendalam setiap variabel yang mempengaruhi prediksi risiko DBD")
 
-    for _, row in top_features.iterrows():
-        # Cari nama asli feature
-        original_feature_name = features[feature_names_display.index(row['Variabel'])]
-        current_value = row['Nilai Saat Ini']
-
-        with st.expander(f"🔍 {row['Variabel']} (Kepentingan: {row['Kepentingan']*100:.1f}%)", expanded=True):
-            col_metric, col_rec = st.columns([1, 2])
-
-            with col_metric:
-                # Tampilkan nilai dan status
-                mean_value = feature_means[original_feature_name]
-
-                if pd.isna(current_value):
-                    status = "❓ **DATA TIDAK TERSEDIA**"
-                    color = "#94a3b8"
-                    display_value = "N/A"
+        if missing_features:
+            # Wilayah tanpa prediksi juga tidak punya kontribusi variabel (TreeSHAP dilewati)
+            st.warning(f"Kontribusi variabel tidak tersedia karena data berikut kosong atau tidak valid: {missing_features}")
+        else:
+            # Kontribusi setiap variabel terhadap prediksi wilayah ini (dihitung sekali saat load_assets)
+            feature_names_display = [f.replace('_', ' ').title() for f in features]
+            contributions = explanations['contributions'].loc[selected_kota, features]
+
+            # Cari nilai saat ini dengan penanganan missing values
+            current_values = []
+            for f in features:
+                val = data_kota_latest.get(f)
+                if pd.isna(val):
+                    current_values.append(np.nan)
                 else:
-                    # Format nilai berdasarkan jenis data
-                    if 'persen' in original_feature_name.lower() or '_p' in original_feature_name.lower():
-                        display_value = f"{current_value:.1f}%"
-                    elif 'ribu' in original_feature_name.lower():
-                        display_value = format_number(current_value, is_population=True)
-                    else:
-                        display_value = format_number(current_value)
-
                     try:
-                        current_num = float(current_value)
-                        mean_num = float(mean_value)
-
-                        if current_num > mean_num * 1.3:
-                            status = "🔼 **DI ATAS RATA-RATA**"
-                            color = "#ef4444"
-                        elif current_num < mean_num * 0.7:
-                            status = "🔽 **DI BAWAH RATA-RATA**"
-                            color = "#10b981"
-                        else:
-                            status = "↔️ **SESUAI RATA-RATA**"
-                            color = "#f59e0b"
+                        current_values.append(float(val))
                     except:
-                        status = "📊 **DATA TERSEDIA**"
-                        color = "#94a3b8"
+                        current_values.append(np.nan)
+
+            imp_df = pd.DataFrame({
+                'Fitur': features,
+                'Variabel': feature_names_display,
+                'Kontribusi': contributions.values,
+                'Nilai Saat Ini': current_values
+            }).sort_values('Kontribusi', key=np.abs, ascending=False)
+
+            with profiler.section('fig_importance'):
+                # Plot kontribusi variabel (merah menaikkan, hijau menurunkan prediksi)
+                fig_imp = importance_figure(asset_version, selected_kota, imp_df)
+                st.plotly_chart(fig_imp, use_container_width=True)
+                st.caption(
+                    f"Nilai dasar model {explanations['base_value']:.1f} + total kontribusi {contributions.sum():+.1f} "
+                    f"= prediksi {pred_ir:.1f} • 🔴 menaikkan prediksi • 🟢 menurunkan prediksi"
+                )
+
+            st.markdown("---")
+            st.markdown("### 💡 REKOMENDASI SPESIFIK PER VARIABEL")
+
+            # Rata-rata setiap feature (abaikan NaN), dihitung sekali per versi data & model
+            feature_means = stats['means']
+
+            # Tampilkan rekomendasi untuk 5 variabel dengan kontribusi terbesar
+            top_features = imp_df.head(5)
+
+            for _, row in top_features.iterrows():
+                original_feature_name = row['Fitur']
+                current_value = row['Nilai Saat Ini']
+                direction = contribution_direction(row['Kontribusi'])
+
+                with st.expander(f"🔍 {row['Variabel']} (Kontribusi: {row['Kontribusi']:+.1f} IR)", expanded=True):
+                    col_metric, col_rec = st.columns([1, 2])
+
+                    with col_metric:
+                        # Tampilkan nilai dan status
+                        mean_value = feature_means[original_feature_name]
+
+                        # Format nilai berdasarkan jenis data
+                        display_value = format_feature_value(original_feature_name, current_value)
+                        status, color = MISSING_STATUS if pd.isna(current_value) else DIRECTION_STATUS[direction]
+
+                        st.markdown(f"""
+                        <div style="background: {color}20; padding: 1rem; border-radius: 10px; border-left: 4px solid {color};">
+                            <div style="font-size: 0.9rem;">Nilai Saat Ini</div>
+                            <div style="font-size: 1.8rem; font-weight: bold;">{display_value}</div>
+                            <div style="font-size: 0.8rem;">{status}</div>
+                            <div style="font-size: 0.8rem; opacity: 0.7;">Rata-rata: {format_number(mean_value)}</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                    with col_rec:
+                        # Tampilkan rekomendasi
+                        if pd.isna(current_value):
+                            recommendation = missing_recommendation(row['Variabel'])
+                        else:
+                            recommendation = get_variable_recommendation(original_feature_name, direction)
+
+                        st.markdown(f"""
+                        <div style="background: #1e293b; padding: 1rem; border-radius: 10px;">
+                            <div style="font-size: 1rem; line-height: 1.6;">
+                            {recommendation}
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+
+                        # Action item spesifik
+                        st.markdown("**🎯 Action Item:**")
+                        if pd.isna(current_value):
+                            st.info(f"Kumpulkan data {row['Variabel'].lower()} untuk analisis yang lebih baik")
+                        elif direction == 'naik':
+                            st.info(f"Prioritaskan intervensi pada {row['Variabel'].lower()}")
+                        elif direction == 'netral':
+                            st.warning(f"Monitor perkembangan {row['Variabel'].lower()} secara berkala")
+                        else:
+                            st.success(f"Pertahankan kondisi optimal untuk {row['Variabel'].lower()}")
 
-                st.markdown(f"""
-                <div style="background: {color}20; padding: 1rem; border-radius: 10px; border-left: 4px solid {color};">
-                    <div style="font-size: 0.9rem;">Nilai Saat Ini</div>
-                    <div style="font-size: 1.8rem; font-weight: bold;">{display_value}</div>
-                    <div style="font-size: 0.8rem;">{status}</div>
-                    <div style="font-size: 0.8rem; opacity: 0.7;">Rata-rata: {format_number(mean_value)}</div>
-                </div>
-                """, unsafe_allow_html=True)
+if tab3.open:
+    with tab3, profiler.section('tab_evaluasi'):
+        st.markdown("### 🔍 EVALUASI MODEL PREDIKTIF")
 
-            with col_rec:
-                # Tampilkan rekomendasi
-                if pd.isna(current_value):
-                    recommendation = f"⚠️ **Data tidak tersedia** untuk {row['Variabel']}. Disarankan untuk mengumpulkan data ini untuk analisis yang lebih akurat."
-                else:
-                    recommendation = get_variable_recommendation(
-                        original_feature_name, 
-                        current_value, 
-                        mean_value
-                    )
+        col_eval1, col_eval2 = st.columns(2)
+
+        with col_eval1:
+            # Metrik model
+            st.markdown("#### 📊 PERFORMANCE METRICS")
+
+            metrics_data = {
+                "R² Score (Test)": f"{metrics['test_r2']*100:.1f}%",
+                "R² Score (Train)": f"{metrics['train_r2']*100:.1f}%",
+                "Gap Train-Test": f"{metrics['gap']*100:.2f}%",
+                "MAE (Mean Absolute Error)": f"{metrics.get('mae', 0):.2f}" if 'mae' in metrics else "N/A",
+                "RMSE (Root Mean Squared Error)": f"{metrics.get('rmse', 0):.2f}" if 'rmse' in metrics else "N/A"
+            }
 
+            for metric_name, value in metrics_data.items():
                 st.markdown(f"""
-                <div style="background: #1e293b; padding: 1rem; border-radius: 10px;">
-                    <div style="font-size: 1rem; line-height: 1.6;">
-                    {recommendation}
+                <div class="metric-card">
+                    <div style="display: flex; justify-content: space-between; align-items: center;">
+                        <div style="font-size: 0.9rem;">{metric_name}</div>
+                        <div style="font-size: 1.2rem; font-weight: bold; color: #10b981;">{value}</div>
                     </div>
                 </div>
                 """, unsafe_allow_html=True)
 
-                # Action item spesifik
-                st.markdown("**🎯 Action Item:**")
-                if pd.isna(current_value):
-                    st.info(f"Kumpulkan data {row['Variabel'].lower()} untuk analisis yang lebih baik")
-                elif "tinggi" in recommendation.lower():
-                    st.info(f"Prioritaskan intervensi pada {row['Variabel'].lower()}")
-                elif "sedang" in recommendation.lower():
-                    st.warning(f"Monitor perkembangan {row['Variabel'].lower()} secara berkala")
-                else:
-                    st.success(f"Pertahankan kondisi optimal untuk {row['Variabel'].lower()}")
-
-with tab3:
-    st.markdown("### 🔍 EVALUASI MODEL PREDIKTIF")
+        with col_eval2:
+            st.markdown("#### 🎯 INFORMASI MODEL")
 
-    col_eval1, col_eval2 = st.columns(2)
+            info_cards = [
+                ("🧠 **Algoritma**", "Random Forest Regressor"),
+                ("📊 **Jumlah Fitur**", f"{len(features)} variabel"),
+                ("🎯 **Target**", "Indeks Morbiditas (IR) DBD"),
+                ("📈 **Stabilitas**", "Tinggi (Gap < 10%)"),
+                ("🔄 **Update Terakhir**", f"{format_updated(model_info['updated'], '%d %b %Y')} • model {model_info['version']}")
+            ]
 
-    with col_eval1:
-        # Metrik model
-        st.markdown("#### 📊 PERFORMANCE METRICS")
-
-        metrics_data = {
-            "R² Score (Test)": f"{metrics['test_r2']*100:.1f}%",
-            "R² Score (Train)": f"{metrics['train_r2']*100:.1f}%",
-            "Gap Train-Test": f"{metrics['gap']*100:.2f}%",
-            "MAE (Mean Absolute Error)": f"{metrics.get('mae', 0):.2f}" if 'mae' in metrics else "N/A",
-            "RMSE (Root Mean Squared Error)": f"{metrics.get('rmse', 0):.2f}" if 'rmse' in metrics else "N/A"
-        }
-
-        for metric_name, value in metrics_data.items():
-            st.markdown(f"""
-            <div class="metric-card">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div style="font-size: 0.9rem;">{metric_name}</div>
-                    <div style="font-size: 1.2rem; font-weight: bold; color: #10b981;">{value}</div>
+            for title, value in info_cards:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div style="font-size: 0.9rem; opacity: 0.8;">{title}</div>
+                    <div style="font-size: 1rem; font-weight: bold;">{value}</div>
                 </div>
-            </div>
-            """, unsafe_allow_html=True)
+                """, unsafe_allow_html=True)
 
-    with col_eval2:
-        st.markdown("#### 🎯 INFORMASI MODEL")
+        st.markdown("---")
 
-        info_cards = [
-            ("🧠 **Algoritma**", "Random Forest Regressor"),
-            ("📊 **Jumlah Fitur**", f"{len(features)} variabel"),
-            ("🎯 **Target**", "Indeks Morbiditas (IR) DBD"),
-            ("📈 **Stabilitas**", "Tinggi (Gap < 10%)"),
-            ("🔄 **Update Terakhir**", bundle.get('timestamp', '2024-01-01') if 'timestamp' in bundle else '2024-01-01')
-        ]
+        # Backtest rolling-origin per tahun
+        st.markdown("#### 📆 BACKTEST ROLLING-ORIGIN (LATIH ≤ t, PREDIKSI t+1)")
 
-        for title, value in info_cards:
+        if backtest is None:
+            st.info("Hasil backtest belum tersedia. Jalankan `python backtest.py` untuk menghitung akurasi per tahun.")
+        else:
+            backtest_per_year, backtest_summary = backtest
+            if not backtest_current:
+                st.warning("Hasil backtest ini dibuat untuk versi model atau data lain, sehingga tidak dipakai "
+                           "sebagai akurasi model. Jalankan ulang `python backtest.py` untuk memperbaruinya.")
+
+            col_bt1, col_bt2, col_bt3 = st.columns(3)
+            with col_bt1:
+                st.metric("R² Backtest", f"{backtest_summary['r2']*100:.1f}%")
+            with col_bt2:
+                st.metric("MAE Backtest", f"{backtest_summary['mae']:.2f}")
+            with col_bt3:
+                st.metric("RMSE Backtest", f"{backtest_summary['rmse']:.2f}")
+
+            st.dataframe(
+                backtest_per_year.rename(columns={
+                    'n_wilayah': 'Jumlah Data', 'r2': 'R²', 'mae': 'MAE', 'rmse': 'RMSE', 'bias': 'Bias'
+                }).style.format({'R²': '{:.3f}', 'MAE': '{:.2f}', 'RMSE': '{:.2f}', 'Bias': '{:+.2f}'}),
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption(f"{backtest_summary['n_fold']} fold • setiap tahun diprediksi oleh model yang hanya dilatih dengan data tahun-tahun sebelumnya")
+
+        st.markdown("---")
+
+        # Visualization of model performance
+        st.markdown("#### 📈 VISUALISASI KINERJA MODEL")
+
+        with profiler.section('fig_performance'):
+            fig_perf = performance_figure(asset_version, metrics['train_r2'], metrics['test_r2'])
+            st.plotly_chart(fig_perf, use_container_width=True)
+
+        # Interpretasi hasil
+        st.markdown("#### 📋 INTERPRETASI HASIL EVALUASI")
+
+        if metrics['gap'] < 0.1:
+            st.success("""
+            ✅ **MODEL STABIL DAN RELIABLE**
+
+            Model menunjukkan performa yang konsisten antara data training dan testing, 
+            menandakan tidak terjadi overfitting. Model dapat diandalkan untuk prediksi 
+            di berbagai kondisi wilayah.
+            """)
+        else:
+            st.warning("""
+            ⚠️ **PERLU PERHATIAN KHUSUS**
+
+            Terdapat gap yang signifikan antara performa training dan testing. 
+            Disarankan untuk melakukan validasi tambahan dan monitoring ketat 
+            sebelum implementasi skala penuh.
+            """)
+
+if tab4.open:
+    with tab4, profiler.section('tab_whatif'):
+        st.markdown("### 🧪 SIMULASI WHAT-IF")
+        st.markdown("Ubah nilai variabel untuk melihat dampaknya terhadap prediksi risiko DBD di wilayah ini")
+
+        # Nilai awal slider = data terbaru wilayah (nilai kosong diisi rata-rata dataset)
+        base_values = data_kota_latest[features].astype(float).fillna(stats['means'])
+        ranges = default_ranges(stats['quantiles'], base_values, features)
+
+        col_slider, col_sim = st.columns([1, 1])
+
+        with col_slider:
+            scenario = {}
+            for f in features:
+                lo, hi = ranges[f]
+                scenario[f] = st.slider(
+                    f.replace('_', ' ').title(),
+                    min_value=float(lo),
+                    max_value=float(hi),
+                    value=float(base_values[f]),
+                    step=float((hi - lo) / 100),
+                    key=f"whatif_{selected_kota}_{f}"
+                )
+
+        with profiler.section('whatif_sweep'):
+            pred_sim, curves = run_whatif(
+                model, stats['model_version'], selected_kota,
+                tuple(scenario.items()), tuple((f, *ranges[f]) for f in features)
+            )
+
+        with col_sim:
+            sim_class, sim_label, sim_icon = RISK_DISPLAY[classify_risk(pred_sim)]
+            # Wilayah berdata tidak lengkap tidak punya prediksi saat ini sebagai pembanding
+            if missing_features:
+                current_text = "Saat ini: tidak ada prediksi (data tidak lengkap; nilai kosong diisi rata-rata dataset)"
+            else:
+                current_text = f"Saat ini: {pred_ir:.1f} • Perubahan: {pred_sim - pred_ir:+.1f} per 100.000 penduduk"
             st.markdown(f"""
-            <div class="metric-card">
-                <div style="font-size: 0.9rem; opacity: 0.8;">{title}</div>
-                <div style="font-size: 1rem; font-weight: bold;">{value}</div>
+            <div class="recommendation-card {sim_class}">
+                <h3 style="margin:0;">{sim_icon} PREDIKSI SKENARIO</h3>
+                <h1 style="font-size: 4rem; margin: 1rem 0; text-align: center;">{pred_sim:.1f}</h1>
+                <h3 style="text-align: center; margin-bottom: 1rem;">{sim_label}</h3>
+                <p style="text-align: center; opacity: 0.9;">{current_text}</p>
             </div>
             """, unsafe_allow_html=True)
 
-    st.markdown("---")
-
-    # Visualization of model performance
-    st.markdown("#### 📈 VISUALISASI KINERJA MODEL")
-
-    # Create a synthetic comparison chart
-    fig_perf = go.Figure()
-
-    # Add bars for train and test performance
-    fig_perf.add_trace(go.Bar(
-        x=['Training Set', 'Test Set'],
-        y=[metrics['train_r2']*100, metrics['test_r2']*100],
-        marker_color=['#60a5fa', '#10b981'],
-        text=[f"{metrics['train_r2']*100:.1f}%", f"{metrics['test_r2']*100:.1f}%"],
-        textposition='auto',
-        name='R² Score'
-    ))
-
-    fig_perf.update_layout(
-        title="Perbandingan Performance Model",
-        height=400,
-        font=dict(color='white'),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        yaxis_title="R² Score (%)",
-        showlegend=False
-    )
-
-    st.plotly_chart(fig_perf, use_container_width=True)
-
-    # Interpretasi hasil
-    st.markdown("#### 📋 INTERPRETASI HASIL EVALUASI")
-
-    if metrics['gap'] < 0.1:
-        st.success("""
-        ✅ **MODEL STABIL DAN RELIABLE**
-
-        Model menunjukkan performa yang konsisten antara data training dan testing, 
-        menandakan tidak terjadi overfitting. Model dapat diandalkan untuk prediksi 
-        di berbagai kondisi wilayah.
-        """)
-    else:
-        st.warning("""
-        ⚠️ **PERLU PERHATIAN KHUSUS**
-
-        Terdapat gap yang signifikan antara performa training dan testing. 
-        Disarankan untuk melakukan validasi tambahan dan monitoring ketat 
-        sebelum implementasi skala penuh.
-        """)
+        st.markdown("---")
+        st.markdown("#### 📈 KURVA SENSITIVITAS PER VARIABEL")
+        st.caption("Prediksi IR ketika satu variabel diubah dan variabel lain tetap pada nilai skenario")
+
+        curve_cols = st.columns(2)
+        for i, f in enumerate(features):
+            fig_curve = sensitivity_figure(
+                stats['model_version'], selected_kota, tuple(scenario.items()), f, curves[curves['fitur'] == f]
+            )
+            with curve_cols[i % 2]:
+                st.plotly_chart(fig_curve, use_container_width=True)
+
+if tab5.open:
+    with tab5, profiler.section('tab_peringkat'):
+        st.markdown("### 🏆 PERINGKAT RISIKO SELURUH WILAYAH")
+        st.markdown("Perbandingan prediksi IR seluruh kabupaten/kota tanpa perlu memilih wilayah satu per satu")
+
+        # Ringkasan jumlah wilayah per kelas risiko
+        counts = risk_counts(ranking)
+        col_high, col_med, col_low = st.columns(3)
+        with col_high:
+            st.metric("🚨 Risiko Tinggi", f"{counts['tinggi']} wilayah")
+        with col_med:
+            st.metric("🟡 Risiko Sedang", f"{counts['sedang']} wilayah")
+        with col_low:
+            st.metric("✅ Risiko Rendah", f"{counts['rendah']} wilayah")
+
+        # Kontrol urutan & paginasi (hanya satu halaman yang dikirim ke browser)
+        col_sort, col_size, col_page = st.columns([2, 1, 1])
+        with col_sort:
+            sort_key = st.selectbox(
+                "Urutkan berdasarkan:", list(SORT_OPTIONS), format_func=SORT_OPTIONS.get, key="ranking_sort"
+            )
+        with col_size:
+            page_size = st.selectbox("Baris per halaman:", PAGE_SIZES, index=1, key="ranking_page_size")
+        with col_page:
+            total_pages = n_pages(ranking, page_size)
+            page = st.number_input("Halaman:", min_value=1, max_value=total_pages, value=1, step=1, key="ranking_page")
+
+        page_df = get_page(ranking, sort_key, int(page), page_size)
+
+        # Wilayah berdata tidak lengkap ada di akhir setiap urutan, tanpa peringkat & prediksi
+        st.dataframe(
+            page_df.drop(columns=['kategori_rekomendasi']).fillna({'kelas_risiko': 'data tidak lengkap'}).rename(columns={
+                'peringkat': 'Peringkat',
+                'IR_tahun_lalu': 'IR Tahun Lalu',
+                'IR_DBD_per_100k': 'IR Aktual',
+                'pred_ir': 'Prediksi IR',
+                'perubahan_ir': 'Perubahan',
+                'kelas_risiko': 'Kelas Risiko',
+                'prob_di_atas_50': 'P(IR > 50)',
+            }).style.format({
+                'IR Tahun Lalu': '{:.1f}', 'IR Aktual': '{:.1f}', 'Prediksi IR': '{:.1f}', 'Perubahan': '{:+.1f}', 'P(IR > 50)': '{:.0%}'
+            }, na_rep='–'),
+            use_container_width=True,
+            hide_index=True
+        )
+        n_incomplete = len(ranking['table']) - int(counts.sum())
+        st.caption(f"Halaman {int(page)} dari {total_pages} • {len(ranking['table'])} wilayah"
+                   + (f" ({n_incomplete} berdata tidak lengkap, di akhir tabel)" if n_incomplete else "")
+                   + " • Perubahan = prediksi IR dikurangi IR aktual tahun sebelumnya")
+
+        # Heatmap IR aktual per tahun untuk wilayah di halaman ini (urutan sama dengan tabel)
+        st.markdown("#### 🗺️ HEATMAP IR PER TAHUN")
+        fig_heat = heatmap_figure(asset_version, tuple(page_df['Kabupaten/Kota']), ranking['ir_matrix'])
+        st.plotly_chart(fig_heat, use_container_width=True)
 
 # ============================================================================
 # FOOTER
 # ============================================================================
-st.markdown("---")
-footer_col1, footer_col2, footer_col3 = st.columns([2, 1, 1])
+with profiler.section('footer'):
+    st.markdown("---")
+    footer_col1, footer_col2, footer_col3 = st.columns([2, 1, 1])
 
-with footer_col1:
-    st.markdown("""
-    <div style="text-align: left; opacity: 0.7;">
-        <p>📋 <strong>Sistem Mitigasi DBD Terpadu</strong> • Dashboard v2.0 • © 2024 Kementerian Kesehatan</p>
-        <p style="font-size: 0.9rem;">Sistem ini menggunakan model machine learning untuk prediksi risiko DBD dengan akurasi tinggi.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    with footer_col1:
+        st.markdown("""
+        <div style="text-align: left; opacity: 0.7;">
+            <p>📋 <strong>Sistem Mitigasi DBD Terpadu</strong> • Dashboard v2.0 • © 2024 Kementerian Kesehatan</p>
+            <p style="font-size: 0.9rem;">Sistem ini menggunakan model machine learning untuk prediksi risiko DBD dengan akurasi tinggi.</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-with footer_col2:
-    st.markdown("""
-    <div style="text-align: center; opacity: 0.7;">
-        <p>📞 Hotline DBD</p>
-        <p style="font-size: 1.2rem; font-weight: bold;">119</p>
-    </div>
-    """, unsafe_allow_html=True)
+    with footer_col2:
+        st.markdown("""
+        <div style="text-align: center; opacity: 0.7;">
+            <p>📞 Hotline DBD</p>
+            <p style="font-size: 1.2rem; font-weight: bold;">119</p>
+        </div>
+        """, unsafe_allow_html=True)
 
-with footer_col3:
-    st.markdown(f"""
-    <div style="text-align: right; opacity: 0.7;">
-        <p>Terakhir diperbarui:</p>
-        <p>{datetime.now().strftime('%d %B %Y')}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    with footer_col3:
+        st.markdown(f"""
+        <div style="text-align: right; opacity: 0.7;">
+            <p>Terakhir diperbarui:</p>
+            <p>{format_updated(model_info['updated'], '%d %B %Y')} • model {model_info['version']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+# ============================================================================
+# PROFILING PANEL (DBD_PROFILE=1)
+# ============================================================================
+if profiler.enabled:
+    profiler.end_run()
+    with st.sidebar:
+        st.markdown("---")
+        st.markdown("### ⏱️ PROFILING")
+        st.dataframe(
+            profiler.summary().style.format({'p50_ms': '{:.1f}', 'p95_ms': '{:.1f}', 'terakhir_ms': '{:.1f}'}),
+            use_container_width=True,
+            hide_index=True
+        )
+        st.caption(f"Latensi per bagian (ms) dari {profiler.window} rerun terakhir • log: {profiler.log_path}")
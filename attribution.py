@@ -0,0 +1,196 @@
+"""
+Atribusi prediksi per wilayah (TreeSHAP path-dependent) langsung dari array hutan datar.
+
+Untuk setiap daun, jalur dari akar diringkas per fitur unik j di jalur:
+- z_j = hasil kali rasio cover (jumlah sampel anak / induk) pada cabang yang
+  memakai fitur j (peluang "mengikuti" jalur bila fitur j tidak diketahui);
+- o_j = 1 bila nilai fitur j sampel memenuhi semua kondisi jalur untuk j
+  (nilai kosong/NaN mengikuti arah NaN setiap node, sama seperti
+  FlatForest.apply dan sklearn).
+
+Nilai SHAP fitur i untuk sampel x adalah jumlah atas daun:
+    v_daun * (o_i - z_i) * sum_k w(k, M) * e_k
+dengan M jumlah fitur unik di jalur, w(k, M) = k!(M-k-1)!/M!, dan e_k
+koefisien t^k dari hasil kali (z_j + o_j t) atas fitur jalur j != i.
+Seperti algoritma TreeSHAP asli, polinomial seluruh jalur dibangun sekali
+(EXTEND) lalu faktor fitur i dikeluarkan lagi (UNWIND), sehingga biaya per
+daun O(M^2) dengan M <= kedalaman pohon, bukan eksponensial terhadap jumlah
+fitur. Jalur setiap daun disimpan ringkas (hanya fitur unik di jalur) dan
+langkah EXTEND/UNWIND dijalankan sebagai operasi array atas semua daun dan
+sekumpulan sampel sekaligus. Jumlah kontribusi + nilai dasar = prediksi.
+"""
+from math import factorial
+
+import numpy as np
+import pandas as pd
+
+from forest_arrays import as_flat_forest
+
+# Kontribusi (IR per 100.000) yang dianggap terlalu kecil untuk diberi arah naik/turun
+NEGLIGIBLE_CONTRIBUTION = 1.0
+# Batas elemen array (sampel x daun x fitur jalur) per potongan sampel di tree_shap
+CHUNK_ELEMENTS = 2_000_000
+
+
+def leaf_paths(forest):
+    """Ringkasan jalur setiap daun: nilai, batas (lo, hi] & jalur NaN per fitur, z per fitur, dan fitur di jalur"""
+    n_nodes = len(forest.children_left)
+    nodes = np.arange(n_nodes)
+    is_leaf = forest.children_left == nodes
+
+    # Induk setiap node (akar = -1) dan apakah node adalah anak kanan
+    parent = np.full(n_nodes, -1, dtype=np.int64)
+    is_right = np.zeros(n_nodes, dtype=bool)
+    internal = nodes[~is_leaf]
+    parent[forest.children_left[internal]] = internal
+    parent[forest.children_right[internal]] = internal
+    is_right[forest.children_right[internal]] = True
+
+    leaves = nodes[is_leaf]
+    n_leaves, n_features = len(leaves), forest.n_features_in_
+    lo = np.full((n_leaves, n_features), -np.inf)
+    hi = np.full((n_leaves, n_features), np.inf)
+    z = np.ones((n_leaves, n_features))
+    on_path = np.zeros((n_leaves, n_features), dtype=bool)
+    # NaN fitur j mencapai daun bila setiap split pada j di jalur mengarahkan NaN ke cabang yang dilalui
+    nan_ok = np.ones((n_leaves, n_features), dtype=bool)
+    missing_right = (np.zeros(n_nodes, dtype=bool) if forest.missing_go_to_left is None
+                     else ~np.asarray(forest.missing_go_to_left))
+
+    # Telusuri semua daun ke atas bersamaan; setiap langkah memperbarui satu fitur per daun
+    rows = np.arange(n_leaves)
+    current = leaves.copy()
+    samples = np.asarray(forest.node_samples)
+    while True:
+        active = parent[current] >= 0
+        if not active.any():
+            break
+        r, child = rows[active], current[active]
+        p = parent[child]
+        f = np.asarray(forest.feature)[p]
+        thr = np.asarray(forest.threshold)[p]
+        right = is_right[child]
+
+        z[r, f] *= samples[child] / samples[p]
+        on_path[r, f] = True
+        nan_ok[r, f] &= missing_right[p] == right
+        lo[r[right], f[right]] = np.maximum(lo[r[right], f[right]], thr[right])
+        hi[r[~right], f[~right]] = np.minimum(hi[r[~right], f[~right]], thr[~right])
+        current[active] = p
+
+    # Daun dikelompokkan per pohon untuk nilai dasar (rata-rata tertimbang cover)
+    tree_of_leaf = np.searchsorted(np.asarray(forest.roots), leaves, side='right') - 1
+    root_samples = samples[np.asarray(forest.roots)][tree_of_leaf]
+    return {
+        'value': np.asarray(forest.value)[leaves],
+        'cover': samples[leaves] / root_samples,
+        'lo': lo,
+        'hi': hi,
+        'nan_ok': nan_ok,
+        'z': np.where(on_path, z, 1.0),
+        'on_path': on_path,
+        'n_unique': on_path.sum(axis=1),
+    }
+
+
+def shapley_weights(n_features):
+    """Tabel w[M, k] = k!(M-k-1)!/M! untuk M = 1..n_features dan k < M"""
+    weights = np.zeros((n_features + 1, max(n_features, 1)))
+    for m in range(1, n_features + 1):
+        for k in range(m):
+            weights[m, k] = factorial(k) * factorial(m - k - 1) / factorial(m)
+    return weights
+
+
+def build_explainer(model):
+    """Jalur ringkas setiap daun (fitur unik, z, batas (lo, hi]) dan nilai dasar, sekali per model"""
+    forest = as_flat_forest(model)
+    paths = leaf_paths(forest)
+    n_unique = paths['n_unique']
+    max_unique = max(int(n_unique.max(initial=0)), 1)
+
+    # Fitur di jalur dipindah ke depan; sisa kolom menjadi faktor netral (z=1, o=0) di polinomial
+    order = np.argsort(~paths['on_path'], axis=1, kind='stable')[:, :max_unique]
+    on_path = np.arange(max_unique) < n_unique[:, None]
+    take = lambda key: np.take_along_axis(paths[key], order, axis=1)
+    weights = shapley_weights(max_unique)[n_unique]
+    return {
+        'forest': forest,
+        'base_value': float((paths['value'] * paths['cover']).sum() / forest.n_estimators),
+        'value': paths['value'],
+        'feature': order,
+        'on_path': on_path,
+        'z': np.where(on_path, take('z'), 1.0),
+        'lo': take('lo'),
+        'hi': take('hi'),
+        'nan_ok': take('nan_ok'),
+        # w(k, M) per daun untuk k < M (nol untuk k >= M)
+        'weights': weights,
+        # Posisi (daun, slot jalur) milik setiap fitur untuk menjumlahkan kontribusi per fitur
+        'slots': [np.flatnonzero(on_path & (order == f)) for f in range(forest.n_features_in_)],
+    }
+
+
+def _path_contributions(explainer, o):
+    """Kontribusi setiap slot jalur (max_fitur_jalur, n_sampel, n_daun) untuk indikator o (bentuk sama)"""
+    # Sumbu slot jalur / derajat polinomial di depan agar setiap langkah membaca array yang bersebelahan
+    z, weights, on_path = explainer['z'].T, explainer['weights'].T, explainer['on_path'].T
+    depth = len(z)
+
+    # EXTEND: koefisien hasil kali (z_j + o_j t) atas seluruh fitur jalur
+    poly = np.zeros((depth + 1,) + o.shape[1:])
+    poly[0] = 1.0
+    for j in range(depth):
+        poly[1:] = poly[1:] * z[j] + poly[:-1] * o[j]
+        poly[0] *= z[j]
+
+    contributions = np.zeros(o.shape)
+    for i in range(depth):
+        # UNWIND: bagi dengan (z_i + t) dari koefisien tertinggi (stabil karena z_i <= 1),
+        # atau dengan z_i saja bila o_i = 0
+        total_one = np.zeros(o.shape[1:])
+        total_zero = np.zeros(o.shape[1:])
+        quotient = poly[depth]
+        for k in range(depth - 1, -1, -1):
+            total_one += weights[k] * quotient
+            total_zero += weights[k] * poly[k]
+            quotient = poly[k] - z[i] * quotient
+        total = np.where(o[i] > 0, total_one, total_zero / z[i])
+        contributions[i] = np.where(on_path[i], explainer['value'] * (o[i] - z[i]) * total, 0.0)
+    return contributions
+
+
+def tree_shap(explainer, X):
+    """Kontribusi SHAP (n_sampel, n_fitur) untuk seluruh sampel X"""
+    X = explainer['forest']._as_matrix(X)
+    feature, lo, hi, nan_ok = (explainer[key].T for key in ('feature', 'lo', 'hi', 'nan_ok'))
+    depth, n_leaves = feature.shape
+    chunk_size = max(1, CHUNK_ELEMENTS // (n_leaves * (depth + 1)))
+
+    phi = np.empty(X.shape, dtype=np.float64)
+    for start in range(0, X.shape[0], chunk_size):
+        # (slot jalur, sampel, daun)
+        x = np.ascontiguousarray(X[start:start + chunk_size][:, feature].transpose(1, 0, 2))
+        # NaN memenuhi jalur hanya bila setiap split fitur itu mengarahkan NaN ke cabang jalur
+        o = np.where(np.isnan(x), nan_ok[:, None], (x > lo[:, None]) & (x <= hi[:, None]))
+        o &= explainer['on_path'].T[:, None]
+        contributions = _path_contributions(explainer, o.astype(np.float64))
+        contributions = contributions.transpose(1, 2, 0).reshape(x.shape[1], -1)
+        for f, slots in enumerate(explainer['slots']):
+            phi[start:start + x.shape[1], f] = contributions[:, slots].sum(axis=1)
+    return phi / explainer['forest'].n_estimators
+
+
+def explain_frame(df, explainer, features):
+    """Kontribusi per baris df sebagai DataFrame (indeks sama dengan df)"""
+    X = df[features].apply(lambda x: pd.to_numeric(x, errors='coerce'))
+    return pd.DataFrame(tree_shap(explainer, X), index=df.index, columns=features)
+
+
+def contribution_direction(contribution):
+    """Arah pengaruh: 'naik' (menaikkan prediksi IR), 'turun', atau 'netral'"""
+    if contribution > NEGLIGIBLE_CONTRIBUTION:
+        return 'naik'
+    if contribution < -NEGLIGIBLE_CONTRIBUTION:
+        return 'turun'
+    return 'netral'
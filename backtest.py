@@ -0,0 +1,202 @@
+"""
+Backtest rolling-origin untuk model IR DBD dengan fitur lag.
+
+Untuk setiap tahun t, model dilatih dengan data tahun <= t lalu memprediksi
+tahun t+1 untuk semua wilayah. Berbeda dengan `train_test_split` acak di
+notebook, tidak ada data masa depan yang bocor ke pelatihan:
+
+- IR_tahun_lalu dihitung dengan shift(1) per wilayah (hanya melihat ke
+  belakang), sehingga matriks fitur cukup dibangun sekali dan setiap fold
+  hanyalah potongan berdasarkan tahun;
+- baris tanpa IR tahun sebelumnya (tahun pertama tiap wilayah) tidak dipakai,
+  karena di notebook baris tersebut diisi rata-rata IR wilayah yang memuat
+  nilai target itu sendiri.
+
+Setiap fold melatih ulang konfigurasi model yang dievaluasi: fitur dan
+hyperparameter diambil dari bundle model (default: model yang dipakai
+dashboard). Bundle tanpa hyperparameter (ekspor array datar lama, hasil
+pruning) dievaluasi dengan hyperparameter model robust notebook.
+
+Fold dijalankan paralel dan hasilnya ditulis ke `backtest/` (error per tahun,
+prediksi per wilayah, dan ringkasan) untuk ditampilkan di tab EVALUASI MODEL.
+Ringkasan mencatat versi model yang dievaluasi dan versi tabel master;
+dashboard hanya memakai R² backtest sebagai akurasi model bila keduanya
+(beserta fitur dan hyperparameter) masih sama. Bila hyperparameter ditimpa
+(--n-estimators) atau tidak diketahui, versi model tidak dicatat sehingga
+hasilnya hanya ditampilkan sebagai eksperimen.
+
+Pemakaian:
+    python backtest.py
+    python backtest.py --n-jobs 4
+    python backtest.py --n-estimators 300          # eksperimen, bukan akurasi model
+    python backtest.py --model model_registry/versions/v2
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from dataset_stats import artifact_version
+from experiments import FEATURE_SETS, TARGET, default_data_path, read_training_table, resolve_workers
+from forest_arrays import bundle_params, default_model_path, open_bundle
+from registry import current_model_path
+
+OUT_DIR = 'backtest'
+
+# Hyperparameter model robust di notebook
+ROBUST_PARAMS = {'n_estimators': 1000, 'max_depth': 5, 'min_samples_leaf': 5, 'random_state': 42}
+
+
+def build_matrix(df, features=None):
+    """Matriks fitur sekali untuk semua fold: lag IR hanya dari tahun sebelumnya, tanpa fillna"""
+    features = features or FEATURE_SETS['robust']
+    df = df.sort_values(['Kabupaten/Kota', 'Tahun']).reset_index(drop=True)
+    df['IR_tahun_lalu'] = df.groupby('Kabupaten/Kota', observed=True)[TARGET].shift(1)
+    df = df.dropna(subset=['IR_tahun_lalu']).reset_index(drop=True)
+    return df[['Tahun', 'Kabupaten/Kota']], df[features].to_numpy(np.float64), df[TARGET].to_numpy(np.float64)
+
+
+def make_folds(years, min_train_years=1):
+    """Pasangan (tahun_akhir_latih, tahun_uji) rolling-origin: latih <= t, uji t+1"""
+    unique_years = np.unique(years)
+    return [(int(unique_years[i - 1]), int(unique_years[i])) for i in range(min_train_years, len(unique_years))]
+
+
+def run_fold(X_train, y_train, X_test, params):
+    """Latih satu fold dan prediksi tahun ujinya"""
+    model = RandomForestRegressor(**params)
+    model.fit(X_train, y_train)
+    return model.predict(X_test)
+
+
+def error_table(predictions):
+    """Metrik error per tahun uji"""
+    rows = []
+    for year, group in predictions.groupby('Tahun'):
+        rows.append({
+            'Tahun': year,
+            'n_wilayah': len(group),
+            'r2': r2_score(group['aktual'], group['prediksi']) if len(group) > 1 else np.nan,
+            'mae': mean_absolute_error(group['aktual'], group['prediksi']),
+            'rmse': float(np.sqrt(mean_squared_error(group['aktual'], group['prediksi']))),
+            'bias': float((group['prediksi'] - group['aktual']).mean()),
+        })
+    return pd.DataFrame(rows)
+
+
+def run_backtest(df, features=None, params=None, n_jobs=-1, min_train_years=1):
+    """Jalankan seluruh fold secara paralel; kembalikan (prediksi per wilayah, error per tahun, ringkasan)"""
+    params = dict(ROBUST_PARAMS, **(params or {}))
+    features = features or FEATURE_SETS['robust']
+    keys, X, y = build_matrix(df, features)
+    years = keys['Tahun'].to_numpy()
+    folds = make_folds(years, min_train_years)
+    if not folds:
+        raise ValueError("Data kurang dari dua tahun dengan fitur lag; backtest tidak bisa dijalankan")
+
+    workers = resolve_workers(n_jobs, len(folds))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for train_end, test_year in folds:
+            train, test = years <= train_end, years == test_year
+            futures.append(pool.submit(run_fold, X[train], y[train], X[test], params))
+        fold_preds = [future.result() for future in futures]
+
+    predictions = pd.concat([
+        keys[years == test_year].assign(tahun_akhir_latih=train_end, aktual=y[years == test_year], prediksi=pred)
+        for (train_end, test_year), pred in zip(folds, fold_preds)
+    ], ignore_index=True)
+    predictions['galat'] = predictions['prediksi'] - predictions['aktual']
+
+    summary = {
+        'r2': float(r2_score(predictions['aktual'], predictions['prediksi'])),
+        'mae': float(mean_absolute_error(predictions['aktual'], predictions['prediksi'])),
+        'rmse': float(np.sqrt(mean_squared_error(predictions['aktual'], predictions['prediksi']))),
+        'n_fold': len(folds),
+        'n_prediksi': len(predictions),
+        'params': params,
+        'features': list(features),
+    }
+    return predictions, error_table(predictions), summary
+
+
+def _write_atomic(path, write):
+    tmp_path = path + '.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+
+def write_results(predictions, per_year, summary, out_dir=OUT_DIR):
+    """Tulis hasil backtest ke direktori output (setiap file diganti secara atomik, ringkasan terakhir)"""
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, 'prediksi.csv'), lambda path: predictions.to_csv(path, index=False))
+    _write_atomic(os.path.join(out_dir, 'per_tahun.csv'), lambda path: per_year.to_csv(path, index=False))
+    _write_atomic(os.path.join(out_dir, 'ringkasan.json'), lambda path: _write_json(path, summary))
+
+
+def load_results(out_dir=OUT_DIR):
+    """Baca hasil backtest (error per tahun, ringkasan), atau None bila belum pernah dijalankan"""
+    summary_path = os.path.join(out_dir, 'ringkasan.json')
+    if not os.path.exists(summary_path):
+        return None
+    with open(summary_path) as f:
+        summary = json.load(f)
+    return pd.read_csv(os.path.join(out_dir, 'per_tahun.csv')), summary
+
+
+def matches(summary, model_version, data_version, features, params):
+    """True bila ringkasan backtest dibuat untuk versi model & data ini (artifact_version) dengan fitur dan
+    hyperparameter yang sama"""
+    return (summary.get('model_version') is not None and summary.get('model_version') == model_version
+            and summary.get('data_version') == data_version and summary.get('features') == list(features)
+            and params is not None and summary.get('params') == params)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest rolling-origin model IR DBD")
+    parser.add_argument('--data', default=None, help="Tabel master (CSV/Parquet)")
+    parser.add_argument('--model', default=None, help="Model yang dievaluasi (default: model yang dipakai dashboard)")
+    parser.add_argument('--out-dir', default=OUT_DIR, help="Direktori output")
+    parser.add_argument('--n-estimators', type=int, default=None,
+                        help="Timpa jumlah pohon model (hasil tidak dipakai sebagai akurasi model)")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Jumlah fold yang dijalankan paralel (-1 = semua core)")
+    args = parser.parse_args(argv)
+
+    data_path = args.data or default_data_path()
+    model_path = args.model or current_model_path() or default_model_path()
+    # Konfigurasi yang dilatih ulang per fold = fitur & hyperparameter model yang dievaluasi
+    bundle = open_bundle(model_path)
+    params = bundle_params(bundle)
+    overrides = {} if args.n_estimators is None else {'n_estimators': args.n_estimators}
+    if params is None:
+        print(f"Hyperparameter {model_path} tidak diketahui; memakai hyperparameter model robust notebook")
+
+    df = read_training_table(data_path)
+    predictions, per_year, summary = run_backtest(df, bundle['features'], dict(params or {}, **overrides),
+                                                  n_jobs=args.n_jobs)
+    # Versi artefak yang sama dengan kunci aset dashboard, untuk memastikan hasil masih berlaku; konfigurasi
+    # yang bukan milik model tersebut tidak diberi versinya
+    evaluated = params is not None and not overrides
+    summary.update(model_version=artifact_version(model_path) if evaluated else None,
+                   data_version=artifact_version(data_path))
+    if not evaluated:
+        print("Konfigurasi berbeda dari model yang dievaluasi; hasil tidak dipakai sebagai akurasi model")
+    write_results(predictions, per_year, summary, args.out_dir)
+
+    print(per_year.to_string(index=False))
+    print(f"Backtest: R² {summary['r2']:.3f} • MAE {summary['mae']:.2f} • RMSE {summary['rmse']:.2f} "
+          f"({summary['n_fold']} fold) -> {args.out_dir}/")
+
+
+if __name__ == '__main__':
+    main()
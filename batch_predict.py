@@ -0,0 +1,171 @@
+"""
+Prediksi batch (tanpa Streamlit) untuk banyak baris fitur sekaligus.
+
+Membaca CSV/Parquet berisi baris fitur (nama kolom sama dengan `features` di
+bundle model, termasuk IR_tahun_lalu), lalu menulis prediksi IR, kelas risiko,
+dan kategori rekomendasi per potongan (chunk) sehingga grid skenario ribuan
+baris bisa diproses dari cron job tanpa memuat seluruh file ke memori.
+
+Baris dengan fitur kosong atau non-numerik tidak diprediksi (pred_ir dan
+kelas risiko kosong) dan ditandai di kolom `fitur_tidak_valid`: hutan array
+datar mengirim NaN ke anak kiri, sehingga tanpa penanda baris seperti itu
+tampak sebagai prediksi sah (biasanya 'rendah').
+
+Pemakaian:
+    python batch_predict.py skenario.csv -o hasil.csv
+    python batch_predict.py skenario.parquet -o hasil.parquet --chunk-size 50000
+    python batch_predict.py skenario.csv -o hasil.csv --uncertainty
+
+Dari Python:
+    from batch_predict import predict_frame
+    hasil = predict_frame(df, bundle['model'], bundle['features'])
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from forest_arrays import open_bundle, per_tree_predictions
+from risk import RECOMMENDATION_CATEGORIES, classify_risk
+from uncertainty import UNCERTAINTY_COLUMNS, summarize_per_tree
+
+DEFAULT_CHUNK_SIZE = 10000
+INVALID_COLUMN = 'fitur_tidak_valid'
+
+# Tipe kolom hasil ditetapkan (potongan yang seluruh barisnya tidak valid tetap ditulis sebagai string/float)
+OUTPUT_TYPES = {
+    'pred_ir': pa.float64(),
+    'kelas_risiko': pa.string(),
+    'kategori_rekomendasi': pa.string(),
+    **{col: pa.float64() for col in UNCERTAINTY_COLUMNS},
+    INVALID_COLUMN: pa.string(),
+}
+
+
+def predict_frame(df, model, features, uncertainty=False):
+    """Tambahkan kolom pred_ir, kelas_risiko, dan kategori_rekomendasi ke salinan df
+
+    Dengan uncertainty=True, prediksi dihitung dari matriks prediksi per pohon
+    dan ditambah kolom interval (pi_bawah, pi_atas) serta peluang IR > 50 / > 20.
+    Baris dengan fitur kosong/non-numerik tidak diprediksi; nama fiturnya
+    dicatat di kolom fitur_tidak_valid (string kosong untuk baris yang sah).
+    """
+    missing = [f for f in features if f not in df.columns]
+    if missing:
+        raise ValueError(f"Kolom fitur tidak ditemukan: {', '.join(missing)}")
+
+    X = df[features].apply(lambda x: pd.to_numeric(x, errors='coerce'))
+    invalid = X.isna().to_numpy()
+    valid = ~invalid.any(axis=1)
+
+    columns = {col: np.full(len(df), np.nan) for col in ['pred_ir'] + (UNCERTAINTY_COLUMNS if uncertainty else [])}
+    if valid.any():
+        if uncertainty:
+            summary = summarize_per_tree(per_tree_predictions(model, X[valid]))
+            for col in columns:
+                columns[col][valid] = summary[col]
+        else:
+            columns['pred_ir'][valid] = model.predict(X[valid])
+
+    result = df.copy()
+    # Kolom fitur ditulis sebagai angka yang dipakai model (nilai non-numerik menjadi kosong & ditandai)
+    result[features] = X
+    result['pred_ir'] = columns['pred_ir']
+    result['kelas_risiko'] = pd.Series(classify_risk(columns['pred_ir']), index=result.index, dtype=object).where(valid, None)
+    result['kategori_rekomendasi'] = result['kelas_risiko'].map(RECOMMENDATION_CATEGORIES)
+    if uncertainty:
+        for col in UNCERTAINTY_COLUMNS:
+            result[col] = columns[col]
+    names = np.asarray(features, dtype=object)
+    flags = np.full(len(df), '', dtype=object)
+    flags[~valid] = [', '.join(names[row]) for row in invalid[~valid]]
+    result[INVALID_COLUMN] = flags
+    return result
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Baca CSV/Parquet per potongan sebagai DataFrame (file tanpa baris menghasilkan satu potongan kosong)"""
+    if path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(path)
+        empty = True
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            yield parquet_file.schema_arrow.empty_table().to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+def output_schema(input_path, result, features):
+    """Skema Parquet hasil yang sama untuk semua potongan (kolom fitur selalu float64)"""
+    if input_path.endswith('.parquet'):
+        fields = list(pq.read_schema(input_path).remove_metadata())
+    else:
+        # Kolom integer di potongan CSV pertama bisa menjadi float di potongan lain (ada nilai kosong)
+        fields = [pa.field(field.name, pa.float64()) if pa.types.is_integer(field.type) else field
+                  for field in pa.Schema.from_pandas(result, preserve_index=False)]
+    fields = [pa.field(field.name, pa.float64()) if field.name in features else field
+              for field in fields if field.name in result.columns and field.name not in OUTPUT_TYPES]
+    return pa.schema(fields + [pa.field(col, OUTPUT_TYPES[col]) for col in result.columns if col in OUTPUT_TYPES])
+
+
+def iter_predictions(path, bundle, chunk_size=DEFAULT_CHUNK_SIZE, uncertainty=False):
+    """Prediksi file input per potongan; menghasilkan DataFrame hasil untuk setiap potongan"""
+    for chunk in read_chunks(path, chunk_size):
+        yield predict_frame(chunk, bundle['model'], bundle['features'], uncertainty)
+
+
+def run(input_path, output_path, model_path=None, chunk_size=DEFAULT_CHUNK_SIZE, uncertainty=False):
+    """Prediksi seluruh file input, tulis hasilnya secara streaming ke CSV/Parquet
+
+    Mengembalikan (jumlah baris, jumlah baris dengan fitur tidak valid).
+    """
+    bundle = open_bundle(model_path)
+    tmp_path = output_path + '.tmp'
+    n_rows = n_invalid = 0
+    writer = None
+    try:
+        for i, result in enumerate(iter_predictions(input_path, bundle, chunk_size, uncertainty)):
+            if output_path.endswith('.parquet'):
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, output_schema(input_path, result, bundle['features']))
+                writer.write_table(pa.Table.from_pandas(result, schema=writer.schema, preserve_index=False))
+            else:
+                result.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            n_rows += len(result)
+            n_invalid += int((result[INVALID_COLUMN] != '').sum())
+        if writer is not None:
+            writer.close()
+            writer = None
+        os.replace(tmp_path, output_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        # File sementara dari proses yang gagal tidak ditinggalkan
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return n_rows, n_invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediksi IR DBD secara batch dari file CSV/Parquet")
+    parser.add_argument('input', help="File CSV/Parquet berisi baris fitur")
+    parser.add_argument('-o', '--output', required=True, help="File hasil (.csv atau .parquet)")
+    parser.add_argument('--model', default=None, help="Artefak model (direktori array datar atau .pkl)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Jumlah baris per potongan")
+    parser.add_argument('--uncertainty', action='store_true',
+                        help="Tambahkan interval prediksi 5-95%% dan peluang IR > 50 / > 20 dari sebaran antar pohon")
+    args = parser.parse_args(argv)
+
+    n_rows, n_invalid = run(args.input, args.output, args.model, args.chunk_size, args.uncertainty)
+    print(f"Prediksi selesai: {n_rows} baris -> {args.output}")
+    if n_invalid:
+        print(f"Peringatan: {n_invalid} baris tidak diprediksi karena fitur kosong/non-numerik (lihat kolom {INVALID_COLUMN})")
+
+
+if __name__ == '__main__':
+    main()
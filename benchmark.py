@@ -0,0 +1,269 @@
+"""
+Benchmark tahapan proyek DBD: build data, training, pemuatan artefak, dan
+latensi rerun dashboard.
+
+Tahapan:
+    pipeline_{n}x   merge CSV mentah -> tabel dashboard (pipeline.build) pada
+                    data mentah yang diperbanyak n kali (wilayah diduplikasi)
+    fit_robust      fit RandomForestRegressor konfigurasi robust notebook
+    load_joblib     joblib.load bundle model (.pkl)
+    load_flat       pemuatan bundle array datar (memory-mapped)
+    app_cold        run pertama app.py via Streamlit AppTest
+    app_rerun       rerun app.py untuk setiap wilayah di selectbox
+
+Hasil ditulis sebagai JSON (durasi setiap ulangan + median per tahap) dan bisa
+dibandingkan dengan baseline: tahap yang median-nya melebihi baseline lebih
+dari toleransi dilaporkan sebagai regresi dan skrip keluar dengan kode 1.
+
+Pemakaian:
+    python benchmark.py --save-baseline                 # rekam baseline
+    python benchmark.py --baseline benchmark_baseline.json
+    python benchmark.py --stages pipeline fit_robust --scales 1 10
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.ensemble import RandomForestRegressor
+
+import pipeline
+from backtest import ROBUST_PARAMS
+from experiments import FEATURE_SETS, TARGET, default_data_path, read_table
+from forest_arrays import MODEL_DIR, MODEL_PICKLE, load_bundle
+from regions import REGISTRY_FILE, registry_path
+
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+STAGES = ['pipeline', 'fit_robust', 'load_joblib', 'load_flat', 'app']
+DEFAULT_SCALES = [1, 10, 100]
+DEFAULT_TOLERANCE = 0.25
+
+
+# ============================================================================
+# UTILITAS
+# ============================================================================
+def time_call(func, repeat=3):
+    """Jalankan func sebanyak repeat kali; kembalikan daftar durasi (detik)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations, **extra):
+    """Ringkasan satu tahap: median, min, p95, dan seluruh durasi"""
+    values = np.asarray(durations)
+    return dict({
+        'median_s': float(np.median(values)),
+        'min_s': float(values.min()),
+        'p95_s': float(np.percentile(values, 95)),
+        'runs_s': [round(float(v), 6) for v in values],
+    }, **extra)
+
+
+def environment_info():
+    """Informasi lingkungan agar hasil antar mesin tidak dibandingkan secara keliru"""
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+# ============================================================================
+# TAHAP 1: PIPELINE PADA DATA YANG DIPERBANYAK
+# ============================================================================
+def write_scaled_sources(data_dir, out_dir, scale):
+    """Tulis salinan CSV mentah & registry dengan setiap wilayah diduplikasi `scale` kali (nama diberi akhiran)"""
+    os.makedirs(out_dir, exist_ok=True)
+    for spec in pipeline.SOURCES.values():
+        df = pd.read_csv(os.path.join(data_dir, spec['file']))
+        # Nama kolom wilayah di file mentah (sebelum rename)
+        area_col = {new: old for old, new in spec['rename'].items()}.get('Kabupaten/Kota', 'Kabupaten/Kota')
+        copies = [df]
+        for k in range(1, scale):
+            copy = df.copy()
+            copy[area_col] = copy[area_col].astype(str) + f' r{k}'
+            copies.append(copy)
+        pd.concat(copies, ignore_index=True).to_csv(os.path.join(out_dir, spec['file']), index=False)
+
+    # Registry wilayah ikut diperbanyak agar wilayah salinan cocok persis (bukan fuzzy ke wilayah asli)
+    registry = pd.read_csv(registry_path(data_dir), dtype={'kode_wilayah': str})
+    copies = [registry]
+    for k in range(1, scale):
+        copy = registry.copy()
+        copy['kode_wilayah'] = copy['kode_wilayah'] + f'-r{k}'
+        copy['nama'] = copy['nama'] + f' r{k}'
+        copies.append(copy)
+    pd.concat(copies, ignore_index=True).to_csv(os.path.join(out_dir, REGISTRY_FILE), index=False)
+
+
+def bench_pipeline(data_dir='.', scales=DEFAULT_SCALES, repeat=3):
+    """Durasi build penuh (tanpa cache) pada setiap skala data mentah"""
+    results = {}
+    for scale in scales:
+        work_dir = tempfile.mkdtemp(prefix=f'dbd_bench_{scale}x_')
+        try:
+            write_scaled_sources(data_dir, work_dir, scale)
+            rows = {}
+
+            def build():
+                df_final = pipeline.build(work_dir, work_dir, os.path.join(work_dir, 'cache'), force=True, verbose=False)
+                rows['n'] = len(df_final)
+
+            durations = time_call(build, repeat)
+            results[f'pipeline_{scale}x'] = summarize(durations, rows=rows['n'])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
+# ============================================================================
+# TAHAP 2-3: TRAINING & PEMUATAN ARTEFAK
+# ============================================================================
+def bench_fit(data_path=None, repeat=3):
+    """Durasi fit RandomForestRegressor dengan hyperparameter model robust"""
+    df = read_table(data_path or default_data_path())
+    X, y = df[FEATURE_SETS['robust']], df[TARGET]
+    durations = time_call(lambda: RandomForestRegressor(**ROBUST_PARAMS).fit(X, y), repeat)
+    return {'fit_robust': summarize(durations, rows=len(df), params=ROBUST_PARAMS)}
+
+
+def bench_load(repeat=5):
+    """Durasi joblib.load bundle .pkl dan pemuatan bundle array datar (bila artefak ada)"""
+    results = {}
+    if os.path.exists(MODEL_PICKLE):
+        results['load_joblib'] = summarize(time_call(lambda: joblib.load(MODEL_PICKLE), repeat))
+    if os.path.isdir(MODEL_DIR):
+        results['load_flat'] = summarize(time_call(lambda: load_bundle(MODEL_DIR), repeat))
+    return results
+
+
+# ============================================================================
+# TAHAP 4: RERUN DASHBOARD PER WILAYAH
+# ============================================================================
+def bench_app(app_path='app.py', timeout=120):
+    """Run pertama app.py lalu satu rerun untuk setiap wilayah di selectbox (Streamlit AppTest)"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.abspath(app_path), default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app.py gagal dijalankan: {at.exception[0].message}")
+
+    regions = list(at.selectbox[0].options)
+    durations = []
+    for region in regions:
+        start = time.perf_counter()
+        at.selectbox[0].set_value(region).run()
+        durations.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(f"app.py gagal untuk wilayah {region}: {at.exception[0].message}")
+
+    return {
+        'app_cold': summarize([cold]),
+        'app_rerun': summarize(durations, regions=len(regions)),
+    }
+
+
+# ============================================================================
+# BASELINE
+# ============================================================================
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Bandingkan median setiap tahap dengan baseline; kembalikan tabel perbandingan"""
+    rows = []
+    for stage, current in results['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if base is None:
+            rows.append({'tahap': stage, 'baseline_s': np.nan, 'sekarang_s': current['median_s'],
+                         'rasio': np.nan, 'status': 'baru'})
+            continue
+        ratio = current['median_s'] / base['median_s'] if base['median_s'] > 0 else np.inf
+        rows.append({
+            'tahap': stage,
+            'baseline_s': base['median_s'],
+            'sekarang_s': current['median_s'],
+            'rasio': ratio,
+            'status': 'REGRESI' if ratio > 1 + tolerance else 'ok',
+        })
+    return pd.DataFrame(rows)
+
+
+def run(stages=STAGES, scales=DEFAULT_SCALES, repeat=3, data_dir='.', data_path=None):
+    """Jalankan tahap yang dipilih dan kembalikan hasil lengkap (siap ditulis sebagai JSON)"""
+    results = {}
+    if 'pipeline' in stages:
+        results.update(bench_pipeline(data_dir, scales, repeat))
+    if 'fit_robust' in stages:
+        results.update(bench_fit(data_path, repeat))
+    if 'load_joblib' in stages or 'load_flat' in stages:
+        loaded = bench_load(max(repeat, 5))
+        results.update({name: value for name, value in loaded.items() if name in stages})
+    if 'app' in stages:
+        results.update(bench_app())
+    return {'environment': environment_info(), 'repeat': repeat, 'stages': results}
+
+
+def _write_json(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline, training, pemuatan model, dan dashboard DBD")
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES, help="Tahap yang dijalankan")
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES, help="Faktor perbanyakan data mentah")
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah ulangan per tahap")
+    parser.add_argument('--data-dir', default='.', help="Direktori CSV mentah")
+    parser.add_argument('--data', default=None, help="Tabel master untuk tahap fit (CSV/Parquet)")
+    parser.add_argument('--output', default=RESULTS_FILE, help="File JSON hasil")
+    parser.add_argument('--baseline', default=None, help="File JSON baseline untuk perbandingan")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Kenaikan median maksimum terhadap baseline (0.25 = 25%%)")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Simpan hasil juga sebagai {BASELINE_FILE}")
+    args = parser.parse_args(argv)
+
+    results = run(args.stages, args.scales, args.repeat, args.data_dir, args.data)
+    _write_json(args.output, results)
+    if args.save_baseline:
+        _write_json(BASELINE_FILE, results)
+
+    summary = pd.DataFrame([
+        {'tahap': stage, 'median_s': r['median_s'], 'min_s': r['min_s'], 'p95_s': r['p95_s']}
+        for stage, r in results['stages'].items()
+    ])
+    print(summary.to_string(index=False))
+    print(f"Hasil -> {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        comparison = compare(results, baseline, args.tolerance)
+        print(comparison.to_string(index=False))
+        if (comparison['status'] == 'REGRESI').any():
+            print(f"Regresi terdeteksi (toleransi {args.tolerance:.0%})")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
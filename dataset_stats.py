@@ -0,0 +1,99 @@
+"""
+Statistik dataset untuk dashboard (rata-rata, kuantil, dan feature importance).
+
+Statistik dihitung sekali per pasangan (versi data, versi model) lalu disimpan
+sebagai JSON di `.stats_cache/`. Kunci cache adalah fingerprint isi artefak,
+sehingga begitu tabel master atau model baru di-deploy, statistik otomatis
+dihitung ulang tanpa perlu menghapus cache secara manual.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from pipeline import fingerprint
+
+CACHE_DIR = '.stats_cache'
+STATS_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+
+def _artifact_files(path):
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    return [path]
+
+
+def artifact_version(path):
+    """Token versi murah (ukuran + mtime) untuk file atau direktori artefak"""
+    parts = []
+    for file_path in _artifact_files(path):
+        stat = os.stat(file_path)
+        parts.append(f"{os.path.basename(file_path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def content_version(path):
+    """Fingerprint isi (SHA-256) untuk file atau direktori artefak"""
+    digest = hashlib.sha256()
+    for file_path in _artifact_files(path):
+        digest.update(os.path.basename(file_path).encode())
+        digest.update(fingerprint(file_path).encode())
+    return digest.hexdigest()[:16]
+
+
+def compute_stats(df, features, model):
+    """Hitung rata-rata, kuantil, dan importance setiap fitur (abaikan nilai non-numerik/NaN)"""
+    values = df[features].apply(lambda x: pd.to_numeric(x, errors='coerce'))
+    return {
+        'means': values.mean(),
+        'quantiles': values.quantile(STATS_QUANTILES),
+        'importances': pd.Series(model.feature_importances_, index=features),
+    }
+
+
+def stats_to_json(stats):
+    """Statistik -> dict JSON (juga dipakai untuk snapshot layanan prediksi)"""
+    return {
+        'means': stats['means'].to_dict(),
+        'quantiles': {str(q): row.to_dict() for q, row in stats['quantiles'].iterrows()},
+        'importances': stats['importances'].to_dict(),
+    }
+
+
+def stats_from_json(payload, features):
+    quantiles = pd.DataFrame.from_dict(payload['quantiles'], orient='index')
+    quantiles.index = quantiles.index.astype(float)
+    return {
+        'means': pd.Series(payload['means'])[features],
+        'quantiles': quantiles[features],
+        'importances': pd.Series(payload['importances'])[features],
+    }
+
+
+def load_stats(df, features, model, data_path, model_path, cache_dir=CACHE_DIR):
+    """Ambil statistik dari cache untuk versi data & model saat ini, atau hitung dan simpan"""
+    data_version = content_version(data_path)
+    model_version = content_version(model_path)
+    cache_path = os.path.join(cache_dir, f"stats_{data_version}_{model_version}.json")
+
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            payload = json.load(f)
+        if payload.get('features') == list(features):
+            stats = stats_from_json(payload, features)
+            stats.update(data_version=data_version, model_version=model_version)
+            return stats
+
+    stats = compute_stats(df, features, model)
+    payload = stats_to_json(stats)
+    payload.update(features=list(features), data_version=data_version, model_version=model_version)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, cache_path)
+
+    stats.update(data_version=data_version, model_version=model_version)
+    return stats
@@ -0,0 +1,251 @@
+"""
+Runner eksperimen Random Forest: grid rasio split x hyperparameter.
+
+Menggantikan loop pelatihan di DBD.ipynb (rasio 70:30/80:20/90:10 dan model
+robust 1000 pohon). Setiap konfigurasi dijalankan paralel di process pool;
+jumlah worker disesuaikan dengan `n_jobs` per model agar jumlah thread tidak
+melebihi jumlah core. Model dan skor disimpan di `.experiment_cache/` dengan
+kunci (konfigurasi + fingerprint data), sehingga konfigurasi yang sudah pernah
+dilatih pada data yang sama tidak dilatih ulang (skor disimpan terpisah sebagai
+JSON kecil agar leaderboard bisa disusun tanpa memuat model).
+
+Pemakaian:
+    python experiments.py                      # jalankan grid default, tulis leaderboard
+    python experiments.py --grid grid.json     # grid kustom (dict nama_param -> daftar nilai)
+    python experiments.py --export-bundle      # daftarkan model terbaik ke registry (belum aktif)
+    python experiments.py --export-bundle --promote   # daftarkan & langsung aktifkan di dashboard
+
+Model terbaik tidak lagi menimpa model_robust_forest: bundle didaftarkan ke
+registry model (registry.py) beserta hash data training yang dipakai grid.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from feature_store import FEATURE_COLUMNS, attach_features, load_store, sources_hash
+from spatial import SPATIAL_COLUMNS
+
+CACHE_DIR = '.experiment_cache'
+LEADERBOARD_FILE = 'experiment_leaderboard.csv'
+TARGET = 'IR_DBD_per_100k'
+
+FEATURE_SETS = {
+    # Fitur ekologis murni (model rasio split di notebook)
+    'ekologis': ['curah_hujan_mm', 'timbulan_sampah_ton', 'kepadatan_penduduk_km2', 'akses_sanitasi_layak_persen'],
+    # Fitur model robust (dengan lag IR tahun lalu)
+    'robust': ['IR_tahun_lalu', 'kepadatan_penduduk_km2', 'curah_hujan_mm', 'akses_sanitasi_layak_persen'],
+    # Fitur robust + fitur deret waktu dari feature store (lag IR, jendela bergulir, hari hujan)
+    'deret_waktu': ['IR_tahun_lalu', 'kepadatan_penduduk_km2', 'curah_hujan_mm', 'akses_sanitasi_layak_persen']
+                   + FEATURE_COLUMNS,
+    # Fitur robust + spatial lag wilayah tetangga (IR tahun lalu & curah hujan tetangga)
+    'spasial': ['IR_tahun_lalu', 'kepadatan_penduduk_km2', 'curah_hujan_mm', 'akses_sanitasi_layak_persen']
+               + SPATIAL_COLUMNS,
+}
+
+DEFAULT_GRID = {
+    'feature_set': ['ekologis', 'robust', 'deret_waktu', 'spasial'],
+    'test_size': [0.3, 0.2, 0.1],
+    'n_estimators': [100, 1000],
+    'max_depth': [None, 5],
+    'min_samples_leaf': [1, 5],
+    'random_state': [42],
+}
+
+_worker_data = {}
+
+
+def default_data_path():
+    """Tabel master default (Parquet bila ada, jika tidak CSV)"""
+    return 'df_final_dashboard.parquet' if os.path.exists('df_final_dashboard.parquet') else 'df_final_dashboard.csv'
+
+
+def read_table(path):
+    """Baca tabel master dari CSV atau Parquet"""
+    return pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+
+
+def read_training_table(path):
+    """Tabel master + fitur deret waktu dari feature store (sama dengan yang dibaca dashboard)"""
+    return attach_features(read_table(path), load_store(path))
+
+
+def expand_grid(grid):
+    """Semua kombinasi nilai grid sebagai daftar dict konfigurasi"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def config_key(config, data_hash):
+    """Kunci cache untuk satu konfigurasi pada versi data tertentu"""
+    payload = json.dumps(config, sort_keys=True) + data_hash
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def resolve_workers(n_jobs, n_tasks, n_jobs_per_model=1):
+    """Jumlah proses worker sehingga worker x thread per model tidak melebihi core"""
+    n_cpus = os.cpu_count() or 1
+    budget = n_cpus if n_jobs in (None, -1) else min(n_jobs, n_cpus)
+    return max(1, min(n_tasks, budget // max(1, n_jobs_per_model)))
+
+
+def evaluate(model, X_train, X_test, y_train, y_test):
+    """Metrik dengan kunci yang sama seperti bundle['metrics'] di dashboard"""
+    train_r2 = r2_score(y_train, model.predict(X_train))
+    y_pred = model.predict(X_test)
+    test_r2 = r2_score(y_test, y_pred)
+    return {
+        'train_r2': train_r2,
+        'test_r2': test_r2,
+        'gap': abs(train_r2 - test_r2),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': float(np.sqrt(mean_squared_error(y_test, y_pred))),
+    }
+
+
+def _init_worker(data_path):
+    # Data dibaca sekali per proses worker, bukan sekali per konfigurasi
+    _worker_data['df'] = read_training_table(data_path)
+
+
+def _write_atomic(path, write):
+    tmp_path = path + '.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, payload):
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+
+def run_config(config, cache_path, n_jobs_per_model=1):
+    """Latih dan evaluasi satu konfigurasi, lalu simpan model (.joblib) & skor (.json) ke cache"""
+    df = _worker_data['df']
+    features = FEATURE_SETS[config['feature_set']]
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[features], df[TARGET], test_size=config['test_size'], random_state=config['random_state']
+    )
+    model = RandomForestRegressor(
+        n_estimators=config['n_estimators'],
+        max_depth=config['max_depth'],
+        min_samples_leaf=config['min_samples_leaf'],
+        random_state=config['random_state'],
+        n_jobs=n_jobs_per_model,
+    )
+    model.fit(X_train, y_train)
+    result = {'config': config, 'features': features, 'metrics': evaluate(model, X_train, X_test, y_train, y_test)}
+
+    # Model ditulis lebih dulu; file skor menandakan entri cache lengkap
+    _write_atomic(cache_path + '.joblib', lambda path: joblib.dump(model, path))
+    _write_atomic(cache_path + '.json', lambda path: _write_json(path, result))
+    return result
+
+
+def run_grid(grid=None, data_path=None, n_jobs=-1, n_jobs_per_model=1, cache_dir=CACHE_DIR, verbose=True):
+    """Jalankan seluruh grid (paralel, dengan cache) dan kembalikan leaderboard"""
+    log = print if verbose else (lambda *args, **kwargs: None)
+    data_path = data_path or default_data_path()
+    # Versi data mencakup tabel master dan sumber hari hujan (masukan feature store)
+    data_hash = sources_hash(data_path)
+    # Store dibangun (bila perlu) sekali di proses utama; worker cukup membacanya
+    load_store(data_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    results, pending = [], []
+    for config in expand_grid(grid or DEFAULT_GRID):
+        cache_path = os.path.join(cache_dir, config_key(config, data_hash))
+        if os.path.exists(cache_path + '.json'):
+            with open(cache_path + '.json') as f:
+                results.append(json.load(f))
+        else:
+            pending.append((config, cache_path))
+
+    log(f"{len(results)} konfigurasi dari cache, {len(pending)} dilatih")
+    if pending:
+        # Konfigurasi terbesar dijadwalkan lebih dulu agar worker selesai hampir bersamaan
+        pending.sort(key=lambda item: item[0]['n_estimators'], reverse=True)
+        workers = resolve_workers(n_jobs, len(pending), n_jobs_per_model)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+            futures = [pool.submit(run_config, config, path, n_jobs_per_model) for config, path in pending]
+            results.extend(future.result() for future in futures)
+
+    # Hash data ikut di leaderboard agar bundle yang diekspor tahu versi data training-nya
+    leaderboard = pd.DataFrame([
+        dict(r['config'], **r['metrics'], cache_key=config_key(r['config'], data_hash), data_hash=data_hash)
+        for r in results
+    ])
+    leaderboard = leaderboard.sort_values(['test_r2', 'gap'], ascending=[False, True]).reset_index(drop=True)
+    return leaderboard
+
+
+def best_metrics(leaderboard, rank=0):
+    """Dict metrics (train_r2, test_r2, gap, mae, rmse) dari baris leaderboard untuk bundle"""
+    row = leaderboard.iloc[rank]
+    return {key: round(float(row[key]), 4) for key in ('train_r2', 'test_r2', 'gap', 'mae', 'rmse')}
+
+
+def export_best_bundle(leaderboard, data_path=None, cache_dir=CACHE_DIR, rank=0, note='', promote=False):
+    """Daftarkan model peringkat `rank` ke registry model (opsional langsung dipromosikan); kembalikan metadatanya
+
+    Dashboard dan layanan hanya berpindah ke model ini setelah versi tersebut
+    dipromosikan (registry.promote), sehingga artefak yang sedang dipakai tidak
+    pernah ditimpa.
+    """
+    # Impor lokal: registry memakai default_data_path dari modul ini
+    import registry
+
+    row = leaderboard.iloc[rank]
+    cache_path = os.path.join(cache_dir, row['cache_key'])
+    with open(cache_path + '.json') as f:
+        result = json.load(f)
+    bundle = {
+        'model': joblib.load(cache_path + '.joblib'),
+        'features': result['features'],
+        'metrics': best_metrics(leaderboard, rank),
+        'data_hash': row['data_hash'],
+    }
+    record = registry.register(bundle, data_path, note or f"experiments {row['cache_key']}")
+    if promote:
+        registry.promote(record['version'])
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Jalankan grid eksperimen Random Forest DBD")
+    parser.add_argument('--data', default=None, help="Tabel master (CSV/Parquet)")
+    parser.add_argument('--grid', default=None, help="File JSON grid: {nama_param: [nilai, ...]}")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Total core yang boleh dipakai (-1 = semua)")
+    parser.add_argument('--n-jobs-per-model', type=int, default=1, help="Thread per model (n_jobs RandomForest)")
+    parser.add_argument('--output', default=LEADERBOARD_FILE, help="File CSV leaderboard")
+    parser.add_argument('--export-bundle', action='store_true', help="Daftarkan model terbaik ke registry model")
+    parser.add_argument('--promote', action='store_true', help="Langsung aktifkan model yang didaftarkan (dengan --export-bundle)")
+    args = parser.parse_args(argv)
+
+    grid = None
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    leaderboard = run_grid(grid, args.data, args.n_jobs, args.n_jobs_per_model)
+    leaderboard.to_csv(args.output, index=False)
+    print(leaderboard.head(10).to_string(index=False))
+    print(f"Leaderboard -> {args.output}")
+
+    if args.export_bundle:
+        record = export_best_bundle(leaderboard, args.data, promote=args.promote)
+        status = 'aktif' if args.promote else "belum aktif, python registry.py promote " + record['version']
+        print(f"Model terbaik terdaftar sebagai {record['version']} ({status}; metrics: {record['metrics']})")
+
+
+if __name__ == '__main__':
+    main()
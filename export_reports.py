@@ -0,0 +1,369 @@
+"""
+Ekspor brief mitigasi DBD per wilayah (HTML siap cetak/PDF) untuk seluruh
+wilayah dalam satu kali jalan.
+
+Isi brief sama dengan tab PREDIKSI & REKOMENDASI dan ANALISIS VARIABEL di
+dashboard: kartu risiko (prediksi, interval, peluang melewati batas risiko),
+daftar tindakan sesuai status risiko, dan saran `get_variable_recommendation`
+untuk 5 variabel dengan kontribusi terbesar. Teks rekomendasi diambil dari
+modul yang sama dengan dashboard (recommendations.py).
+
+- prediksi, interval, dan kontribusi TreeSHAP diambil dari aset yang sudah
+  dihitung (service.build_assets), tidak ada prediksi ulang per wilayah;
+- stylesheet ditulis sekali ke direktori output dan template dikirim sekali
+  ke setiap worker (initializer pool), bukan per wilayah;
+- wilayah dibagi menjadi potongan dan dirender paralel di ProcessPoolExecutor;
+  setiap worker langsung menulis brief-nya (atomik) dan hanya mengembalikan
+  ringkasan kecil, sehingga memori tidak tumbuh dengan jumlah wilayah;
+- index.html berisi daftar seluruh brief, diurutkan menurut prediksi IR;
+- wilayah dengan data fitur tidak lengkap (tanpa prediksi) dilewati dan
+  dilaporkan di akhir.
+
+Grafik kontribusi berupa batang HTML/CSS tanpa JavaScript sehingga brief
+bisa langsung dicetak ke PDF dari browser (Ctrl+P, satu wilayah satu halaman).
+
+Pemakaian:
+    python export_reports.py                              # brief/ untuk semua wilayah
+    python export_reports.py --n-jobs 4 --output-dir brief_2024
+    python export_reports.py --regions kudus "kota semarang"
+"""
+import argparse
+import html
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+from string import Template
+
+import numpy as np
+
+from attribution import contribution_direction
+from batch_predict import INVALID_COLUMN
+from experiments import resolve_workers
+from recommendations import (
+    DIRECTION_STATUS, MISSING_STATUS, STATUS_ACTIONS, format_feature_value, format_number,
+    get_variable_recommendation, missing_recommendation,
+)
+from risk import HIGH_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD, RISK_DISPLAY
+from service import build_assets, resolve_artifact_paths
+from uncertainty import INTERVAL, confidence_label
+
+OUTPUT_DIR = 'brief'
+STYLE_FILE = 'brief.css'
+TOP_FEATURES = 5
+CHUNK_SIZE = 16
+
+# Warna kartu risiko (sama dengan kelas CSS kartu di dashboard)
+RISK_COLORS = {
+    'high-risk': '#ef4444',
+    'med-risk': '#f59e0b',
+    'low-risk': '#10b981',
+}
+
+STYLE = """
+body { font-family: 'Segoe UI', Arial, sans-serif; color: #1e293b; margin: 2rem auto; max-width: 860px; }
+h1 { margin-bottom: 0; }
+.sub { color: #64748b; margin-top: 0.2rem; }
+.card { border-radius: 12px; padding: 1.2rem 1.5rem; color: white; margin: 1.2rem 0; }
+.card .ir { font-size: 3.5rem; font-weight: bold; margin: 0.3rem 0; }
+.grid { display: flex; gap: 0.8rem; flex-wrap: wrap; }
+.metric { flex: 1; min-width: 140px; border: 1px solid #e2e8f0; border-radius: 10px; padding: 0.6rem 0.8rem; }
+.metric .label { font-size: 0.8rem; color: #64748b; }
+.metric .value { font-size: 1.2rem; font-weight: bold; }
+.status { border-left: 6px solid; padding: 0.4rem 1rem; margin: 1rem 0; background: #f8fafc; }
+.bar-row { display: flex; align-items: center; gap: 0.6rem; margin: 0.3rem 0; font-size: 0.9rem; }
+.bar-row .name { width: 230px; }
+.bar-row .track { flex: 1; background: #f1f5f9; border-radius: 4px; height: 18px; }
+.bar-row .bar { height: 18px; border-radius: 4px; }
+.bar-row .num { width: 60px; text-align: right; }
+.variable { border-left: 4px solid; padding: 0.5rem 1rem; margin: 0.8rem 0; background: #f8fafc; }
+.foot { color: #94a3b8; font-size: 0.8rem; margin-top: 2rem; }
+table { border-collapse: collapse; width: 100%; }
+td, th { border-bottom: 1px solid #e2e8f0; padding: 0.4rem; text-align: left; }
+@media print { body { margin: 0; } .card, .status, .variable, .bar { -webkit-print-color-adjust: exact; print-color-adjust: exact; } }
+"""
+
+BRIEF_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>Brief Mitigasi DBD - $region</title>
+<link rel="stylesheet" href="$style">
+</head>
+<body>
+<h1>🏥 Brief Mitigasi DBD</h1>
+<p class="sub">$region • data tahun $year • dibuat $generated</p>
+
+<div class="card" style="background: $risk_color;">
+  <div>$risk_icon PREDIKSI INDEKS MORBIDITAS</div>
+  <div class="ir">$pred_ir</div>
+  <div><strong>$risk_label</strong> • per 100.000 penduduk • interval $interval_width%: $pi_low – $pi_high</div>
+</div>
+
+<div class="grid">
+$metrics
+</div>
+
+<h2>🛡️ Rekomendasi Strategis Utama</h2>
+<div class="status" style="border-color: $risk_color;">
+  <h3>$status_title</h3>
+  <ol>
+$status_steps
+  </ol>
+</div>
+
+<h2>📊 Kontribusi Variabel terhadap Prediksi</h2>
+$bars
+<p class="sub">Nilai dasar model $base_value + total kontribusi $total_contribution = prediksi $pred_ir • merah menaikkan prediksi • hijau menurunkan prediksi</p>
+
+<h2>💡 Rekomendasi Spesifik per Variabel</h2>
+$variables
+
+<p class="foot">$model_info</p>
+</body>
+</html>
+""")
+
+INDEX_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="id">
+<head>
+<meta charset="utf-8">
+<title>Brief Mitigasi DBD - Semua Wilayah</title>
+<link rel="stylesheet" href="$style">
+</head>
+<body>
+<h1>🏥 Brief Mitigasi DBD</h1>
+<p class="sub">$n_regions wilayah • dibuat $generated</p>
+<table>
+<tr><th>#</th><th>Wilayah</th><th>Prediksi IR</th><th>Status</th></tr>
+$rows
+</table>
+</body>
+</html>
+""")
+
+_worker = {}
+
+
+# ============================================================================
+# RENDER
+# ============================================================================
+def inline_markdown(text):
+    """Escape HTML lalu ubah **tebal** menjadi <strong>"""
+    return re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html.escape(str(text)))
+
+
+def brief_filename(region):
+    """Nama file brief untuk satu wilayah ('kota semarang' -> 'kota-semarang.html')"""
+    return re.sub(r'[^a-z0-9]+', '-', str(region).lower()).strip('-') + '.html'
+
+
+def _metric(label, value):
+    return (f'<div class="metric"><div class="label">{html.escape(label)}</div>'
+            f'<div class="value">{html.escape(str(value))}</div></div>')
+
+
+def _bars(top):
+    scale = max(max(abs(item['kontribusi']) for item in top), 1e-9)
+    rows = []
+    for item in top:
+        color = '#ef4444' if item['kontribusi'] > 0 else '#10b981'
+        width = 100 * abs(item['kontribusi']) / scale
+        rows.append(
+            f'<div class="bar-row"><div class="name">{html.escape(item["variabel"])}</div>'
+            f'<div class="track"><div class="bar" style="width: {width:.1f}%; background: {color};"></div></div>'
+            f'<div class="num">{item["kontribusi"]:+.1f}</div></div>'
+        )
+    return '\n'.join(rows)
+
+
+def _variables(top, means):
+    blocks = []
+    for item in top:
+        feature, value = item['fitur'], item['nilai']
+        direction = contribution_direction(item['kontribusi'])
+        status, color = MISSING_STATUS if np.isnan(value) else DIRECTION_STATUS[direction]
+        advice = (missing_recommendation(item['variabel']) if np.isnan(value)
+                  else get_variable_recommendation(feature, direction))
+        blocks.append(
+            f'<div class="variable" style="border-color: {color};">'
+            f'<h3>🔍 {html.escape(item["variabel"])} (Kontribusi: {item["kontribusi"]:+.1f} IR)</h3>'
+            f'<p>Nilai saat ini: <strong>{html.escape(format_feature_value(feature, value))}</strong> • '
+            f'{inline_markdown(status)} • rata-rata: {html.escape(format_number(means[feature]))}</p>'
+            f'<p>{inline_markdown(advice)}</p></div>'
+        )
+    return '\n'.join(blocks)
+
+
+def render_brief(region, context):
+    """HTML brief satu wilayah dari ringkasan wilayah (dict) dan konteks bersama"""
+    risk_class, risk_label, risk_icon = RISK_DISPLAY[region['kelas_risiko']]
+    status = STATUS_ACTIONS[region['kelas_risiko']]
+    metrics = [
+        _metric(f"Peluang IR > {HIGH_RISK_THRESHOLD}",
+                f"{region['prob_di_atas_50'] * 100:.0f}% ({confidence_label(region['prob_di_atas_50'])})"),
+        _metric(f"Peluang IR > {MEDIUM_RISK_THRESHOLD}",
+                f"{region['prob_di_atas_20'] * 100:.0f}% ({confidence_label(region['prob_di_atas_20'])})"),
+        _metric("Jumlah Penduduk", format_number(region['penduduk_ribu'], is_population=True)),
+        _metric("Kasus DBD", format_number(region['kasus_dbd'])),
+        _metric("Kepadatan", f"{format_number(region['kepadatan_penduduk_km2'])} jiwa/km²"),
+        _metric("Sanitasi Layak", format_feature_value('akses_sanitasi_layak_persen', region['akses_sanitasi_layak_persen'])),
+    ]
+    return BRIEF_TEMPLATE.substitute(
+        region=html.escape(region['Kabupaten/Kota']),
+        year=region['Tahun'],
+        generated=context['generated'],
+        style=STYLE_FILE,
+        risk_color=RISK_COLORS[risk_class],
+        risk_icon=risk_icon,
+        risk_label=html.escape(risk_label),
+        pred_ir=f"{region['pred_ir']:.1f}",
+        interval_width=INTERVAL[1] - INTERVAL[0],
+        pi_low=f"{region['pi_bawah']:.1f}",
+        pi_high=f"{region['pi_atas']:.1f}",
+        metrics='\n'.join(metrics),
+        status_title=html.escape(status['judul']),
+        status_steps='\n'.join(f"    <li>{inline_markdown(step)}</li>" for step in status['langkah']),
+        bars=_bars(region['top']),
+        base_value=f"{context['base_value']:.1f}",
+        total_contribution=f"{region['total_kontribusi']:+.1f}",
+        variables=_variables(region['top'], context['means']),
+        model_info=html.escape(context['model_info']),
+    )
+
+
+def _write_atomic(path, text):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# EKSPOR PARALEL
+# ============================================================================
+def region_summaries(assets, regions=None, top_n=TOP_FEATURES):
+    """Ringkasan kecil per wilayah (nilai Python murni) berisi prediksi & top-n kontribusi"""
+    df_prediksi = assets['df_prediksi']
+    features = assets['bundle']['features']
+    if regions is not None:
+        df_prediksi = df_prediksi.loc[list(regions)]
+    # Tanpa prediksi tidak ada kartu risiko maupun kontribusi untuk dirender
+    df_prediksi = df_prediksi[df_prediksi[INVALID_COLUMN] == '']
+    contributions = assets['explanations']['contributions'].loc[df_prediksi.index, features].to_numpy()
+    values = df_prediksi[features].to_numpy(np.float64)
+    # Urutan variabel per wilayah menurut |kontribusi|, untuk seluruh wilayah sekaligus
+    top = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :top_n]
+
+    columns = ['Kabupaten/Kota', 'Tahun', 'pred_ir', 'kelas_risiko', 'pi_bawah', 'pi_atas', 'prob_di_atas_50',
+               'prob_di_atas_20', 'penduduk_ribu', 'kasus_dbd', 'kepadatan_penduduk_km2', 'akses_sanitasi_layak_persen']
+    records = df_prediksi[columns].to_dict('records')
+    for i, record in enumerate(records):
+        record['total_kontribusi'] = float(contributions[i].sum())
+        record['top'] = [{
+            'fitur': features[j],
+            'variabel': features[j].replace('_', ' ').title(),
+            'kontribusi': float(contributions[i, j]),
+            'nilai': float(values[i, j]),
+        } for j in top[i]]
+    return records
+
+
+def _init_worker(out_dir, context):
+    # Konteks bersama (rata-rata fitur, nilai dasar, info model) dikirim sekali per proses
+    _worker['out_dir'] = out_dir
+    _worker['context'] = context
+
+
+def render_chunk(regions):
+    """Render & tulis brief untuk satu potongan wilayah; kembalikan baris ringkas untuk index"""
+    rows = []
+    for region in regions:
+        filename = brief_filename(region['Kabupaten/Kota'])
+        _write_atomic(os.path.join(_worker['out_dir'], filename), render_brief(region, _worker['context']))
+        rows.append((region['Kabupaten/Kota'], filename, region['pred_ir'], region['kelas_risiko']))
+    return rows
+
+
+def write_index(rows, out_dir, generated):
+    """index.html: daftar brief seluruh wilayah, prediksi IR tertinggi di atas"""
+    rows = sorted(rows, key=lambda row: -row[2])
+    body = '\n'.join(
+        f'<tr><td>{i}</td><td><a href="{filename}">{html.escape(region)}</a></td>'
+        f'<td>{pred:.1f}</td><td>{html.escape(RISK_DISPLAY[level][1])}</td></tr>'
+        for i, (region, filename, pred, level) in enumerate(rows, 1)
+    )
+    _write_atomic(os.path.join(out_dir, 'index.html'),
+                  INDEX_TEMPLATE.substitute(style=STYLE_FILE, n_regions=len(rows), generated=generated, rows=body))
+
+
+def export_briefs(assets, out_dir=OUTPUT_DIR, regions=None, n_jobs=-1, chunk_size=CHUNK_SIZE, verbose=True):
+    """Tulis brief HTML semua wilayah (paralel per potongan) beserta stylesheet dan index.html"""
+    os.makedirs(out_dir, exist_ok=True)
+    _write_atomic(os.path.join(out_dir, STYLE_FILE), STYLE)
+
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M')
+    bundle = assets['bundle']
+    context = {
+        'generated': generated,
+        'base_value': float(assets['explanations']['base_value']),
+        'means': {f: float(assets['stats']['means'][f]) for f in bundle['features']},
+        'model_info': (f"Model Random Forest {bundle['model'].n_estimators} pohon • "
+                       f"R² uji {bundle['metrics']['test_r2'] * 100:.1f}% • versi model {assets['stats']['model_version']}"),
+    }
+
+    summaries = region_summaries(assets, regions)
+    chunks = [summaries[i:i + chunk_size] for i in range(0, len(summaries), chunk_size)]
+    n_workers = resolve_workers(n_jobs, len(chunks))
+
+    rows = []
+    # Pool proses ditutup lewat `with` agar worker juga berhenti bila render gagal
+    with ExitStack() as stack:
+        if n_workers == 1:
+            _init_worker(out_dir, context)
+            results = map(render_chunk, chunks)
+        else:
+            executor = stack.enter_context(
+                ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(out_dir, context))
+            )
+            results = executor.map(render_chunk, chunks)
+        # Hasil potongan dikumpulkan sambil berjalan; file brief sudah ditulis oleh worker
+        for chunk_rows in results:
+            rows.extend(chunk_rows)
+            if verbose:
+                print(f"  {len(rows)}/{len(summaries)} brief", end='\r')
+    if verbose:
+        print()
+    write_index(rows, out_dir, generated)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekspor brief mitigasi DBD (HTML) untuk seluruh wilayah")
+    parser.add_argument('--model', default=None, help="Model (direktori array datar atau pickle joblib)")
+    parser.add_argument('--data', default=None, help="Tabel master (CSV/Parquet)")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="Direktori output brief")
+    parser.add_argument('--regions', nargs='+', default=None, help="Hanya wilayah ini (kunci wilayah)")
+    parser.add_argument('--n-jobs', type=int, default=-1, help="Jumlah proses (-1 = semua core)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Jumlah wilayah per tugas worker")
+    args = parser.parse_args(argv)
+
+    model_path, data_path = resolve_artifact_paths()
+    assets = build_assets(args.model or model_path, args.data or data_path)
+    missing = sorted(set(args.regions or []) - set(assets['df_prediksi'].index))
+    if missing:
+        parser.error(f"wilayah tidak dikenal: {', '.join(missing)}")
+
+    start = time.perf_counter()
+    rows = export_briefs(assets, args.output_dir, args.regions, args.n_jobs, args.chunk_size)
+    print(f"{len(rows)} brief -> {args.output_dir}/ (index.html) dalam {time.perf_counter() - start:.2f}s")
+    selected = assets['df_prediksi'] if args.regions is None else assets['df_prediksi'].loc[args.regions]
+    incomplete = selected.loc[selected[INVALID_COLUMN] != '', INVALID_COLUMN]
+    for region, invalid in incomplete.items():
+        print(f"  dilewati (data tidak lengkap: {invalid}): {region}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Feature store deret waktu per wilayah: lag IR beberapa tahun, rata-rata &
+varians bergulir IR, serta curah hujan dan hari hujan bergulir.
+
+Fitur dihitung pada panel wilayah x tahun (indeks waktu per wilayah): setiap
+kolom tabel master dipetakan sekali ke matriks (n_wilayah, n_tahun), sehingga
+lag cukup berupa pergeseran kolom matriks dan jendela bergulir berupa
+tumpukan beberapa pergeseran, tanpa loop per baris atau per wilayah. Lag
+berbasis tahun kalender (tahun yang hilang tidak membuat lag "melompat").
+
+Lag IR yang tidak tersedia (tahun awal, tahun yang hilang) diisi rata-rata IR
+wilayah dari tahun-tahun sebelum tahun baris tersebut saja (expanding mean),
+sehingga nilai target tahun berjalan atau tahun sesudahnya tidak pernah masuk
+ke fitur; tahun pertama tiap wilayah tetap NaN. Nama wilayah data hari hujan
+(hari_hujan_fix.csv) dicocokkan ke registry wilayah yang sama seperti sumber lain.
+
+Hasil disimpan sebagai feature_store.parquet (satu baris per wilayah & tahun)
+di direktori tabel master, beserta fingerprint tabel master dan sumber hari
+hujan di metadata; store dibangun ulang otomatis bila salah satunya berubah.
+Sumber (hari_hujan_fix.csv, registry, titik pusat) juga dibaca dari direktori
+tabel master, sehingga tabel master di direktori lain (mis. data sintetis)
+tidak memakai sumber atau store milik direktori kerja. Training (experiments.py)
+dan dashboard membaca fitur dari store yang sama.
+
+Store juga memuat fitur spatial lag (spatial.py): IR tahun lalu dan curah
+hujan rata-rata wilayah tetangga, dihitung pada panel yang sama dengan satu
+perkalian matriks tetangga sparse. Wilayah tanpa titik pusat mendapat NaN pada
+kolom tersebut (tidak membatalkan pembangunan store).
+
+Pemakaian:
+    python feature_store.py                  # bangun/perbarui feature_store.parquet
+    python feature_store.py --force          # bangun ulang walaupun masih terbaru
+    python feature_store.py --master data_sintetis/df_final_dashboard.parquet
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline import KEY, fingerprint
+from regions import apply_registry, load_alias_index, registry_path
+from spatial import SPATIAL_COLUMNS, centroid_path, load_centroids, neighbor_matrix, spatial_lag
+
+STORE_FILE = 'feature_store.parquet'
+STORE_META_KEY = b'dbd_feature_store'
+TARGET = 'IR_DBD_per_100k'
+WINDOW = 3
+# Naikkan bila rumus fitur berubah: store lama dibangun ulang dan cache eksperimen tidak terpakai lagi
+FEATURE_VERSION = 2
+
+HARI_HUJAN = {
+    'file': 'hari_hujan_fix.csv',
+    # Kolom nilai di file sumber berlabel '2019 (Hari)' untuk semua tahun
+    'rename': {'2019 (Hari)': 'hari_hujan'},
+    'columns': KEY + ['hari_hujan'],
+}
+
+FEATURE_COLUMNS = [
+    'IR_lag_2',
+    'IR_lag_3',
+    'IR_rata_3th',
+    'IR_var_3th',
+    'curah_hujan_rata_3th',
+    'hari_hujan',
+    'hari_hujan_rata_3th',
+]
+# Seluruh kolom store: fitur deret waktu + fitur spatial lag
+STORE_COLUMNS = FEATURE_COLUMNS + SPATIAL_COLUMNS
+
+
+# ============================================================================
+# PANEL WILAYAH x TAHUN
+# ============================================================================
+def time_index(regions, years):
+    """Indeks waktu per wilayah: posisi (wilayah, tahun) setiap baris di panel"""
+    names = pd.Series(regions).astype(str).to_numpy()
+    years = np.asarray(years, dtype=np.int64)
+    region_names, region_pos = np.unique(names, return_inverse=True)
+    first_year = int(years.min())
+    return {
+        'regions': region_names,
+        'years': np.arange(first_year, int(years.max()) + 1),
+        'region_pos': region_pos,
+        'year_pos': years - first_year,
+    }
+
+
+def to_panel(index, values, region_pos=None, year_pos=None):
+    """Matriks (n_wilayah, n_tahun) berisi rata-rata nilai per sel (NaN bila tidak ada data)"""
+    region_pos = index['region_pos'] if region_pos is None else region_pos
+    year_pos = index['year_pos'] if year_pos is None else year_pos
+    shape = (len(index['regions']), len(index['years']))
+    cell = region_pos * shape[1] + year_pos
+
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    # Baris duplikat di satu sel (wilayah, tahun) dirata-rata
+    total = np.bincount(cell[valid], weights=values[valid], minlength=shape[0] * shape[1])
+    count = np.bincount(cell[valid], minlength=shape[0] * shape[1])
+    with np.errstate(invalid='ignore'):
+        return (total / count).reshape(shape)
+
+
+def shift_panel(panel, k):
+    """Geser panel k tahun ke depan: kolom t berisi nilai tahun t - k"""
+    shifted = np.full(panel.shape, np.nan)
+    if k < panel.shape[1]:
+        shifted[:, k:] = panel[:, :panel.shape[1] - k]
+    return shifted
+
+
+def stack_window(panel, lags):
+    """Tumpukan (len(lags), n_wilayah, n_tahun) nilai untuk setiap lag"""
+    return np.stack([shift_panel(panel, k) for k in lags])
+
+
+def prior_mean(panel):
+    """Rata-rata seluruh tahun sebelum tahun t (tanpa tahun t itu sendiri) untuk setiap sel panel"""
+    available = ~np.isnan(panel)
+    total = np.cumsum(np.where(available, panel, 0.0), axis=1)
+    count = np.cumsum(available, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, total / count, np.nan)
+    return shift_panel(mean, 1)
+
+
+def _nanmean(stacked, min_periods=1):
+    count = (~np.isnan(stacked)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nansum(stacked, axis=0) / count
+    return np.where(count >= min_periods, mean, np.nan)
+
+
+# ============================================================================
+# FITUR
+# ============================================================================
+def load_hari_hujan(data_dir='.'):
+    """Jumlah hari hujan per (Tahun, wilayah) dengan kunci wilayah dari registry"""
+    df = pd.read_csv(os.path.join(data_dir, HARI_HUJAN['file'])).rename(columns=HARI_HUJAN['rename'])
+    df = apply_registry(df, load_alias_index(data_dir), HARI_HUJAN['file'])
+    return df[HARI_HUJAN['columns']]
+
+
+def compute_features(df, hari_hujan, centroids):
+    """Fitur deret waktu & spatial lag untuk setiap (wilayah, tahun) di tabel master"""
+    index = time_index(df['Kabupaten/Kota'], df['Tahun'])
+    ir = to_panel(index, df[TARGET])
+    rain = to_panel(index, df['curah_hujan_mm'])
+
+    # Hari hujan dipetakan ke panel yang sama; wilayah/tahun di luar tabel master diabaikan
+    positions = pd.Index(index['regions']).get_indexer(hari_hujan['Kabupaten/Kota'].astype(str))
+    year_pos = hari_hujan['Tahun'].to_numpy(np.int64) - index['years'][0]
+    keep = (positions >= 0) & (year_pos >= 0) & (year_pos < len(index['years']))
+    rainy_days = to_panel(index, hari_hujan['hari_hujan'].to_numpy()[keep], positions[keep], year_pos[keep])
+
+    # Lag IR yang tidak tersedia diisi rata-rata IR wilayah tahun-tahun sebelumnya saja (tanpa kebocoran target)
+    ir_lags = stack_window(ir, range(1, WINDOW + 1))
+    ir_lags = np.where(np.isnan(ir_lags), prior_mean(ir), ir_lags)
+
+    panels = {
+        'IR_lag_2': ir_lags[1],
+        'IR_lag_3': ir_lags[2],
+        'IR_rata_3th': ir_lags.mean(axis=0),
+        'IR_var_3th': ir_lags.var(axis=0, ddof=1),
+        # Curah hujan & hari hujan: tahun berjalan dan dua tahun sebelumnya (sama seperti curah_hujan_mm)
+        'curah_hujan_rata_3th': _nanmean(stack_window(rain, range(WINDOW))),
+        'hari_hujan': rainy_days,
+        'hari_hujan_rata_3th': _nanmean(stack_window(rainy_days, range(WINDOW))),
+    }
+
+    # Tetangga dari kode wilayah baris panel; lag IR tetangga memakai isian yang sama (hanya tahun sebelumnya)
+    codes = df.groupby('Kabupaten/Kota')['kode_wilayah'].first().reindex(index['regions'])
+    adjacency = neighbor_matrix(centroids, codes)
+    panels['IR_tetangga_tahun_lalu'] = spatial_lag(adjacency, ir_lags[0])
+    panels['curah_hujan_tetangga'] = spatial_lag(adjacency, rain)
+
+    # Satu baris per sel panel yang ada di tabel master
+    cells = np.unique(index['region_pos'] * len(index['years']) + index['year_pos'])
+    region_pos, year_pos = np.divmod(cells, len(index['years']))
+    store = pd.DataFrame({
+        'Tahun': index['years'][year_pos],
+        'Kabupaten/Kota': index['regions'][region_pos],
+    })
+    for name in STORE_COLUMNS:
+        store[name] = panels[name][region_pos, year_pos]
+    return store
+
+
+# ============================================================================
+# STORE (PARQUET)
+# ============================================================================
+def data_dir_of(master_path):
+    """Direktori sumber store (hari hujan, registry, titik pusat): direktori tabel master"""
+    return os.path.dirname(master_path) or '.'
+
+
+def store_path(master_path):
+    """File store di samping tabel master"""
+    return os.path.join(data_dir_of(master_path), STORE_FILE)
+
+
+def source_fingerprints(master_path, data_dir=None):
+    """Fingerprint tabel master, sumber hari hujan, registry, dan titik pusat wilayah (penanda versi store)"""
+    data_dir = data_dir or data_dir_of(master_path)
+    return {
+        'versi_fitur': FEATURE_VERSION,
+        'master': fingerprint(master_path),
+        'hari_hujan': fingerprint(os.path.join(data_dir, HARI_HUJAN['file'])),
+        'registry': fingerprint(registry_path(data_dir)),
+        'centroid': fingerprint(centroid_path(data_dir)),
+    }
+
+
+def sources_hash(master_path, data_dir=None):
+    """Satu hash untuk seluruh fingerprint sumber (versi data training)"""
+    return hashlib.sha256(json.dumps(source_fingerprints(master_path, data_dir), sort_keys=True).encode()).hexdigest()
+
+
+def read_master(master_path):
+    """Baca tabel master dari CSV atau Parquet"""
+    return pd.read_parquet(master_path) if master_path.endswith('.parquet') else pd.read_csv(master_path)
+
+
+def build_store(master_path, data_dir=None, path=None):
+    """Hitung seluruh fitur dan tulis store Parquet (beserta fingerprint sumber) secara atomik"""
+    data_dir, path = data_dir or data_dir_of(master_path), path or store_path(master_path)
+    store = compute_features(read_master(master_path), load_hari_hujan(data_dir),
+                             load_centroids(centroid_path(data_dir)))
+
+    table = pa.Table.from_pandas(store, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[STORE_META_KEY] = json.dumps(source_fingerprints(master_path, data_dir)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+    return store
+
+
+def is_stale(master_path, data_dir=None, path=None):
+    """True bila store belum ada atau dibangun dari tabel master / data sumber yang berbeda"""
+    path = path or store_path(master_path)
+    if not os.path.exists(path):
+        return True
+    metadata = pq.read_schema(path).metadata or {}
+    if STORE_META_KEY not in metadata:
+        return True
+    return json.loads(metadata[STORE_META_KEY]) != source_fingerprints(master_path, data_dir)
+
+
+def load_store(master_path, data_dir=None, path=None):
+    """Store fitur terbaru (dibangun ulang hanya bila sumbernya berubah)"""
+    path = path or store_path(master_path)
+    if is_stale(master_path, data_dir, path):
+        return build_store(master_path, data_dir, path)
+    return pd.read_parquet(path)
+
+
+def attach_features(df, store):
+    """Salinan df dengan kolom fitur store untuk setiap baris (dicocokkan pada wilayah & tahun)"""
+    keys = pd.MultiIndex.from_arrays([df['Kabupaten/Kota'].astype(str), df['Tahun'].astype(np.int64)])
+    features = store.set_index(['Kabupaten/Kota', 'Tahun'])[STORE_COLUMNS].reindex(keys)
+    df = df.copy()
+    for name in STORE_COLUMNS:
+        df[name] = features[name].to_numpy()
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun feature store deret waktu DBD")
+    parser.add_argument('--master', default=None, help="Tabel master (default Parquet bila ada, jika tidak CSV)")
+    parser.add_argument('--data-dir', default=None, help="Direktori hari_hujan_fix.csv (default: direktori tabel master)")
+    parser.add_argument('--output', default=None, help="File Parquet feature store (default: di direktori tabel master)")
+    parser.add_argument('--force', action='store_true', help="Bangun ulang walaupun store masih terbaru")
+    args = parser.parse_args(argv)
+
+    master_path = args.master or ('df_final_dashboard.parquet' if os.path.exists('df_final_dashboard.parquet')
+                                  else 'df_final_dashboard.csv')
+    output = args.output or store_path(master_path)
+    if not args.force and not is_stale(master_path, args.data_dir, output):
+        print(f"Feature store sudah terbaru: {output}")
+        return
+    store = build_store(master_path, args.data_dir, output)
+    print(f"Feature store: {len(store)} baris x {len(STORE_COLUMNS)} fitur -> {output}")
+
+
+if __name__ == '__main__':
+    main()
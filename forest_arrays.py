@@ -0,0 +1,324 @@
+"""
+Ekspor dan pemuatan Random Forest dalam bentuk array NumPy datar.
+
+Seluruh pohon digabung menjadi beberapa array (anak kiri/kanan, fitur,
+threshold, arah nilai kosong, nilai daun, jumlah sampel per node) yang disimpan sebagai file
+.npy terpisah di satu direktori. File .npy bisa di-memory-map, sehingga
+beberapa proses Streamlit di satu host berbagi satu salinan di page cache
+dan tidak perlu meng-unpickle ribuan objek pohon sklearn saat start-up.
+
+Nilai kosong (NaN) mengikuti arah per node milik sklearn
+(`tree_.missing_go_to_left`), sehingga prediksi baris tidak lengkap sama
+dengan sklearn. Ekspor lama tanpa array itu tetap bisa dimuat, tetapi
+menolak input NaN (ValueError) sampai diekspor ulang.
+
+Karena file .npy di-memory-map oleh proses yang sedang berjalan, ekspor ke
+direktori yang sedang dipakai tidak boleh menimpa file di tempat (pembaca
+bisa crash dengan SIGBUS). `publish_forest` menulis ke direktori versi baru
+lalu menukar symlink dalam satu rename.
+"""
+import json
+import os
+import re
+import shutil
+import time
+
+import joblib
+import numpy as np
+
+MODEL_DIR = 'model_robust_forest'
+MODEL_PICKLE = 'model_robust_bundle.pkl'
+
+# Parameter sklearn yang tidak memengaruhi model hasil training (tidak ikut dicatat)
+RUNTIME_PARAMS = ('n_jobs', 'verbose', 'warm_start')
+
+ARRAY_NAMES = ('children_left', 'children_right', 'feature', 'threshold', 'missing_go_to_left',
+               'value', 'node_samples', 'roots')
+# Ekspor sebelum arah nilai kosong disimpan tidak memiliki array ini
+OPTIONAL_ARRAYS = ('missing_go_to_left',)
+META_FILE = 'meta.json'
+
+
+class FlatForest:
+    """Random Forest regresi yang memprediksi langsung dari array datar"""
+
+    def __init__(self, arrays, features, max_depth, feature_importances=None):
+        self.children_left = arrays['children_left']
+        self.children_right = arrays['children_right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.missing_go_to_left = arrays.get('missing_go_to_left')
+        self.value = arrays['value']
+        self.node_samples = arrays['node_samples']
+        self.roots = arrays['roots']
+        self.feature_names_in_ = np.asarray(features, dtype=object)
+        self.n_features_in_ = len(features)
+        self.n_estimators = len(self.roots)
+        self.max_depth = int(max_depth)
+        # Anak kiri/kanan disusun berselang agar traversal cukup satu gather: children[2 * node + ke_kanan]
+        self._children = np.stack([self.children_left, self.children_right], axis=1).ravel()
+        if feature_importances is not None:
+            self.feature_importances_ = np.asarray(feature_importances, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, model, features=None):
+        """Konversi RandomForestRegressor sklearn (sudah di-fit) menjadi FlatForest"""
+        trees = [est.tree_ for est in model.estimators_]
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+
+        left, right = [], []
+        for t, offset in zip(trees, offsets[:-1]):
+            idx = np.arange(t.node_count) + offset
+            is_leaf = t.children_left == -1
+            # Daun menunjuk ke dirinya sendiri sehingga traversal cukup diulang max_depth kali tanpa masking
+            left.append(np.where(is_leaf, idx, t.children_left + offset))
+            right.append(np.where(is_leaf, idx, t.children_right + offset))
+
+        arrays = {
+            'children_left': np.concatenate(left).astype(np.int32),
+            'children_right': np.concatenate(right).astype(np.int32),
+            'feature': np.concatenate([np.maximum(t.feature, 0) for t in trees]).astype(np.int32),
+            'threshold': np.concatenate([t.threshold for t in trees]).astype(np.float64),
+            # Arah NaN per node (sklearn memilih anak dengan sampel terbanyak bila training tanpa NaN)
+            'missing_go_to_left': np.concatenate([t.missing_go_to_left for t in trees]).astype(bool),
+            'value': np.concatenate([t.value[:, 0, 0] for t in trees]).astype(np.float64),
+            'node_samples': np.concatenate([t.weighted_n_node_samples for t in trees]).astype(np.float64),
+            'roots': offsets[:-1].astype(np.int32),
+        }
+
+        if features is None:
+            features = list(getattr(model, 'feature_names_in_', range(model.n_features_in_)))
+        max_depth = max(t.max_depth for t in trees)
+        return cls(arrays, list(features), max_depth, model.feature_importances_)
+
+    def subset(self, trees):
+        """FlatForest baru yang hanya berisi pohon `trees` (urutan dipertahankan, indeks node disusun ulang)"""
+        trees = np.asarray(trees, dtype=np.int64)
+        ends = np.append(self.roots[1:], len(self.value))
+        starts = self.roots[trees].astype(np.int64)
+        sizes = ends[trees] - starts
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        # Node lama untuk setiap posisi baru; indeks anak digeser sebesar selisih posisi akar pohonnya
+        nodes = np.concatenate([np.arange(start, start + size) for start, size in zip(starts, sizes)])
+        shift = np.repeat(roots - starts, sizes)
+        arrays = {
+            'children_left': (self.children_left[nodes] + shift).astype(np.int32),
+            'children_right': (self.children_right[nodes] + shift).astype(np.int32),
+            'feature': np.asarray(self.feature[nodes]),
+            'threshold': np.asarray(self.threshold[nodes]),
+            'missing_go_to_left': (None if self.missing_go_to_left is None
+                                   else np.asarray(self.missing_go_to_left[nodes])),
+            'value': np.asarray(self.value[nodes]),
+            'node_samples': np.asarray(self.node_samples[nodes]),
+            'roots': roots.astype(np.int32),
+        }
+        forest = FlatForest(arrays, list(self.feature_names_in_), self.max_depth)
+        forest.feature_importances_ = forest.impurity_importances()
+        return forest
+
+    def impurity_importances(self):
+        """Feature importance MDI (setara sklearn) dari nilai & jumlah sampel node"""
+        nodes = np.arange(len(self.value))
+        split = nodes[self.children_left != nodes]
+        left, right = self.children_left[split], self.children_right[split]
+        # Penurunan impurity MSE = jumlah kuadrat antar-anak: n_kiri (m_kiri - m)^2 + n_kanan (m_kanan - m)^2
+        decrease = (self.node_samples[left] * (self.value[left] - self.value[split]) ** 2
+                    + self.node_samples[right] * (self.value[right] - self.value[split]) ** 2)
+        tree = np.searchsorted(self.roots, split, side='right') - 1
+
+        per_tree = np.zeros((self.n_estimators, self.n_features_in_))
+        np.add.at(per_tree, (tree, self.feature[split]), decrease / self.node_samples[self.roots[tree]])
+        totals = per_tree.sum(axis=1)
+        # Seperti sklearn: pohon tanpa split tidak ikut dirata-rata, tiap pohon dinormalisasi lebih dulu
+        has_split = totals > 0
+        if not has_split.any():
+            return np.zeros(self.n_features_in_)
+        importances = (per_tree[has_split] / totals[has_split, None]).mean(axis=0)
+        return importances / importances.sum()
+
+    def _as_matrix(self, X):
+        # Samakan urutan kolom DataFrame dengan urutan fitur saat training
+        if hasattr(X, 'columns'):
+            X = X[list(self.feature_names_in_)]
+        # sklearn membandingkan input sebagai float32 terhadap threshold float64
+        X = np.asarray(X, dtype=np.float32)
+        if self.missing_go_to_left is None and np.isnan(X).any():
+            raise ValueError("Ekspor model lama tanpa arah nilai kosong (missing_go_to_left); "
+                             "ekspor ulang model untuk memprediksi baris dengan NaN")
+        return X
+
+    def apply(self, X):
+        """Indeks daun (global) untuk setiap pohon dan sampel, bentuk (n_pohon, n_sampel)"""
+        X = self._as_matrix(X)
+        n_samples = X.shape[0]
+        # Matriks fitur ditranspos & diratakan: nilai fitur f sampel i ada di X_flat[f * n_samples + i]
+        X_flat = np.ascontiguousarray(X.T).ravel()
+        cols = np.arange(n_samples)
+        node = np.repeat(self.roots[:, None], n_samples, axis=1)
+        # Arah NaN hanya dibaca bila input memang memiliki nilai kosong
+        has_missing = np.isnan(X_flat).any()
+        for _ in range(self.max_depth):
+            x = X_flat[self.feature[node] * n_samples + cols]
+            go_right = x > self.threshold[node]
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.missing_go_to_left[node], go_right)
+            node = self._children[2 * node + go_right]
+        return node
+
+    def predict_per_tree(self, X, chunk_size=256):
+        """Prediksi setiap pohon, bentuk (n_pohon, n_sampel)"""
+        X = self._as_matrix(X)
+        out = np.empty((self.n_estimators, X.shape[0]), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            stop = start + chunk_size
+            out[:, start:stop] = self.value[self.apply(X[start:stop])]
+        return out
+
+    def predict(self, X, chunk_size=256):
+        """Prediksi rata-rata seluruh pohon (setara RandomForestRegressor.predict)"""
+        X = self._as_matrix(X)
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            stop = start + chunk_size
+            out[start:stop] = self.value[self.apply(X[start:stop])].mean(axis=0)
+        return out
+
+    def save(self, path, extra_meta=None):
+        """Tulis array ke direktori `path` (satu file .npy per array) beserta meta.json"""
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_NAMES:
+            if getattr(self, name) is None:
+                continue
+            np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(getattr(self, name)))
+
+        meta = dict(extra_meta or {})
+        meta.update({
+            'features': [str(f) for f in self.feature_names_in_],
+            'max_depth': self.max_depth,
+            'n_estimators': self.n_estimators,
+            'feature_importances': self.feature_importances_.tolist(),
+        })
+        with open(os.path.join(path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap_mode='r'):
+        """Muat FlatForest dari direktori hasil `save` (default: memory-mapped, read-only)"""
+        # Symlink diselesaikan sekali agar meta.json & array berasal dari versi yang sama walau ditukar di tengah
+        path = os.path.realpath(path)
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode=mmap_mode) for name in ARRAY_NAMES
+                  if name not in OPTIONAL_ARRAYS or os.path.exists(os.path.join(path, name + '.npy'))}
+        return cls(arrays, meta['features'], meta['max_depth'], meta.get('feature_importances')), meta
+
+
+def forest_params(model):
+    """Hyperparameter RandomForestRegressor sklearn sebagai dict JSON (untuk melatih ulang konfigurasi yang sama)"""
+    params = {key: value for key, value in model.get_params().items() if key not in RUNTIME_PARAMS}
+    return json.loads(json.dumps(params, default=str))
+
+
+def bundle_params(bundle):
+    """Hyperparameter training model dalam bundle, atau None bila tidak diketahui (ekspor lama, hasil pruning)"""
+    model = bundle.get('model')
+    if model is not None and not isinstance(model, FlatForest):
+        return forest_params(model)
+    return bundle.get('params')
+
+
+def export_forest(bundle, path):
+    """Ekspor bundle model ({'model', 'features', 'metrics', ...}) ke format array datar (sklearn atau FlatForest)"""
+    model = bundle['model']
+    forest = model if isinstance(model, FlatForest) else FlatForest.from_sklearn(model, bundle['features'])
+
+    # Simpan juga kunci bundle lain yang bisa ditulis sebagai JSON (metrics, timestamp, dll.)
+    extra_meta = {}
+    for key, value in bundle.items():
+        if key == 'model':
+            continue
+        try:
+            json.dumps(value)
+        except TypeError:
+            continue
+        extra_meta[key] = value
+    # Hyperparameter ikut disimpan agar backtest bisa melatih ulang model yang sama dari ekspor array datar
+    if model is not forest:
+        extra_meta.setdefault('params', forest_params(model))
+
+    forest.save(path, extra_meta)
+    return forest
+
+
+def publish_forest(bundle, path):
+    """Ekspor bundle ke direktori versi baru lalu arahkan symlink `path` ke sana (satu rename atomik)
+
+    Direktori versi sebelumnya dibiarkan (pembaca yang sedang memuatnya tetap
+    menemukan filenya); versi yang lebih lama dihapus. Bila `path` masih
+    direktori biasa (ekspor lama), direktori itu dipindah sekali menjadi versi.
+    """
+    path = path.rstrip(os.sep)
+    parent, base = os.path.dirname(path) or '.', os.path.basename(path)
+    target = f"{base}.{time.time_ns()}"
+    target_path = os.path.join(parent, target)
+    try:
+        forest = export_forest(bundle, target_path)
+    except BaseException:
+        shutil.rmtree(target_path, ignore_errors=True)
+        raise
+
+    previous = None
+    if os.path.islink(path):
+        previous = os.path.basename(os.readlink(path))
+    elif os.path.isdir(path):
+        # Sekali saja: direktori biasa tidak bisa ditimpa symlink secara atomik
+        previous = f"{base}.{time.time_ns()}"
+        os.replace(path, os.path.join(parent, previous))
+
+    link_tmp = path + '.link.tmp'
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(target, link_tmp)
+    os.replace(link_tmp, path)
+
+    version_pattern = re.compile(re.escape(base) + r'\.\d+')
+    for name in os.listdir(parent):
+        if version_pattern.fullmatch(name) and name not in (target, previous):
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+    return forest
+
+
+def load_bundle(path, mmap_mode='r'):
+    """Muat hasil `export_forest` sebagai dict dengan kunci yang sama seperti bundle joblib"""
+    forest, meta = FlatForest.load(path, mmap_mode=mmap_mode)
+    bundle = {key: value for key, value in meta.items()
+              if key not in ('max_depth', 'n_estimators', 'feature_importances')}
+    bundle['model'] = forest
+    return bundle
+
+
+def as_flat_forest(model):
+    """FlatForest apa adanya, atau konversi RandomForestRegressor sklearn ke array datar"""
+    if isinstance(model, FlatForest):
+        return model
+    return FlatForest.from_sklearn(model, list(getattr(model, 'feature_names_in_', [])) or None)
+
+
+def per_tree_predictions(model, X):
+    """Matriks prediksi (n_pohon, n_sampel) dari FlatForest atau RandomForestRegressor sklearn"""
+    # Pohon sklearn dikonversi sekali ke array datar, lalu seluruh pohon ditraversal bersamaan
+    return as_flat_forest(model).predict_per_tree(X)
+
+
+def default_model_path():
+    """Artefak model default: ekspor array datar bila ada, jika tidak pickle joblib"""
+    return MODEL_DIR if os.path.isdir(MODEL_DIR) else MODEL_PICKLE
+
+
+def open_bundle(path=None):
+    """Muat bundle model dari direktori array datar atau file pickle joblib"""
+    path = path or default_model_path()
+    if os.path.isdir(path):
+        return load_bundle(path)
+    return joblib.load(path)
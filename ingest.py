@@ -0,0 +1,350 @@
+"""
+Ingest data tahun baru ke tabel master tanpa membangun ulang seluruh pipeline.
+
+Menerima direktori berisi CSV tahun baru dengan skema mentah yang sama
+seperti sumber: lima sumber pipeline (data_dbd.csv, curah_hujan_fix.csv, ...)
+dan hari_hujan_fix.csv (masukan feature store, agar fitur hari hujan tahun
+baru tidak kosong), lalu:
+
+1. memvalidasi kolom, angka, rentang nilai, dan tahun (harus setelah tahun
+   terakhir di tabel master, sama di semua sumber), serta memastikan hari
+   hujan tersedia untuk setiap baris baru;
+2. menormalisasi & menggabungkan baris baru dengan fungsi pipeline yang sama;
+3. menghitung IR_tahun_lalu hanya untuk baris yang terdampak: baris baru
+   (dari baris terakhir wilayahnya) dan baris tahun pertama wilayah yang
+   nilai isiannya (rata-rata IR wilayah) berubah karena data baru;
+4. menulis tabel master baru (Parquet & CSV), df_gabungan.csv, dan CSV mentah
+   secara atomik (tmp + rename), lalu mencatat snapshot setiap versi tabel
+   master di `.master_versions/` (bisa di-rollback).
+
+Dashboard memuat ulang aset otomatis pada rerun berikutnya karena kunci cache
+`load_assets` adalah versi (ukuran + mtime) file tabel master.
+
+Pemakaian:
+    python ingest.py data_2024/                 # validasi + append tahun baru
+    python ingest.py data_2024/ --dry-run       # hanya validasi & ringkasan
+    python ingest.py --list                     # daftar versi tabel master
+    python ingest.py --rollback 3               # kembalikan tabel master versi 3
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+from feature_store import HARI_HUJAN
+from pipeline import (
+    MERGE_KEY, SOURCES, fingerprint, load_master_table, load_source, merge_sources, write_master_table,
+)
+from regions import apply_registry, load_alias_index, report_frame
+
+MASTER_PARQUET = 'df_final_dashboard.parquet'
+MASTER_CSV = 'df_final_dashboard.csv'
+WRANGLED_CSV = 'df_gabungan.csv'
+VERSIONS_DIR = '.master_versions'
+VERSIONS_FILE = 'versions.json'
+TARGET = 'IR_DBD_per_100k'
+
+# Sumber pipeline + sumber hari hujan feature store: semuanya wajib ada untuk tahun baru
+INGEST_SOURCES = dict(SOURCES, hari_hujan=HARI_HUJAN)
+
+# Kolom numerik yang divalidasi per sumber (nama setelah rename) dan batas atas bila ada
+VALUE_LIMITS = {
+    'kasus_dbd': None,
+    'jumlah_meninggal': None,
+    'curah_hujan_mm': None,
+    'timbulan_sampah_ton': None,
+    'penduduk_ribu': None,
+    'kepadatan_penduduk_km2': None,
+    'akses_sanitasi_layak_persen': 100,
+    'hari_hujan': 366,
+}
+
+
+# ============================================================================
+# VALIDASI
+# ============================================================================
+def raw_columns(spec):
+    """Nama kolom di file mentah (sebelum rename) yang dibutuhkan pipeline"""
+    inverse = {new: old for old, new in spec['rename'].items()}
+    return [inverse.get(col, col) for col in spec['columns']]
+
+
+def validate_sources(new_dir, last_year=None, index=None):
+    """Validasi CSV tahun baru (sumber pipeline + hari hujan); kembalikan (frames ternormalisasi, tahun baru, laporan wilayah)"""
+    problems, frames, years, report = [], {}, {}, []
+    index = index or load_alias_index(new_dir)
+    for name, spec in INGEST_SOURCES.items():
+        path = os.path.join(new_dir, spec['file'])
+        if not os.path.exists(path):
+            problems.append(f"{spec['file']}: file tidak ditemukan")
+            continue
+
+        raw = pd.read_csv(path)
+        missing = [col for col in raw_columns(spec) if col not in raw.columns]
+        if missing:
+            problems.append(f"{spec['file']}: kolom tidak ditemukan: {', '.join(missing)}")
+            continue
+
+        area_col, year_col = raw_columns(spec)[1], raw_columns(spec)[0]
+        duplicated = raw.duplicated([year_col, area_col])
+        if duplicated.any():
+            problems.append(f"{spec['file']}: {int(duplicated.sum())} baris duplikat (tahun, wilayah)")
+
+        if name in SOURCES:
+            df = load_source(name, new_dir, index, report).copy()
+        else:
+            df = apply_registry(raw.rename(columns=spec['rename']), index, spec['file'], report)
+            df = df[MERGE_KEY + spec['columns'][2:]].copy()
+        df['Tahun'] = pd.to_numeric(df['Tahun'], errors='coerce')
+        for col in spec['columns'][2:]:
+            values = pd.to_numeric(df[col], errors='coerce')
+            if values.isna().any():
+                problems.append(f"{spec['file']}: {int(values.isna().sum())} nilai {col} kosong/bukan angka")
+            if (values < 0).any():
+                problems.append(f"{spec['file']}: nilai {col} negatif")
+            limit = VALUE_LIMITS.get(col)
+            if limit is not None and (values > limit).any():
+                problems.append(f"{spec['file']}: nilai {col} melebihi {limit}")
+            df[col] = values
+
+        if df['Tahun'].isna().any():
+            problems.append(f"{spec['file']}: kolom tahun kosong/bukan angka")
+        years[name] = set(df['Tahun'].dropna().astype(int))
+        frames[name] = df
+
+    if years and len({frozenset(y) for y in years.values()}) > 1:
+        detail = ', '.join(f"{name}={sorted(y)}" for name, y in years.items())
+        problems.append(f"Tahun berbeda antar sumber: {detail}")
+    new_years = sorted(set().union(*years.values())) if years else []
+    if last_year is not None and new_years and min(new_years) <= last_year:
+        problems.append(f"Tahun {min(new_years)} tidak setelah tahun terakhir tabel master ({last_year})")
+
+    if 'hari_hujan' in frames and all(name in frames for name in SOURCES):
+        # Fitur hari hujan (feature store) tidak boleh kosong untuk baris tahun baru
+        rows = merge_sources({name: frames[name] for name in SOURCES})[MERGE_KEY]
+        rainy = frames['hari_hujan'][MERGE_KEY].drop_duplicates()
+        uncovered = rows.merge(rainy, on=MERGE_KEY, how='left', indicator=True)['_merge'] == 'left_only'
+        if uncovered.any():
+            names = rows.loc[uncovered.to_numpy(), 'Kabupaten/Kota'].astype(str)
+            problems.append(f"{HARI_HUJAN['file']}: hari hujan tidak ada untuk {int(uncovered.sum())} baris baru "
+                            f"({', '.join(names[:5])}{', ...' if len(names) > 5 else ''})")
+
+    report = report_frame(report)
+    for row in report[report['cara'] == 'tidak_cocok'].itertuples():
+        problems.append(f"{row.sumber}: wilayah '{row.nama_asli}' tidak ada di registry ({row.baris} baris)")
+
+    if problems:
+        raise ValueError("Validasi data baru gagal:\n- " + "\n- ".join(problems))
+    for df in frames.values():
+        df['Tahun'] = df['Tahun'].astype(int)
+    return frames, new_years, report
+
+
+# ============================================================================
+# FITUR LAG INKREMENTAL
+# ============================================================================
+def incremental_lags(master, new_rows):
+    """IR_tahun_lalu untuk baris baru + isian tahun pertama yang berubah, tanpa menghitung ulang semua baris
+
+    Hasilnya sama dengan `add_lag_features` pada tabel gabungan lama + baru:
+    baris baru memakai IR baris sebelumnya di wilayah yang sama (baris terakhir
+    tabel master untuk baris baru pertama), dan baris pertama setiap wilayah
+    diisi rata-rata IR seluruh baris wilayah tersebut.
+    """
+    region_col = 'Kabupaten/Kota'
+    new_rows = new_rows.sort_values([region_col, 'Tahun'], kind='stable').reset_index(drop=True)
+    master_regions = master[region_col].astype(str)
+
+    # Baris terakhir & agregat IR tiap wilayah lama, cukup dari tabel master (tanpa merge ulang sumber)
+    last_ir = master.groupby(master_regions, sort=False)[TARGET].last()
+    old_sum = master.groupby(master_regions, sort=False)[TARGET].sum()
+    old_count = master.groupby(master_regions, sort=False)[TARGET].count()
+
+    new_regions = new_rows[region_col].astype(str)
+    previous = new_rows.groupby(new_regions, sort=False)[TARGET].shift(1)
+    is_first_new = previous.isna()
+    previous[is_first_new] = new_regions[is_first_new].map(last_ir)
+    new_rows['IR_tahun_lalu'] = previous
+
+    # Rata-rata IR wilayah (lama + baru) untuk isian baris pertama wilayah
+    new_sum = new_rows.groupby(new_regions, sort=False)[TARGET].sum()
+    new_count = new_rows.groupby(new_regions, sort=False)[TARGET].count()
+    total_mean = (new_sum.add(old_sum, fill_value=0) / new_count.add(old_count, fill_value=0))
+
+    # Wilayah baru: baris pertamanya sendiri diisi rata-rata
+    unseen = new_rows['IR_tahun_lalu'].isna()
+    new_rows.loc[unseen, 'IR_tahun_lalu'] = new_regions[unseen].map(total_mean)
+
+    # Wilayah lama yang mendapat data baru: isian baris pertamanya ikut berubah
+    master = master.copy()
+    first_rows = ~master_regions.duplicated()
+    affected = first_rows & master_regions.isin(new_sum.index)
+    master.loc[affected, 'IR_tahun_lalu'] = master_regions[affected].map(total_mean).to_numpy()
+    return master, new_rows, int(affected.sum())
+
+
+# ============================================================================
+# VERSI TABEL MASTER
+# ============================================================================
+def read_versions(versions_dir=VERSIONS_DIR):
+    """Daftar versi tabel master yang pernah ditulis oleh ingest"""
+    path = os.path.join(versions_dir, VERSIONS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_versions(versions, versions_dir=VERSIONS_DIR):
+    path = os.path.join(versions_dir, VERSIONS_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(versions, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def record_version(master_path, versions_dir=VERSIONS_DIR, note=''):
+    """Simpan salinan tabel master saat ini sebagai versi baru; kembalikan entri versinya"""
+    os.makedirs(versions_dir, exist_ok=True)
+    versions = read_versions(versions_dir)
+    version = versions[-1]['version'] + 1 if versions else 1
+    snapshot = os.path.join(versions_dir, f"df_final_dashboard.v{version}.parquet")
+    shutil.copy2(master_path, snapshot)
+    entry = {
+        'version': version,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'snapshot': snapshot,
+        'sha256': fingerprint(snapshot),
+        'note': note,
+    }
+    _write_versions(versions + [entry], versions_dir)
+    return entry
+
+
+def _write_csv_atomic(df, path):
+    tmp_path = path + '.tmp'
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _append_csv_atomic(path, rows):
+    # Salin file lama ke tmp, tambahkan baris, lalu rename: pembaca tidak pernah melihat file setengah jadi
+    tmp_path = path + '.tmp'
+    shutil.copy2(path, tmp_path)
+    rows.to_csv(tmp_path, mode='a', header=False, index=False)
+    os.replace(tmp_path, path)
+
+
+def write_master(df_final, out_dir='.'):
+    """Tulis tabel master Parquet (beserta indeks wilayah) dan CSV secara atomik"""
+    df_final = df_final.sort_values(['Kabupaten/Kota', 'Tahun'], kind='stable').reset_index(drop=True)
+    write_master_table(df_final, os.path.join(out_dir, MASTER_PARQUET))
+    _write_csv_atomic(df_final, os.path.join(out_dir, MASTER_CSV))
+    return df_final
+
+
+# ============================================================================
+# INGEST
+# ============================================================================
+def ingest(new_dir, data_dir='.', out_dir='.', versions_dir=VERSIONS_DIR, append_raw=True, dry_run=False,
+           verbose=True):
+    """Validasi & tambahkan data tahun baru ke tabel master; kembalikan ringkasan"""
+    log = print if verbose else (lambda *args, **kwargs: None)
+    master_path = os.path.join(out_dir, MASTER_PARQUET)
+    master, regions, _ = load_master_table(master_path)
+    master['Kabupaten/Kota'] = master['Kabupaten/Kota'].astype(str)
+
+    # Nama wilayah data baru dicocokkan ke registry yang sama dengan tabel master
+    frames, new_years, report = validate_sources(new_dir, int(master['Tahun'].max()), load_alias_index(data_dir))
+    new_wrangled = merge_sources(frames)
+    if new_wrangled.empty:
+        raise ValueError("Tidak ada baris yang cocok di kelima sumber pipeline (periksa nama wilayah dan tahun)")
+
+    master, new_rows, n_refilled = incremental_lags(master, new_wrangled)
+    unseen_regions = sorted(set(new_rows['Kabupaten/Kota']) - set(regions))
+    missing_regions = sorted(set(regions) - set(new_rows['Kabupaten/Kota']))
+    summary = {
+        'tahun': new_years,
+        'baris_baru': len(new_rows),
+        'isian_tahun_pertama_diperbarui': n_refilled,
+        'wilayah_baru': unseen_regions,
+        'wilayah_tanpa_data_baru': missing_regions,
+        'wilayah_fuzzy': len(report),
+    }
+    log(f"Tahun baru: {new_years} • {len(new_rows)} baris • {n_refilled} isian tahun pertama diperbarui")
+    for source, raw_name, region in report[['sumber', 'nama_asli', 'Kabupaten/Kota']].itertuples(index=False):
+        log(f"{source}: '{raw_name}' dicocokkan fuzzy ke '{region}'")
+    if unseen_regions:
+        log(f"Wilayah baru (belum ada di tabel master): {', '.join(unseen_regions)}")
+    if missing_regions:
+        log(f"Wilayah tanpa data tahun baru: {', '.join(missing_regions)}")
+    if dry_run:
+        return summary
+
+    # Tabel master sebelum ingest pertama dicatat sebagai versi awal agar selalu bisa di-rollback
+    if not read_versions(versions_dir):
+        record_version(master_path, versions_dir, note="versi awal (sebelum ingest pertama)")
+    df_final = write_master(pd.concat([master, new_rows[master.columns]], ignore_index=True), out_dir)
+
+    wrangled_path = os.path.join(out_dir, WRANGLED_CSV)
+    if os.path.exists(wrangled_path):
+        _append_csv_atomic(wrangled_path, new_wrangled[pd.read_csv(wrangled_path, nrows=0).columns])
+    if append_raw:
+        # CSV mentah tetap menjadi sumber kebenaran: pipeline.py bisa membangun ulang hasil yang sama
+        for spec in INGEST_SOURCES.values():
+            new_raw = pd.read_csv(os.path.join(new_dir, spec['file']))
+            raw_path = os.path.join(data_dir, spec['file'])
+            _append_csv_atomic(raw_path, new_raw[pd.read_csv(raw_path, nrows=0).columns])
+
+    entry = record_version(master_path, versions_dir,
+                           note=f"ingest tahun {new_years}: {len(new_rows)} baris, total {len(df_final)}")
+    summary['versi'] = entry['version']
+    log(f"Tabel master versi {entry['version']}: {len(df_final)} baris -> {master_path}")
+    return summary
+
+
+def rollback(version, out_dir='.', versions_dir=VERSIONS_DIR):
+    """Kembalikan tabel master ke snapshot versi tertentu (CSV mentah tidak diubah)"""
+    entry = next((v for v in read_versions(versions_dir) if v['version'] == version), None)
+    if entry is None or not os.path.exists(entry['snapshot']):
+        raise ValueError(f"Snapshot versi {version} tidak ditemukan di {versions_dir}")
+
+    df, _, _ = load_master_table(entry['snapshot'])
+    df['Kabupaten/Kota'] = df['Kabupaten/Kota'].astype(str)
+    write_master(df, out_dir)
+    # Rollback sendiri dicatat sebagai versi baru, sehingga bisa dibatalkan dengan rollback berikutnya
+    return record_version(os.path.join(out_dir, MASTER_PARQUET), versions_dir, note=f"rollback ke v{version}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tambahkan data tahun baru ke tabel master DBD")
+    parser.add_argument('new_dir', nargs='?', help="Direktori berisi CSV tahun baru (lima sumber + hari hujan)")
+    parser.add_argument('--data-dir', default='.', help="Direktori CSV mentah yang ditambahkan baris baru")
+    parser.add_argument('--out-dir', default='.', help="Direktori tabel master")
+    parser.add_argument('--versions-dir', default=VERSIONS_DIR, help="Direktori snapshot versi tabel master")
+    parser.add_argument('--skip-raw', action='store_true', help="Jangan tambahkan baris baru ke CSV mentah")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya validasi dan tampilkan ringkasan")
+    parser.add_argument('--list', action='store_true', help="Tampilkan daftar versi tabel master")
+    parser.add_argument('--rollback', type=int, default=None, help="Kembalikan tabel master ke versi ini")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for v in read_versions(args.versions_dir):
+            print(f"v{v['version']}  {v['created']}  {v['note']}")
+        return
+    if args.rollback is not None:
+        entry = rollback(args.rollback, args.out_dir, args.versions_dir)
+        print(f"Tabel master dikembalikan ke versi {args.rollback} (dicatat sebagai v{entry['version']})")
+        return
+    if not args.new_dir:
+        parser.error("direktori data baru wajib diisi (atau gunakan --list / --rollback)")
+
+    ingest(args.new_dir, args.data_dir, args.out_dir, args.versions_dir,
+           append_raw=not args.skip_raw, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
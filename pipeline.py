@@ -0,0 +1,259 @@
+"""
+Pipeline data DBD: lima CSV mentah -> df_gabungan.csv -> df_final_dashboard.csv.
+
+Menggantikan rantai merge di DBD.ipynb agar tabel dashboard bisa dibangun
+ulang tanpa menjalankan notebook (beserta seluruh plot-nya). Setiap file
+sumber di-fingerprint (SHA-256); hanya sumber yang berubah yang dibaca dan
+dinormalisasi ulang, sisanya diambil dari cache di `.pipeline_cache/`.
+
+Tabel dashboard juga ditulis sebagai Parquet (df_final_dashboard.parquet)
+dengan kolom wilayah bertipe kategori, daftar wilayah terurut, dan indeks
+wilayah -> offset baris di metadata file, sehingga dashboard tidak perlu
+memindai string untuk memfilter wilayah.
+
+Nama wilayah setiap sumber dicocokkan ke registry kode wilayah BPS
+(regions.py); baris yang cocok secara fuzzy atau tidak cocok dicatat di
+laporan_wilayah.csv.
+
+Pemakaian:
+    python pipeline.py                 # build inkremental
+    python pipeline.py --force         # abaikan cache, build ulang semua
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from regions import REPORT_FILE, apply_registry, load_alias_index, registry_path, report_frame
+
+KEY = ['Tahun', 'Kabupaten/Kota']
+# Kunci wilayah kanonik berpasangan 1:1 dengan kode wilayah, keduanya ikut di setiap merge
+MERGE_KEY = KEY + ['kode_wilayah']
+CACHE_DIR = '.pipeline_cache'
+MANIFEST_FILE = 'manifest.json'
+MASTER_INDEX_KEY = b'dbd_region_index'
+
+# Nama file, rename kolom, dan kolom yang dipakai dari setiap sumber (sama seperti di notebook)
+SOURCES = {
+    'dbd': {
+        'file': 'data_dbd.csv',
+        'rename': {'tahun_data': 'Tahun', 'kab_kota': 'Kabupaten/Kota', 'jumlah': 'kasus_dbd'},
+        'columns': KEY + ['kasus_dbd', 'jumlah_meninggal'],
+    },
+    'hujan': {
+        'file': 'curah_hujan_fix.csv',
+        'rename': {'jumlah (mm)': 'curah_hujan_mm'},
+        'columns': KEY + ['curah_hujan_mm'],
+    },
+    'sampah': {
+        'file': 'pengelolaan_sampah_fix.csv',
+        'rename': {'tahun_data': 'Tahun', 'kab_kota': 'Kabupaten/Kota', 'jumlah': 'timbulan_sampah_ton'},
+        'columns': KEY + ['timbulan_sampah_ton'],
+    },
+    'penduduk': {
+        'file': 'persentase_penduduk.csv',
+        'rename': {
+            'Jumlah Penduduk (Ribu)': 'penduduk_ribu',
+            'Kepadatan Penduduk per km persegi (Km2)': 'kepadatan_penduduk_km2',
+        },
+        'columns': KEY + ['penduduk_ribu', 'kepadatan_penduduk_km2'],
+    },
+    'sanitasi': {
+        'file': 'sanitasi.csv',
+        'rename': {'Rumah Tangga yang Memiliki Akses Terhadap Sanitasi Layak': 'akses_sanitasi_layak_persen'},
+        'columns': KEY + ['akses_sanitasi_layak_persen'],
+    },
+}
+
+# Urutan merge mengikuti notebook: dbd -> hujan -> sampah -> penduduk -> sanitasi
+MERGE_ORDER = ['dbd', 'hujan', 'sampah', 'penduduk', 'sanitasi']
+
+
+# ============================================================================
+# FINGERPRINT & CACHE
+# ============================================================================
+def fingerprint(path, block_size=1 << 20):
+    """SHA-256 isi file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_manifest(cache_dir, manifest):
+    path = os.path.join(cache_dir, MANIFEST_FILE)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# ============================================================================
+# TAHAPAN PIPELINE
+# ============================================================================
+def load_source(name, data_dir='.', index=None, report=None):
+    """Baca satu sumber mentah, rename kolom, dan cocokkan nama wilayah ke registry"""
+    spec = SOURCES[name]
+    index = index or load_alias_index(data_dir)
+    df = pd.read_csv(os.path.join(data_dir, spec['file'])).rename(columns=spec['rename'])
+    df = apply_registry(df, index, spec['file'], report)
+    return df[MERGE_KEY + spec['columns'][len(KEY):]]
+
+
+def merge_sources(frames):
+    """Gabungkan seluruh sumber pada (Tahun, wilayah) dan hitung fitur turunan"""
+    df_wrangled = frames[MERGE_ORDER[0]]
+    for name in MERGE_ORDER[1:]:
+        df_wrangled = df_wrangled.merge(frames[name], on=MERGE_KEY)
+
+    df_wrangled['IR_DBD_per_100k'] = (df_wrangled['kasus_dbd'] / (df_wrangled['penduduk_ribu'] * 1000)) * 100000
+    df_wrangled['CFR_DBD_persen'] = (df_wrangled['jumlah_meninggal'] / df_wrangled['kasus_dbd']) * 100
+    df_wrangled['CFR_DBD_persen'] = df_wrangled['CFR_DBD_persen'].fillna(0)
+    df_wrangled['sampah_per_kapita_kg'] = df_wrangled['timbulan_sampah_ton'] / df_wrangled['penduduk_ribu']
+    return df_wrangled
+
+
+def add_lag_features(df_wrangled):
+    """Tambahkan IR_tahun_lalu per wilayah (tahun pertama diisi rata-rata IR wilayah)"""
+    df_final = df_wrangled.sort_values(['Kabupaten/Kota', 'Tahun'])
+    grouped = df_final.groupby('Kabupaten/Kota')['IR_DBD_per_100k']
+    df_final['IR_tahun_lalu'] = grouped.shift(1)
+    df_final['IR_tahun_lalu'] = df_final['IR_tahun_lalu'].fillna(grouped.transform('mean'))
+    return df_final
+
+
+# ============================================================================
+# TABEL MASTER (PARQUET)
+# ============================================================================
+def region_index(df):
+    """Daftar wilayah terurut dan offset baris [awal, akhir) tiap wilayah"""
+    names = df['Kabupaten/Kota'].astype(str).to_numpy()
+    boundaries = np.flatnonzero(names[1:] != names[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    stops = np.concatenate([boundaries, [len(names)]])
+
+    offsets = {names[start]: [int(start), int(stop)] for start, stop in zip(starts, stops)}
+    if len(offsets) != len(starts):
+        raise ValueError("Baris tabel master harus terurut per wilayah agar bisa diindeks dengan offset")
+    return sorted(offsets), offsets
+
+
+def to_master_table(df_final):
+    """Tipekan tabel dashboard: wilayah sebagai kategori terurut, tahun sebagai integer"""
+    df = df_final.reset_index(drop=True)
+    regions = sorted(df['Kabupaten/Kota'].astype(str).unique())
+    df['Kabupaten/Kota'] = pd.Categorical(df['Kabupaten/Kota'], categories=regions)
+    df['Tahun'] = df['Tahun'].astype(np.int16)
+    return df
+
+
+def write_master_table(df_final, path):
+    """Tulis tabel dashboard ke Parquet beserta daftar wilayah dan indeks offset di metadata"""
+    df = to_master_table(df_final)
+    regions, offsets = region_index(df)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[MASTER_INDEX_KEY] = json.dumps({'regions': regions, 'offsets': offsets}).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_master_table(path):
+    """Baca tabel dashboard Parquet; kembalikan (df, daftar wilayah, offset per wilayah)"""
+    table = pq.read_table(path)
+    index = json.loads(table.schema.metadata[MASTER_INDEX_KEY])
+    return table.to_pandas(), index['regions'], index['offsets']
+
+
+def build(data_dir='.', out_dir='.', cache_dir=CACHE_DIR, force=False, verbose=True):
+    """Bangun df_gabungan.csv dan df_final_dashboard.csv secara inkremental"""
+    log = print if verbose else (lambda *args, **kwargs: None)
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = {} if force else _read_manifest(cache_dir)
+    # Registry wilayah berubah -> semua sumber dicocokkan ulang
+    registry_fp = fingerprint(registry_path(data_dir))
+    sources_manifest = manifest.get('sources', {}) if manifest.get('registry') == registry_fp else {}
+
+    index = load_alias_index(data_dir)
+    frames, changed, report = {}, [], {}
+    for name, spec in SOURCES.items():
+        fp = fingerprint(os.path.join(data_dir, spec['file']))
+        cache_path = os.path.join(cache_dir, name + '.pkl')
+        report_path = os.path.join(cache_dir, name + '_wilayah.pkl')
+        if sources_manifest.get(name) == fp and os.path.exists(cache_path) and os.path.exists(report_path):
+            frames[name] = pd.read_pickle(cache_path)
+            report[name] = pd.read_pickle(report_path)
+        else:
+            source_report = []
+            frames[name] = load_source(name, data_dir, index, source_report)
+            report[name] = report_frame(source_report)
+            frames[name].to_pickle(cache_path)
+            report[name].to_pickle(report_path)
+            sources_manifest[name] = fp
+            changed.append(name)
+
+    out_wrangled = os.path.join(out_dir, 'df_gabungan.csv')
+    out_final = os.path.join(out_dir, 'df_final_dashboard.csv')
+    out_master = os.path.join(out_dir, 'df_final_dashboard.parquet')
+    outputs_exist = all(os.path.exists(path) for path in (out_wrangled, out_final, out_master))
+    if not changed and outputs_exist and manifest.get('outputs') == sources_manifest:
+        log("Tidak ada sumber yang berubah, output sudah terbaru.")
+        return None
+
+    log(f"Sumber yang dibangun ulang: {', '.join(changed) if changed else '-'}")
+    df_wrangled = merge_sources(frames)
+    df_final = add_lag_features(df_wrangled)
+
+    df_wrangled.to_csv(out_wrangled, index=False)
+    df_final.to_csv(out_final, index=False)
+    write_master_table(df_final, out_master)
+
+    # Laporan hanya ditulis bila ada nama wilayah yang dicocokkan fuzzy / tidak cocok
+    df_report = report_frame([r for r in report.values() if len(r)])
+    out_report = os.path.join(out_dir, REPORT_FILE)
+    if len(df_report):
+        df_report.to_csv(out_report, index=False)
+        log(f"{int(df_report['baris'].sum())} baris dengan nama wilayah fuzzy/tidak cocok -> {out_report}")
+    elif os.path.exists(out_report):
+        os.remove(out_report)
+
+    # 'outputs' mencatat fingerprint sumber yang dipakai untuk output terakhir
+    _write_manifest(cache_dir, {
+        'registry': registry_fp,
+        'sources': sources_manifest,
+        'outputs': dict(sources_manifest),
+    })
+    log(f"Build selesai: {len(df_final)} baris -> {out_final}, {out_master}")
+    return df_final
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun tabel dashboard DBD dari CSV mentah")
+    parser.add_argument('--data-dir', default='.', help="Direktori CSV mentah")
+    parser.add_argument('--out-dir', default='.', help="Direktori output")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="Direktori cache fingerprint")
+    parser.add_argument('--force', action='store_true', help="Abaikan cache dan build ulang semua sumber")
+    args = parser.parse_args(argv)
+    build(args.data_dir, args.out_dir, args.cache_dir, force=args.force)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Instrumentasi waktu per bagian dashboard (hot path setiap rerun Streamlit).
+
+Diaktifkan lewat variabel lingkungan:
+    DBD_PROFILE=1 streamlit run app.py
+    DBD_PROFILE=1 DBD_PROFILE_LOG=/tmp/dbd_profile.jsonl streamlit run app.py
+
+Saat aktif, setiap bagian yang dibungkus `profiler.section(nama)` dicatat
+durasinya: disimpan di memori (jendela N rerun terakhir per bagian, untuk
+panel persentil di sidebar) dan ditambahkan ke file JSON-lines (satu baris per
+pengukuran) yang bisa di-scrape. Saat tidak aktif, `section` mengembalikan
+context manager kosong sehingga biayanya praktis nol.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+import pandas as pd
+
+ENV_ENABLED = 'DBD_PROFILE'
+ENV_LOG = 'DBD_PROFILE_LOG'
+DEFAULT_LOG = 'profiling.jsonl'
+DEFAULT_WINDOW = 500
+
+_DISABLED = nullcontext()
+
+
+def profiling_enabled():
+    """True bila DBD_PROFILE bernilai 1/true/yes/on"""
+    return os.environ.get(ENV_ENABLED, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class Profiler:
+    """Pencatat durasi per bagian dengan jendela geser dan ekspor JSON-lines"""
+
+    def __init__(self, enabled=None, log_path=None, window=DEFAULT_WINDOW):
+        self.enabled = profiling_enabled() if enabled is None else enabled
+        self.log_path = log_path if log_path is not None else os.environ.get(ENV_LOG, DEFAULT_LOG)
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start_run(self):
+        """Tandai awal rerun; semua pengukuran sampai `end_run` memakai run_id yang sama"""
+        if self.enabled:
+            self._local.run_id = uuid.uuid4().hex[:12]
+            self._local.run_start = time.perf_counter()
+
+    def end_run(self):
+        """Catat total durasi rerun sebagai bagian 'total'"""
+        if self.enabled and getattr(self._local, 'run_start', None) is not None:
+            self.record('total', time.perf_counter() - self._local.run_start)
+            self._local.run_start = None
+
+    def section(self, name):
+        """Context manager pengukur durasi satu bagian (no-op bila profiling tidak aktif)"""
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """Simpan satu pengukuran (detik) ke memori dan file JSON-lines"""
+        if not self.enabled:
+            return
+        ms = seconds * 1000.0
+        entry = {
+            'ts': time.time(),
+            'run_id': getattr(self._local, 'run_id', None),
+            'section': name,
+            'ms': round(ms, 3),
+        }
+        with self._lock:
+            self._samples[name].append(ms)
+            if self.log_path:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+
+    def summary(self):
+        """Persentil latensi per bagian (ms) dari jendela pengukuran terakhir"""
+        with self._lock:
+            samples = {name: np.array(values) for name, values in self._samples.items() if values}
+        rows = [{
+            'bagian': name,
+            'n': len(values),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95)),
+            'terakhir_ms': float(values[-1]),
+        } for name, values in samples.items()]
+        if not rows:
+            return pd.DataFrame(columns=['bagian', 'n', 'p50_ms', 'p95_ms', 'terakhir_ms'])
+        return pd.DataFrame(rows).sort_values('p95_ms', ascending=False).reset_index(drop=True)
+
+    def reset(self):
+        """Kosongkan pengukuran di memori (file JSON-lines tidak diubah)"""
+        with self._lock:
+            self._samples.clear()
+
+
+def read_log(path=DEFAULT_LOG):
+    """Baca file JSON-lines hasil profiling sebagai DataFrame"""
+    return pd.read_json(path, lines=True)
@@ -0,0 +1,249 @@
+"""
+Pemangkasan Random Forest: pilih subset pohon terkecil yang akurasinya tetap
+dalam toleransi R²/MAE model penuh, lalu simpan sebagai bundle pengganti.
+
+Model robust memakai 1000 pohon (max_depth=5); rata-rata hutan biasanya sudah
+stabil jauh sebelum itu. Langkahnya:
+
+- prediksi setiap pohon dihitung sekali (array datar) untuk split latih & uji
+  70:30 (random_state 42, seperti notebook); sebagian split latih disisihkan
+  sebagai split validasi;
+- urutan pohon: 'greedy' (ordered aggregation: setiap langkah menambah pohon
+  yang paling menurunkan error rata-rata pada sisa split latih) atau 'acak'
+  (urutan asli, setara melatih hutan yang lebih kecil);
+- R²/MAE/RMSE split validasi & uji untuk setiap jumlah pohon k dihitung
+  sekaligus dari jumlah kumulatif prediksi pohon, tanpa memprediksi ulang per k;
+- k terkecil (minimal 50 pohon, untuk interval prediksi) sejak mana R² >=
+  R² penuh - toleransi dan MAE <= MAE penuh x (1 + toleransi) untuk semua
+  ukuran yang lebih besar dipilih pada split validasi, sehingga metrik split
+  uji yang dilaporkan & disimpan di bundle tidak ikut "memilih" k; latensi
+  prediksi dan ukuran artefak diukur pada beberapa ukuran untuk kurva
+  trade-off (prune_curve.csv).
+
+Hasilnya tetap hutan (subset pohon), bukan model distilasi, sehingga interval
+prediksi dari sebaran pohon (uncertainty.py) dan TreeSHAP tetap berlaku.
+Model sumber default adalah versi aktif registry. Tanpa opsi output hanya
+kurva yang ditulis. Dengan --register bundle hasil (kunci model/features/metrics
+yang sama, beserta hash data training model sumber) didaftarkan ke registry
+model sebagai versi baru; dashboard baru memakainya setelah dipromosikan
+(--promote sekaligus mendaftarkan). Dengan --output-dir bundle ditulis ke
+direktori berupa symlink yang ditukar secara atomik (forest_arrays.publish_forest).
+
+Pemakaian:
+    python prune_forest.py                                  # kurva saja
+    python prune_forest.py --register                       # + versi registry baru (belum aktif)
+    python prune_forest.py --r2-tol 0.005 --mae-tol 0.02 --promote
+    python prune_forest.py --order acak --output-dir model_pruned_forest
+"""
+import argparse
+import copy
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from experiments import TARGET, default_data_path, evaluate, read_training_table
+from forest_arrays import ARRAY_NAMES, as_flat_forest, default_model_path, open_bundle, publish_forest
+from registry import current_model_path, promote, register
+
+CURVE_FILE = 'prune_curve.csv'
+ORDERS = ('greedy', 'acak')
+# Ukuran yang diukur latensi & ukuran artefaknya (metrik akurasi dihitung untuk setiap k)
+CURVE_SIZES = (10, 25, 50, 100, 200, 300, 500, 750, 1000)
+# Interval prediksi 5-95% (uncertainty.py) dihitung dari sebaran pohon: butuh cukup banyak pohon
+MIN_TREES = 50
+
+
+# ============================================================================
+# URUTAN POHON & KURVA AKURASI
+# ============================================================================
+def greedy_order(per_tree, y):
+    """Ordered aggregation: urutan pohon yang setiap langkah paling menurunkan MSE rata-rata kumulatif"""
+    n_trees = per_tree.shape[0]
+    remaining = np.ones(n_trees, dtype=bool)
+    total = np.zeros(per_tree.shape[1])
+    order = []
+    for k in range(1, n_trees + 1):
+        # MSE rata-rata k pohon untuk setiap kandidat pohon ke-k sekaligus
+        errors = (((total + per_tree) / k - y) ** 2).mean(axis=1)
+        errors[~remaining] = np.inf
+        best = int(np.argmin(errors))
+        order.append(best)
+        remaining[best] = False
+        total += per_tree[best]
+    return np.array(order)
+
+
+def tree_order(per_tree_train, y_train, order='greedy'):
+    """Urutan pohon untuk pemangkasan ('greedy' pada split latih, atau 'acak' = urutan asli)"""
+    if order == 'greedy':
+        return greedy_order(per_tree_train, y_train)
+    return np.arange(per_tree_train.shape[0])
+
+
+def accuracy_curve(per_tree, y, order):
+    """R², MAE, RMSE rata-rata k pohon pertama (menurut `order`) untuk setiap k"""
+    k = np.arange(1, len(order) + 1)
+    pred = np.cumsum(per_tree[order], axis=0) / k[:, None]
+    residual = pred - y
+    sse = (residual ** 2).sum(axis=1)
+    return pd.DataFrame({
+        'n_pohon': k,
+        'r2': 1 - sse / ((y - y.mean()) ** 2).sum(),
+        'mae': np.abs(residual).mean(axis=1),
+        'rmse': np.sqrt(sse / len(y)),
+    })
+
+
+def choose_size(curve, r2_tol, mae_tol, min_trees=MIN_TREES):
+    """Jumlah pohon terkecil (>= min_trees) sejak mana kurva tetap dalam toleransi R² (absolut) & MAE (relatif)"""
+    full = curve.iloc[-1]
+    ok = ((curve['r2'] >= full['r2'] - r2_tol) & (curve['mae'] <= full['mae'] * (1 + mae_tol))).to_numpy()
+    # Titik yang kebetulan masuk toleransi lalu keluar lagi (noise split uji) tidak dipilih
+    stable = np.logical_and.accumulate(ok[::-1])[::-1]
+    stable &= curve['n_pohon'].to_numpy() >= min(min_trees, len(curve))
+    return int(curve['n_pohon'].to_numpy()[stable][0])
+
+
+# ============================================================================
+# LATENSI & UKURAN
+# ============================================================================
+def artifact_bytes(forest):
+    """Ukuran array datar di disk (tanpa meta.json)"""
+    return sum(np.asarray(getattr(forest, name)).nbytes for name in ARRAY_NAMES if getattr(forest, name) is not None)
+
+
+def measure_latency(forest, X, repeat=5):
+    """Latensi prediksi terbaik dari `repeat` kali (ms) untuk seluruh baris X"""
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        forest.predict(X)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def cost_curve(forest, order, X, sizes=CURVE_SIZES, repeat=5):
+    """Latensi prediksi & ukuran artefak untuk beberapa jumlah pohon"""
+    sizes = sorted({min(size, len(order)) for size in sizes} | {len(order)})
+    rows = []
+    for size in sizes:
+        pruned = forest.subset(order[:size])
+        rows.append({
+            'n_pohon': size,
+            'latensi_ms': measure_latency(pruned, X, repeat),
+            'ukuran_kb': artifact_bytes(pruned) / 1024,
+        })
+    return pd.DataFrame(rows)
+
+
+# ============================================================================
+# BUNDLE
+# ============================================================================
+def prune_bundle(bundle, forest, trees, metrics, info):
+    """Bundle pengganti: subset pohon dengan kunci model/features/metrics yang sama"""
+    pruned = dict(bundle)
+    # Subset pohon terpilih tidak setara dengan melatih ulang hutan dengan hyperparameter sumber
+    pruned.pop('params', None)
+    pruned['model'] = forest.subset(trees)
+    pruned['metrics'] = {key: round(float(value), 4) for key, value in metrics.items()}
+    pruned['pruning'] = info
+    return pruned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pangkas Random Forest DBD ke jumlah pohon terkecil dalam toleransi")
+    parser.add_argument('--model', default=None, help="Model sumber (direktori array datar atau pickle joblib)")
+    parser.add_argument('--data', default=None, help="Tabel master (CSV/Parquet)")
+    parser.add_argument('--r2-tol', type=float, default=0.01, help="Penurunan R² uji maksimum (absolut)")
+    parser.add_argument('--mae-tol', type=float, default=0.05, help="Kenaikan MAE uji maksimum (relatif)")
+    parser.add_argument('--min-trees', type=int, default=MIN_TREES, help="Jumlah pohon minimum hasil pemangkasan")
+    parser.add_argument('--order', choices=ORDERS, default='greedy', help="Urutan pemilihan pohon")
+    parser.add_argument('--test-size', type=float, default=0.30, help="Porsi split uji")
+    parser.add_argument('--val-size', type=float, default=0.25, help="Porsi split latih untuk validasi (pemilihan k)")
+    parser.add_argument('--random-state', type=int, default=42, help="Seed split latih/uji")
+    parser.add_argument('--repeat', type=int, default=5, help="Pengulangan pengukuran latensi")
+    parser.add_argument('--note', default='', help="Catatan versi registry")
+    parser.add_argument('--register', action='store_true', help="Daftarkan bundle hasil pemangkasan ke registry model")
+    parser.add_argument('--promote', action='store_true', help="Daftarkan & langsung aktifkan versi hasil pemangkasan")
+    parser.add_argument('--output-dir', default=None, help="Tulis bundle array datar ke direktori ini")
+    parser.add_argument('--output-pickle', default=None, help="Simpan bundle pickle joblib (model sumber harus sklearn)")
+    parser.add_argument('--curve', default=CURVE_FILE, help="File CSV kurva akurasi/latensi/ukuran")
+    args = parser.parse_args(argv)
+
+    model_path = args.model or current_model_path() or default_model_path()
+    bundle = open_bundle(model_path)
+    if args.output_pickle and not hasattr(bundle['model'], 'estimators_'):
+        parser.error("--output-pickle membutuhkan model sumber sklearn (pickle joblib)")
+    forest = as_flat_forest(bundle['model'])
+    features = bundle['features']
+
+    df = read_training_table(args.data or default_data_path())
+    X_train, X_test, y_train, y_test = train_test_split(
+        df[features], df[TARGET], test_size=args.test_size, random_state=args.random_state
+    )
+    y_train, y_test = y_train.to_numpy(np.float64), y_test.to_numpy(np.float64)
+    # k dipilih pada split validasi (bagian split latih); split uji hanya untuk metrik yang dilaporkan
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=args.val_size, random_state=args.random_state
+    )
+
+    order = tree_order(forest.predict_per_tree(X_fit), y_fit, args.order)
+    val_curve = accuracy_curve(forest.predict_per_tree(X_val), y_val, order)
+    n_trees = choose_size(val_curve, args.r2_tol, args.mae_tol, args.min_trees)
+    curve = accuracy_curve(forest.predict_per_tree(X_test), y_test, order)
+
+    # Latensi diukur pada seluruh tabel (beban terberat dashboard: prediksi + interval semua baris)
+    costs = cost_curve(forest, order, df[features], CURVE_SIZES + (n_trees,), args.repeat)
+    val_columns = {name: f"{name}_val" for name in ('r2', 'mae', 'rmse')}
+    report = curve.merge(val_curve.rename(columns=val_columns), on='n_pohon').merge(costs, on='n_pohon', how='left')
+    report.to_csv(args.curve, index=False)
+    print(report.dropna().to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    trees = np.sort(order[:n_trees])
+    info = {
+        'sumber': model_path,
+        'n_pohon_awal': forest.n_estimators,
+        'n_pohon': n_trees,
+        'urutan': args.order,
+        'r2_tol': args.r2_tol,
+        'mae_tol': args.mae_tol,
+        'val_size': args.val_size,
+    }
+    metrics = evaluate(forest.subset(trees), X_train, X_test, y_train, y_test)
+    pruned = prune_bundle(bundle, forest, trees, metrics, info)
+    # Registry hanya diubah bila diminta; tanpa opsi output cukup kurva & ringkasan
+    record = None
+    if args.register or args.promote:
+        record = register(pruned, args.data, args.note or f"pruned {n_trees} pohon dari {model_path}")
+        if args.promote:
+            promote(record['version'])
+    if args.output_dir:
+        publish_forest(pruned, args.output_dir)
+    if args.output_pickle:
+        # Pickle memakai estimator sklearn asli yang terpilih agar tetap bisa dibuka tanpa forest_arrays
+        model = copy.copy(bundle['model'])
+        model.estimators_ = [bundle['model'].estimators_[i] for i in trees]
+        model.n_estimators = n_trees
+        joblib.dump(dict(pruned, model=model), args.output_pickle)
+
+    full, chosen = report.iloc[-1], report.iloc[n_trees - 1]
+    full_cost = costs.iloc[-1]
+    chosen_cost = costs.set_index('n_pohon').loc[n_trees]
+    print(f"\nPohon: {forest.n_estimators} -> {n_trees} (urutan {args.order})")
+    print(f"R² validasi: {full['r2_val']:.4f} -> {chosen['r2_val']:.4f} | "
+          f"R² uji: {full['r2']:.4f} -> {chosen['r2']:.4f} | MAE uji: {full['mae']:.2f} -> {chosen['mae']:.2f}")
+    print(f"Latensi: {full_cost['latensi_ms']:.1f} ms -> {chosen_cost['latensi_ms']:.1f} ms | "
+          f"ukuran: {full_cost['ukuran_kb']:.0f} KB -> {chosen_cost['ukuran_kb']:.0f} KB")
+    outputs = [record['version'] + (' (aktif)' if args.promote else ' (belum aktif)')] if record else []
+    outputs += [path for path in (args.output_dir, args.output_pickle) if path]
+    if outputs:
+        print(f"Bundle -> {', '.join(outputs)} | kurva -> {args.curve}")
+    else:
+        print(f"Kurva -> {args.curve} (bundle tidak disimpan; pakai --register atau --output-dir)")
+
+
+if __name__ == '__main__':
+    main()
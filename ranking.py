@@ -0,0 +1,81 @@
+"""
+Peringkat risiko seluruh wilayah untuk tampilan perbandingan multi-wilayah.
+
+Tabel peringkat, urutan baris untuk setiap kunci sort, dan matriks IR
+wilayah x tahun (heatmap) dihitung sekali per versi data/model dari tabel
+prediksi dashboard. Setiap rerun hanya memotong satu halaman dari urutan
+yang sudah dihitung, sehingga tampilan tetap ringan walaupun jumlah wilayah
+mencapai skala nasional.
+
+Wilayah dengan data fitur tidak lengkap (tanpa prediksi & kelas risiko) tidak
+diberi peringkat dan selalu berada di akhir setiap urutan.
+"""
+import numpy as np
+import pandas as pd
+
+from risk import RISK_LEVELS
+
+# Kunci sort -> label di dashboard
+SORT_OPTIONS = {
+    'pred_ir': "Prediksi IR tertinggi",
+    'perubahan_ir': "Kenaikan IR terbesar (vs tahun lalu)",
+    'kelas_risiko': "Kelas risiko",
+}
+PAGE_SIZES = [25, 50, 100]
+
+
+def build_ranking(df, df_prediksi):
+    """Tabel peringkat, urutan per kunci sort, dan matriks IR wilayah x tahun"""
+    table = pd.DataFrame({
+        'Kabupaten/Kota': df_prediksi['Kabupaten/Kota'].astype(str).to_numpy(),
+        'Tahun': df_prediksi['Tahun'].to_numpy(),
+        'IR_tahun_lalu': df_prediksi['IR_tahun_lalu'].to_numpy(),
+        'IR_DBD_per_100k': df_prediksi['IR_DBD_per_100k'].to_numpy(),
+        'pred_ir': df_prediksi['pred_ir'].to_numpy(),
+        'kelas_risiko': df_prediksi['kelas_risiko'].to_numpy(),
+        'prob_di_atas_50': df_prediksi['prob_di_atas_50'].to_numpy(),
+        'kategori_rekomendasi': df_prediksi['kategori_rekomendasi'].to_numpy(),
+    })
+    # Perubahan prediksi IR terhadap IR aktual tahun sebelumnya
+    table['perubahan_ir'] = table['pred_ir'] - table['IR_tahun_lalu']
+
+    ranked = table['kelas_risiko'].notna().to_numpy()
+    valid, incomplete = np.flatnonzero(ranked), np.flatnonzero(~ranked)
+    pred = table['pred_ir'].to_numpy()[valid]
+    severity = pd.Categorical(table['kelas_risiko'], categories=RISK_LEVELS).codes[valid]
+    orders = {
+        'pred_ir': np.argsort(-pred, kind='stable'),
+        'perubahan_ir': np.argsort(-table['perubahan_ir'].to_numpy()[valid], kind='stable'),
+        # Kelas paling berat lebih dulu, di dalam kelas diurutkan menurut prediksi IR
+        'kelas_risiko': np.lexsort((-pred, -severity)),
+    }
+    # Urutan di antara wilayah yang berprediksi, lalu wilayah berdata tidak lengkap di akhir
+    orders = {key: np.concatenate([valid[order], incomplete]) for key, order in orders.items()}
+    table.insert(0, 'peringkat', pd.array([pd.NA] * len(table), dtype='Int64'))
+    table.loc[orders['pred_ir'][:len(valid)], 'peringkat'] = np.arange(1, len(valid) + 1)
+
+    ir_matrix = (df.groupby(['Kabupaten/Kota', 'Tahun'], observed=True)['IR_DBD_per_100k']
+                 .mean().unstack('Tahun'))
+    ir_matrix.index = ir_matrix.index.astype(str)
+    return {'table': table, 'orders': orders, 'ir_matrix': ir_matrix}
+
+
+def n_pages(ranking, page_size):
+    """Jumlah halaman untuk ukuran halaman tertentu"""
+    return max(1, -(-len(ranking['table']) // page_size))
+
+
+def get_page(ranking, sort_key, page, page_size, ascending=False):
+    """Potongan tabel peringkat untuk halaman `page` (mulai 1) menurut kunci sort"""
+    order = ranking['orders'][sort_key]
+    if ascending:
+        # Hanya wilayah berperingkat yang dibalik; data tidak lengkap tetap di akhir
+        n_ranked = int(ranking['table']['kelas_risiko'].notna().sum())
+        order = np.concatenate([order[:n_ranked][::-1], order[n_ranked:]])
+    start = (page - 1) * page_size
+    return ranking['table'].iloc[order[start:start + page_size]]
+
+
+def risk_counts(ranking):
+    """Jumlah wilayah per kelas risiko"""
+    return ranking['table']['kelas_risiko'].value_counts().reindex(RISK_LEVELS, fill_value=0)
@@ -0,0 +1,137 @@
+"""
+Teks rekomendasi mitigasi DBD: daftar tindakan per status risiko, saran per
+variabel sesuai arah kontribusinya, dan format nilai untuk ditampilkan.
+
+Dipakai bersama oleh tab PREDIKSI & REKOMENDASI dan ANALISIS VARIABEL di
+dashboard serta ekspor brief per wilayah (export_reports.py), sehingga isi
+brief selalu sama dengan yang terlihat di dashboard.
+"""
+import pandas as pd
+
+# Tindakan strategis utama untuk setiap kelas risiko
+STATUS_ACTIONS = {
+    'tinggi': {
+        'judul': "🚨 STATUS DARURAT - TINDAKAN SEGERA DIPERLUKAN",
+        'langkah': [
+            "**AKTIFKAN POSKO DARURAT DBD** di tingkat kecamatan dengan anggaran khusus",
+            "**FOGGING INTENSIF** radius 200m dari lokasi kasus baru dalam 24 jam",
+            "**MOBILISASI TENAGA MEDIS** tambahan dan pastikan ketersediaan platelet",
+            "**SURVEILANS HARIAN** oleh Dinas Kesehatan dan lapor ke Gubernur",
+            "**GERAKAN MASSAL 3M PLUS** melibatkan TNI/Polri dan organisasi masyarakat",
+        ],
+    },
+    'sedang': {
+        'judul': "🟡 STATUS WASPADA - TINGKATKAN PENCEGAHAN",
+        'langkah': [
+            "**INTENSIFKAN PSN** (Pembersihan Sarang Nyamuk) serentak seminggu sekali",
+            "**DISTRIBUSI ABATE/LARVASIDA** ke seluruh rumah di wilayah rawan",
+            "**SOSIALISASI MASIF** 3M Plus melalui media lokal dan kader",
+            "**PEMANTAUAN JENTIK** mingguan dengan cakupan >80% rumah",
+            "**SIAGA RUJUKAN** di fasilitas kesehatan dengan bed khusus DBD",
+        ],
+    },
+    'rendah': {
+        'judul': "✅ STATUS AMAN - PERTAHANKAN DAN OPTIMALKAN",
+        'langkah': [
+            "**LANJUTKAN PEMANTAUAN RUTIN** jentik oleh Jumantik terlatih",
+            "**EDUKASI BERKELANJUTAN** di sekolah dan perkantoran",
+            "**PERTAHANKAN SANITASI** dan drainase lingkungan",
+            "**KAPASITAS RESPONS CEPAT** yang siap diaktifkan jika diperlukan",
+            "**DOKUMENTASI BEST PRACTICE** untuk replikasi ke wilayah lain",
+        ],
+    },
+}
+
+# Status tampilan untuk setiap arah kontribusi
+DIRECTION_STATUS = {
+    'naik': ("🔼 **MENAIKKAN RISIKO**", "#ef4444"),
+    'netral': ("↔️ **PENGARUH KECIL**", "#f59e0b"),
+    'turun': ("🔽 **MENURUNKAN RISIKO**", "#10b981"),
+}
+MISSING_STATUS = ("❓ **DATA TIDAK TERSEDIA**", "#94a3b8")
+
+VARIABLE_RECOMMENDATIONS = {
+    'IR_tahun_lalu': {
+        'naik': "📈 **Riwayat kasus tahun lalu menaikkan prediksi** → Fokuskan surveilans intensif di wilayah dengan riwayat kasus tinggi",
+        'netral': "📊 **Riwayat kasus tahun lalu berpengaruh kecil** → Lanjutkan pemantauan rutin dan persiapan respons cepat",
+        'turun': "📉 **Riwayat kasus tahun lalu menurunkan prediksi** → Pertahankan pencegahan dan waspada peningkatan mendadak"
+    },
+    'kepadatan_penduduk_km2': {
+        'naik': "🏙️ **Kepadatan penduduk menaikkan prediksi** → Optimalkan PSN massal, distribusi kelambu, dan pengaturan jarak hunian",
+        'netral': "🏘️ **Kepadatan penduduk berpengaruh kecil** → Tingkatkan edukasi dan partisipasi masyarakat dalam 3M Plus",
+        'turun': "🌳 **Kepadatan penduduk menurunkan prediksi** → Fokus pada daerah perkantoran dan fasilitas umum"
+    },
+    'curah_hujan_mm': {
+        'naik': "🌧️ **Curah hujan menaikkan prediksi** → Perketat pemantauan genangan air, perbaiki drainase, sosialisasi PSN",
+        'netral': "⛈️ **Curah hujan berpengaruh kecil** → Waspada penampungan air hujan di rumah tangga",
+        'turun': "☀️ **Curah hujan menurunkan prediksi** → Perhatikan penampungan air buatan dan penyimpanan air bersih"
+    },
+    'akses_sanitasi_layak_persen': {
+        'naik': "🚨 **Kondisi sanitasi menaikkan prediksi** → Prioritas intervensi infrastruktur sanitasi",
+        'netral': "⚠️ **Sanitasi berpengaruh kecil** → Intensifkan sosialisasi sanitasi sehat",
+        'turun': "✅ **Sanitasi layak menurunkan prediksi** → Pertahankan dan tingkatkan cakupan"
+    }
+}
+
+
+def format_number(value, is_population=False):
+    """Format angka dengan penanganan untuk nilai None/NaN"""
+    if pd.isna(value) or value is None:
+        return "N/A"
+    try:
+        # Coba format sebagai float
+        float_val = float(value)
+
+        # Jika ini data penduduk dalam ribuan, kalikan dengan 1000
+        if is_population:
+            float_val = float_val * 1000
+
+        if float_val >= 1000000:
+            return f"{float_val/1000000:,.2f} juta"
+        elif float_val >= 1000:
+            return f"{float_val:,.0f}"
+        elif float_val.is_integer():
+            return f"{int(float_val):,}"
+        else:
+            return f"{float_val:,.2f}"
+    except:
+        return str(value)
+
+
+def format_feature_value(feature_name, value):
+    """Nilai variabel untuk ditampilkan (persen, jumlah penduduk, atau angka biasa)"""
+    if pd.isna(value):
+        return "N/A"
+    # Akhiran '_p' saja: 'kepadatan_penduduk_km2' bukan persen
+    if 'persen' in feature_name.lower() or feature_name.lower().endswith('_p'):
+        return f"{value:.1f}%"
+    if 'ribu' in feature_name.lower():
+        return format_number(value, is_population=True)
+    return format_number(value)
+
+
+def status_markdown(risk_level):
+    """Judul dan daftar tindakan bernomor untuk kelas risiko (markdown)"""
+    status = STATUS_ACTIONS[risk_level]
+    steps = "\n".join(f"{i}. {step}" for i, step in enumerate(status['langkah'], 1))
+    return f"## {status['judul']}\n\n{steps}"
+
+
+def get_variable_recommendation(feature_name, direction):
+    """Menghasilkan rekomendasi spesifik untuk setiap variabel sesuai arah kontribusinya"""
+    if feature_name in VARIABLE_RECOMMENDATIONS:
+        return VARIABLE_RECOMMENDATIONS[feature_name][direction]
+
+    # Default untuk variabel lain
+    feature_display = feature_name.replace('_', ' ').title()
+    return {
+        'naik': f"📊 **{feature_display} menaikkan prediksi** → Perlu evaluasi dampaknya terhadap risiko DBD",
+        'netral': f"📈 **{feature_display} berpengaruh kecil** → Monitor perkembangan secara berkala",
+        'turun': f"📉 **{feature_display} menurunkan prediksi** → Kondisi optimal untuk pencegahan"
+    }[direction]
+
+
+def missing_recommendation(variable_display):
+    """Saran bila nilai variabel wilayah tidak tersedia"""
+    return (f"⚠️ **Data tidak tersedia** untuk {variable_display}. "
+            "Disarankan untuk mengumpulkan data ini untuk analisis yang lebih akurat.")
@@ -0,0 +1,164 @@
+"""
+Registry wilayah kanonik (kode wilayah BPS) dan pencocokan nama wilayah sumber.
+
+Setiap sumber menulis nama wilayah berbeda ('Kab.Cilacap', 'Kab. Cilacap',
+'Cilacap', 'Kota Semarang'). Normalisasi lama (hapus 'kab. ' / 'kota ')
+menggabungkan Kota dan Kabupaten bernama sama (Semarang, Magelang,
+Pekalongan, Tegal) menjadi satu kunci sehingga merge menghasilkan perkalian
+silang baris. Modul ini menggantinya dengan:
+
+- registry `wilayah_bps.csv` (kode_wilayah, nama, jenis) sebagai sumber
+  kebenaran; kunci wilayah = nama huruf kecil untuk kabupaten dan
+  'kota <nama>' untuk kota;
+- indeks alias yang dihitung sekali dari registry ('kab cilacap',
+  'kabupaten cilacap', 'cilacap', 'kota semarang', ...). Nama tanpa awalan
+  dianggap kabupaten, kecuali tidak ada kabupaten bernama sama;
+- pencocokan vektor: nama unik dinormalisasi lalu dicari di indeks alias,
+  difflib dipakai sebagai fallback hanya untuk nama unik yang tidak cocok
+  persis, hasilnya dipetakan kembali ke seluruh baris;
+- laporan baris yang dicocokkan secara fuzzy atau tidak cocok sama sekali
+  (baris tidak cocok dibuang sebelum merge, bukan hilang diam-diam).
+
+Registry dicari di direktori data lebih dulu (misalnya data sintetis), lalu
+di direktori kerja.
+
+Pemakaian:
+    python regions.py                       # laporan pencocokan kelima sumber
+    python regions.py --data-dir data_2024
+"""
+import argparse
+import difflib
+import os
+
+import numpy as np
+import pandas as pd
+
+REGISTRY_FILE = 'wilayah_bps.csv'
+REPORT_FILE = 'laporan_wilayah.csv'
+FUZZY_CUTOFF = 0.85
+KOTA = 'Kota'
+REPORT_COLUMNS = ['sumber', 'nama_asli', 'baris', 'cara', 'kode_wilayah', 'Kabupaten/Kota']
+
+
+# ============================================================================
+# REGISTRY & INDEKS ALIAS
+# ============================================================================
+def alias_key(names):
+    """Bentuk pembanding nama (vektor): huruf kecil, tanda baca jadi spasi, spasi tunggal"""
+    return (pd.Series(names, dtype=str).str.lower()
+            .str.replace(r'[.,]', ' ', regex=True)
+            .str.split().str.join(' '))
+
+
+def registry_path(data_dir='.'):
+    """Registry di direktori data bila ada, jika tidak registry di direktori kerja"""
+    path = os.path.join(data_dir, REGISTRY_FILE)
+    return path if os.path.exists(path) else REGISTRY_FILE
+
+
+def load_registry(path=REGISTRY_FILE):
+    """Baca registry wilayah dan tambahkan kunci kanonik ('Kabupaten/Kota')"""
+    registry = pd.read_csv(path, dtype={'kode_wilayah': str})
+    if registry['kode_wilayah'].duplicated().any():
+        raise ValueError(f"{path}: kode_wilayah duplikat")
+    base = alias_key(registry['nama'])
+    registry['Kabupaten/Kota'] = np.where(registry['jenis'] == KOTA, 'kota ' + base, base)
+    if registry['Kabupaten/Kota'].duplicated().any():
+        raise ValueError(f"{path}: nama wilayah duplikat untuk jenis yang sama")
+    return registry
+
+
+def build_alias_index(registry):
+    """Indeks alias -> kode wilayah, dan kode -> kunci kanonik (dihitung sekali per registry)"""
+    base = alias_key(registry['nama']).to_numpy()
+    codes = registry['kode_wilayah'].to_numpy()
+    is_kota = (registry['jenis'] == KOTA).to_numpy()
+
+    aliases = {}
+    # Kabupaten lebih dulu: nama tanpa awalan ('semarang') menunjuk kabupaten
+    for prefixes, mask in ((['', 'kab ', 'kabupaten '], ~is_kota), (['kota ', ''], is_kota)):
+        for prefix in prefixes:
+            for name, code in zip(base[mask], codes[mask]):
+                aliases.setdefault(prefix + name, code)
+    return {
+        'aliases': aliases,
+        'alias_keys': list(aliases),
+        'names': dict(zip(codes, registry['Kabupaten/Kota'])),
+    }
+
+
+def load_alias_index(data_dir='.'):
+    """Indeks alias dari registry untuk direktori data"""
+    return build_alias_index(load_registry(registry_path(data_dir)))
+
+
+# ============================================================================
+# PENCOCOKAN
+# ============================================================================
+def resolve(names, index, cutoff=FUZZY_CUTOFF):
+    """Kode wilayah untuk setiap nama (Series sejajar input) dan tabel cara pencocokan per nama unik"""
+    names = pd.Series(names).astype(str)
+    unique = pd.Series(names.unique())
+    keys = alias_key(unique)
+    codes = keys.map(index['aliases'])
+    method = pd.Series(np.where(codes.notna(), 'tepat', 'tidak_cocok'), dtype=object)
+
+    # Fallback fuzzy hanya untuk nama unik yang tidak cocok persis
+    for i in np.flatnonzero(codes.isna().to_numpy()):
+        match = difflib.get_close_matches(keys[i], index['alias_keys'], n=1, cutoff=cutoff)
+        if match:
+            codes[i] = index['aliases'][match[0]]
+            method[i] = 'fuzzy'
+
+    matches = pd.DataFrame({'nama_asli': unique, 'kode_wilayah': codes, 'cara': method})
+    return names.map(dict(zip(unique, codes))), matches
+
+
+def apply_registry(df, index, source, report=None, column='Kabupaten/Kota'):
+    """Ganti nama wilayah df dengan kunci kanonik + kode_wilayah; baris tidak cocok dibuang & dilaporkan"""
+    codes, matches = resolve(df[column], index)
+    if report is not None:
+        flagged = matches[matches['cara'] != 'tepat']
+        if len(flagged):
+            counts = df[column].astype(str).value_counts()
+            report.append(pd.DataFrame({
+                'sumber': source,
+                'nama_asli': flagged['nama_asli'],
+                'baris': flagged['nama_asli'].map(counts).to_numpy(),
+                'cara': flagged['cara'],
+                'kode_wilayah': flagged['kode_wilayah'],
+                'Kabupaten/Kota': flagged['kode_wilayah'].map(index['names']),
+            }))
+
+    matched = codes.notna().to_numpy()
+    df = df[matched].copy()
+    df['kode_wilayah'] = codes[matched].to_numpy()
+    df[column] = df['kode_wilayah'].map(index['names']).to_numpy()
+    return df
+
+
+def report_frame(report):
+    """Gabungkan potongan laporan pencocokan menjadi satu tabel"""
+    if not report:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(report, ignore_index=True)[REPORT_COLUMNS]
+
+
+def main(argv=None):
+    from pipeline import SOURCES, load_source
+
+    parser = argparse.ArgumentParser(description="Laporan pencocokan nama wilayah sumber ke registry BPS")
+    parser.add_argument('--data-dir', default='.', help="Direktori CSV mentah")
+    args = parser.parse_args(argv)
+
+    index = load_alias_index(args.data_dir)
+    report = []
+    for name in SOURCES:
+        df = load_source(name, args.data_dir, index, report)
+        print(f"{name}: {df['kode_wilayah'].nunique()} wilayah, {len(df)} baris cocok")
+    report = report_frame(report)
+    print(report.to_string(index=False) if len(report) else "Semua nama wilayah cocok persis dengan registry.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Registry model lokal berbasis file: bundle berversi, checksum, metadata, dan
+penunjuk versi aktif yang dipromosikan secara atomik.
+
+Struktur direktori model_registry/:
+
+    registry.json          # daftar versi: checksum, hash data training, metrics, waktu
+    CURRENT                # versi aktif (JSON kecil, diganti dengan os.replace)
+    versions/v1/, v2/ ...  # bundle dalam format array datar (forest_arrays)
+
+- `register` menulis bundle ke direktori sementara lalu memindahkannya ke
+  versions/vN dalam satu rename, sehingga pembaca tidak pernah melihat
+  bundle setengah jadi; versi yang sudah terdaftar tidak pernah ditimpa;
+- checksum (SHA-256 isi seluruh file bundle) diperiksa ulang sebelum
+  promosi, dan hash data training (fingerprint sumber feature store)
+  dicatat agar jelas model dilatih dari data versi mana. Hash yang dibawa
+  bundle (`data_hash`, diisi experiments.py saat training) diutamakan; hash
+  data di disk saat pendaftaran hanya dipakai bila bundle tidak membawanya;
+- `promote` hanya mengganti file CURRENT. Dashboard dan layanan prediksi
+  (service.resolve_artifact_paths) mengikuti CURRENT: versi baru dimuat di
+  latar lalu ditukar, tanpa restart worker.
+
+Bila registry belum ada, dashboard tetap memakai model_robust_forest /
+model_robust_bundle.pkl seperti sebelumnya.
+
+Pemakaian:
+    python registry.py register                         # daftarkan model default (belum aktif)
+    python registry.py register model_pruned_forest --note "pruned 137 pohon" --promote
+    python registry.py list
+    python registry.py promote v2                       # aktifkan (atau kembalikan ke) versi 2
+    python registry.py verify v2
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+
+from dataset_stats import content_version
+from experiments import default_data_path
+from feature_store import sources_hash
+from forest_arrays import default_model_path, export_forest, open_bundle
+
+REGISTRY_DIR = 'model_registry'
+MANIFEST_FILE = 'registry.json'
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+
+
+# ============================================================================
+# MANIFEST & PENUNJUK VERSI AKTIF
+# ============================================================================
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(root=REGISTRY_DIR):
+    """Daftar versi terdaftar (urut dari yang paling lama)"""
+    return _read_json(os.path.join(root, MANIFEST_FILE), {'versions': []})['versions']
+
+
+def version_path(version, root=REGISTRY_DIR):
+    return os.path.join(root, VERSIONS_DIR, version)
+
+
+def get_record(version, root=REGISTRY_DIR):
+    """Metadata satu versi; ValueError bila versi tidak terdaftar"""
+    for record in read_manifest(root):
+        if record['version'] == version:
+            return record
+    raise ValueError(f"Versi model tidak terdaftar: {version}")
+
+
+def current(root=REGISTRY_DIR):
+    """Metadata versi aktif (beserta waktu promosi), atau None bila belum ada versi yang dipromosikan"""
+    pointer = _read_json(os.path.join(root, CURRENT_FILE), None)
+    if pointer is None:
+        return None
+    return dict(get_record(pointer['version'], root), promoted_at=pointer['promoted_at'])
+
+
+def current_model_path(root=REGISTRY_DIR):
+    """Direktori bundle versi aktif, atau None bila registry belum dipakai"""
+    record = current(root)
+    return version_path(record['version'], root) if record else None
+
+
+# ============================================================================
+# REGISTER, VERIFY, PROMOTE
+# ============================================================================
+def register(bundle, data_path=None, note='', root=REGISTRY_DIR):
+    """Simpan bundle sebagai versi baru (belum aktif) dan kembalikan metadatanya"""
+    os.makedirs(os.path.join(root, VERSIONS_DIR), exist_ok=True)
+    records = read_manifest(root)
+    number = max([int(record['version'][1:]) for record in records], default=0) + 1
+    version = f"v{number}"
+    created = datetime.now().isoformat(timespec='seconds')
+
+    # Versi & waktu ikut ditulis ke meta.json sehingga bundle yang dimuat tahu versinya sendiri
+    bundle = dict(bundle, registry_version=version, registered_at=created)
+    tmp_path = os.path.join(root, VERSIONS_DIR, f".{version}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    forest = export_forest(bundle, tmp_path)
+    checksum = content_version(tmp_path)
+    os.replace(tmp_path, version_path(version, root))
+
+    data_path = data_path or default_data_path()
+    record = {
+        'version': version,
+        'created': created,
+        'checksum': checksum,
+        'data_path': data_path,
+        # Data saat training bisa sudah berubah ketika bundle didaftarkan
+        'data_hash': bundle.get('data_hash') or sources_hash(data_path),
+        'metrics': bundle.get('metrics', {}),
+        'features': list(bundle['features']),
+        'n_estimators': forest.n_estimators,
+        'note': note,
+    }
+    _write_json_atomic(os.path.join(root, MANIFEST_FILE), {'versions': records + [record]})
+    return record
+
+
+def verify(version, root=REGISTRY_DIR):
+    """True bila isi bundle versi ini masih sama dengan checksum saat didaftarkan"""
+    path = version_path(version, root)
+    return os.path.isdir(path) and content_version(path) == get_record(version, root)['checksum']
+
+
+def promote(version, root=REGISTRY_DIR):
+    """Jadikan versi ini aktif (checksum diperiksa lebih dulu); penggantian CURRENT atomik"""
+    get_record(version, root)
+    if not verify(version, root):
+        raise ValueError(f"Checksum bundle {version} tidak cocok; versi tidak dipromosikan")
+    pointer = {'version': version, 'promoted_at': datetime.now().isoformat(timespec='seconds')}
+    _write_json_atomic(os.path.join(root, CURRENT_FILE), pointer)
+    return pointer
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Registry model DBD berversi")
+    parser.add_argument('--root', default=REGISTRY_DIR, help="Direktori registry")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    register_parser = commands.add_parser('register', help="Daftarkan bundle sebagai versi baru")
+    register_parser.add_argument('model', nargs='?', default=None, help="Bundle (direktori array datar atau pickle joblib)")
+    register_parser.add_argument('--data', default=None, help="Tabel master yang dipakai training (untuk hash data)")
+    register_parser.add_argument('--note', default='', help="Catatan versi")
+    register_parser.add_argument('--promote', action='store_true', help="Langsung aktifkan versi ini")
+
+    commands.add_parser('list', help="Daftar versi terdaftar")
+    for name, help_text in (('promote', "Aktifkan versi"), ('verify', "Periksa checksum versi")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('version')
+    args = parser.parse_args(argv)
+
+    if args.command == 'register':
+        record = register(open_bundle(args.model or default_model_path()), args.data, args.note, args.root)
+        print(f"Terdaftar {record['version']} (checksum {record['checksum']}, {record['n_estimators']} pohon)")
+        if args.promote:
+            promote(record['version'], args.root)
+            print(f"{record['version']} aktif")
+    elif args.command == 'list':
+        active = current(args.root)
+        for record in read_manifest(args.root):
+            marker = '*' if active and active['version'] == record['version'] else ' '
+            metrics = ', '.join(f"{key}={value}" for key, value in record['metrics'].items())
+            print(f"{marker} {record['version']:<5} {record['created']}  {record['n_estimators']:>5} pohon  "
+                  f"data {record['data_hash'][:12]}  {metrics}  {record['note']}")
+    elif args.command == 'promote':
+        pointer = promote(args.version, args.root)
+        print(f"{pointer['version']} aktif sejak {pointer['promoted_at']}")
+    else:
+        ok = verify(args.version, args.root)
+        print(f"{args.version}: checksum {'cocok' if ok else 'TIDAK cocok'}")
+        if not ok:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Klasifikasi risiko DBD dari prediksi IR (kasus per 100.000 penduduk).
+
+Dipakai bersama oleh dashboard dan skrip batch, sehingga batas kelas
+risiko (>50 tinggi, 20-50 sedang, <20 rendah) hanya didefinisikan di sini.
+"""
+import numpy as np
+
+HIGH_RISK_THRESHOLD = 50
+MEDIUM_RISK_THRESHOLD = 20
+
+RISK_LEVELS = ['rendah', 'sedang', 'tinggi']
+
+# Kategori rekomendasi strategis untuk setiap kelas risiko
+RECOMMENDATION_CATEGORIES = {
+    'tinggi': 'DARURAT',
+    'sedang': 'WASPADA',
+    'rendah': 'AMAN',
+}
+
+# Kelas CSS, label, dan ikon kartu prediksi di dashboard
+RISK_DISPLAY = {
+    'tinggi': ('high-risk', '🚨 RISIKO TINGGI', '⚠️'),
+    'sedang': ('med-risk', '🟡 RISIKO SEDANG', '🔔'),
+    'rendah': ('low-risk', '✅ RISIKO RENDAH', '✅'),
+}
+# Kartu wilayah yang fiturnya kosong/tidak valid (tanpa prediksi dan kelas risiko)
+INCOMPLETE_DISPLAY = ('no-data', '❓ DATA TIDAK LENGKAP', '❓')
+
+
+def classify_risk(ir):
+    """Kelas risiko ('tinggi'/'sedang'/'rendah') untuk satu nilai atau array IR"""
+    ir = np.asarray(ir, dtype=np.float64)
+    levels = np.select(
+        [ir > HIGH_RISK_THRESHOLD, ir > MEDIUM_RISK_THRESHOLD],
+        ['tinggi', 'sedang'],
+        default='rendah',
+    )
+    return levels.item() if levels.ndim == 0 else levels
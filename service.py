@@ -0,0 +1,615 @@
+"""
+Layanan prediksi lokal (asyncio, HTTP/JSON) yang memuat bundle model sekali.
+
+Model, tabel master, prediksi seluruh wilayah, peringkat, dan kontribusi
+TreeSHAP dibangun sekali per versi artefak di satu proses. Dashboard (dan
+tools internal lain) cukup menjadi klien tipis: worker Streamlit tidak lagi
+memuat salinan hutan sendiri, dan pekerjaan berat tidak memblokir sesi UI.
+
+- Pekerjaan CPU (predict, sweep what-if, pemuatan aset) berjalan di thread
+  pool, event loop tetap melayani request lain.
+- Request identik yang sedang diproses digabung (coalescing): hanya satu
+  perhitungan, semua penunggu menerima hasil yang sama.
+- Hasil disimpan di cache LRU dengan kunci (versi artefak, endpoint,
+  parameter); artefak baru di disk (atau versi baru dipromosikan di
+  registry.py) -> aset dimuat di thread latar sementara versi lama tetap
+  melayani, lalu ditukar sekaligus dan cache versi lama dikosongkan.
+
+Endpoint:
+    GET  /health                         versi artefak, jumlah wilayah, statistik cache
+    GET  /snapshot                       aset dashboard (prediksi, peringkat, kontribusi, statistik)
+    GET  /explain?region=kudus           kontribusi variabel satu wilayah
+    GET  /leaderboard?sort=pred_ir&page=1&page_size=50
+    POST /predict   {"rows": [{fitur: nilai}], "uncertainty": false}
+    POST /whatif    {"scenario": {fitur: nilai}, "ranges": {fitur: [min, max]}}
+
+Pemakaian:
+    python service.py --port 8600
+    DBD_SERVICE_URL=http://127.0.0.1:8600 streamlit run app.py
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from attribution import build_explainer, explain_frame
+from batch_predict import INVALID_COLUMN, predict_frame
+from dataset_stats import artifact_version, load_stats, stats_from_json, stats_to_json
+from feature_store import attach_features, load_store
+from forest_arrays import bundle_params, default_model_path, open_bundle
+from pipeline import load_master_table, region_index
+from ranking import SORT_OPTIONS, build_ranking, get_page, n_pages
+from registry import current_model_path
+from whatif import sensitivity_sweep
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8600
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_WORKERS = 2
+MAX_BODY_BYTES = 16 << 20
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+# ============================================================================
+# ASET (DIPAKAI BERSAMA DASHBOARD LOKAL & LAYANAN)
+# ============================================================================
+def resolve_artifact_paths():
+    """Path model & tabel master yang dipakai (versi aktif registry / format cepat bila ada, jika tidak fallback)"""
+    # Versi aktif registry bila ada; jika tidak ekspor array datar (memory-mapped), fallback ke pickle joblib
+    model_path = current_model_path() or default_model_path()
+    # Tabel master Parquet menyimpan daftar wilayah & offset baris; CSV hanya sebagai fallback
+    data_path = 'df_final_dashboard.parquet' if os.path.exists('df_final_dashboard.parquet') else 'df_final_dashboard.csv'
+    return model_path, data_path
+
+
+def build_prediction_table(model, features, df, offsets):
+    """Prediksi seluruh wilayah sekaligus dari baris data terbaru masing-masing wilayah"""
+    # Baris terakhir tiap wilayah (tahun terakhir) langsung dari indeks offset, diindeks dengan nama wilayah
+    latest_rows = [stop - 1 for start, stop in offsets.values()]
+    df_latest = df.iloc[latest_rows].set_index('Kabupaten/Kota', drop=False)
+
+    # Satu traversal untuk semua wilayah: matriks prediksi per pohon -> prediksi, interval, peluang kelas risiko
+    return predict_frame(df_latest, model, features, uncertainty=True)
+
+
+def build_assets(model_path, data_path):
+    """Bundle model, tabel master, prediksi, statistik, peringkat, dan kontribusi untuk satu versi artefak"""
+    bundle = open_bundle(model_path)
+
+    if data_path.endswith('.parquet'):
+        df, regions, offsets = load_master_table(data_path)
+    else:
+        df = pd.read_csv(data_path)
+        regions, offsets = region_index(df)
+    # Fitur deret waktu (lag, jendela bergulir, hari hujan) dari feature store yang sama dengan training
+    df = attach_features(df, load_store(data_path))
+
+    df_prediksi = build_prediction_table(bundle['model'], bundle['features'], df, offsets)
+    stats = load_stats(df, bundle['features'], bundle['model'], data_path, model_path)
+    # Peringkat seluruh wilayah untuk tab perbandingan, sekali per versi data & model
+    ranking = build_ranking(df, df_prediksi)
+    # Kontribusi setiap variabel untuk prediksi tiap wilayah (TreeSHAP atas array hutan), sekali per versi
+    explainer = build_explainer(bundle['model'])
+    # Wilayah dengan fitur kosong/tidak valid tidak diprediksi, sehingga kontribusinya juga kosong (NaN)
+    complete = df_prediksi[INVALID_COLUMN] == ''
+    explanations = {
+        'base_value': explainer['base_value'],
+        'contributions': explain_frame(df_prediksi[complete], explainer, bundle['features']).reindex(df_prediksi.index),
+    }
+    return {
+        'bundle': bundle,
+        'model_info': model_info(bundle, model_path),
+        'df': df,
+        'df_prediksi': df_prediksi,
+        'regions': regions,
+        'stats': stats,
+        'ranking': ranking,
+        'explanations': explanations,
+    }
+
+
+def model_info(bundle, model_path):
+    """Versi model yang benar-benar dimuat dan waktu pembaruannya (dari registry bila ada)"""
+    if 'registry_version' in bundle:
+        return {'version': bundle['registry_version'], 'updated': bundle['registered_at']}
+    updated = bundle.get('timestamp') or datetime.fromtimestamp(os.path.getmtime(model_path)).isoformat(timespec='seconds')
+    return {'version': artifact_version(model_path)[:8], 'updated': str(updated)}
+
+
+class AssetSlot:
+    """Aset aktif satu proses; versi baru dimuat di thread latar lalu ditukar dalam satu assignment"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._first_load = threading.Lock()
+        # (versi, aset) selalu ditukar bersamaan: pembaca tidak pernah melihat aset setengah dimuat
+        self.active = None
+        self.loading = None
+        self.failed = None
+
+    def get(self, version, load):
+        """(versi, aset) yang siap dipakai; bila `version` lebih baru, mulai memuatnya di latar"""
+        active = self.active
+        if active is None:
+            # Hanya pemuatan pertama proses yang ditunggu (sekali, walaupun banyak sesi bersamaan)
+            with self._first_load:
+                if self.active is None:
+                    self.active = (version, load())
+            return self.active
+        if active[0] != version:
+            with self._lock:
+                start = self.loading != version and self.failed != version
+                if start:
+                    self.loading = version
+            if start:
+                threading.Thread(target=self._preload, args=(version, load), daemon=True).start()
+        return active
+
+    def _preload(self, version, load):
+        try:
+            assets = load()
+        except Exception:
+            # Versi yang gagal dimuat (mis. artefak rusak) tidak dicoba ulang; versi lama tetap aktif
+            with self._lock:
+                self.failed, self.loading = version, None
+            raise
+        with self._lock:
+            self.active = (version, assets)
+            self.loading = None
+
+
+# ============================================================================
+# SERIALISASI JSON
+# ============================================================================
+def frame_to_json(df):
+    """DataFrame -> dict orient 'split' (nilai Python murni, NaN -> null)"""
+    return json.loads(df.to_json(orient='split', double_precision=15))
+
+
+def frame_from_json(payload):
+    return pd.DataFrame(payload['data'], index=payload['index'], columns=payload['columns'])
+
+
+def snapshot_to_json(assets, version):
+    """Aset dashboard tanpa model sebagai JSON (dikirim sekali per versi artefak)"""
+    bundle, stats, ranking = assets['bundle'], assets['stats'], assets['ranking']
+    return {
+        'version': list(version),
+        'features': list(bundle['features']),
+        'metrics': bundle['metrics'],
+        'n_estimators': bundle['model'].n_estimators,
+        'params': bundle_params(bundle),
+        'timestamp': bundle.get('timestamp'),
+        'model_info': assets['model_info'],
+        'master_columns': list(assets['df'].columns),
+        'regions': list(assets['regions']),
+        'df_prediksi': frame_to_json(assets['df_prediksi']),
+        'stats': dict(stats_to_json(stats), model_version=stats['model_version'], data_version=stats['data_version']),
+        'ranking': {
+            'table': frame_to_json(ranking['table']),
+            'orders': {key: order.tolist() for key, order in ranking['orders'].items()},
+            'ir_matrix': frame_to_json(ranking['ir_matrix']),
+        },
+        'explanations': {
+            'base_value': assets['explanations']['base_value'],
+            'contributions': frame_to_json(assets['explanations']['contributions']),
+        },
+    }
+
+
+def snapshot_from_json(payload):
+    """Kebalikan snapshot_to_json; bundle tanpa model (klien tipis)"""
+    features = payload['features']
+    stats = stats_from_json(payload['stats'], features)
+    stats.update(model_version=payload['stats']['model_version'], data_version=payload['stats']['data_version'])
+
+    # Klien tipis tidak memuat model; jumlah pohon tetap dikirim untuk keterangan interval
+    bundle = {'model': None, 'features': features, 'metrics': payload['metrics'],
+              'n_estimators': payload['n_estimators'], 'params': payload.get('params')}
+    if payload.get('timestamp') is not None:
+        bundle['timestamp'] = payload['timestamp']
+    ir_matrix = frame_from_json(payload['ranking']['ir_matrix'])
+    ir_matrix.columns = ir_matrix.columns.astype(int)
+    return {
+        'bundle': bundle,
+        'model_info': payload['model_info'],
+        'df': pd.DataFrame(columns=payload['master_columns']),
+        'df_prediksi': frame_from_json(payload['df_prediksi']),
+        'regions': payload['regions'],
+        'stats': stats,
+        'ranking': {
+            'table': frame_from_json(payload['ranking']['table']),
+            'orders': {key: pd.Index(order).to_numpy() for key, order in payload['ranking']['orders'].items()},
+            'ir_matrix': ir_matrix,
+        },
+        'explanations': {
+            'base_value': payload['explanations']['base_value'],
+            'contributions': frame_from_json(payload['explanations']['contributions']),
+        },
+    }
+
+
+# ============================================================================
+# CACHE LRU + COALESCING
+# ============================================================================
+class ResultCache:
+    """Cache LRU hasil per kunci; request identik yang sedang berjalan menunggu satu perhitungan"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._inflight = {}
+        self.hits = self.misses = self.coalesced = 0
+
+    async def get(self, key, compute):
+        """Hasil untuk key; compute (coroutine function) hanya dipanggil bila belum ada & tidak sedang berjalan"""
+        if key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await compute()
+        except Exception as exc:
+            future.set_exception(exc)
+            # Penunggu lain menerima exception yang sama; future sendiri tidak perlu diambil lagi
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+        future.set_result(result)
+        self._results[key] = result
+        if len(self._results) > self.maxsize:
+            self._results.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._results.clear()
+
+    def info(self):
+        return {
+            'size': len(self._results),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+        }
+
+
+# ============================================================================
+# LAYANAN
+# ============================================================================
+class NotFoundError(LookupError):
+    """Sumber daya yang diminta (mis. wilayah) tidak ada -> HTTP 404"""
+
+
+def parse_rows(body):
+    """Baris fitur dari body /predict; ValueError bila bukan daftar objek yang tidak kosong"""
+    rows = body.get('rows')
+    if not isinstance(rows, list) or not rows or not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Body harus berisi 'rows': daftar objek {fitur: nilai} yang tidak kosong")
+    return rows
+
+
+def parse_page(params):
+    """(page, page_size) dari query /leaderboard; ValueError bila bukan bilangan bulat >= 1"""
+    try:
+        page, page_size = int(params.get('page', 1)), int(params.get('page_size', 50))
+    except ValueError:
+        raise ValueError("'page' dan 'page_size' harus berupa bilangan bulat")
+    if page < 1 or page_size < 1:
+        raise ValueError("'page' dan 'page_size' harus >= 1")
+    return page, page_size
+
+
+def parse_whatif(body, features):
+    """Skenario & rentang sweep dari body /whatif; ValueError bila tidak mencakup tepat semua fitur model"""
+    scenario, ranges = body.get('scenario'), body.get('ranges')
+    if not isinstance(scenario, dict) or not isinstance(ranges, dict):
+        raise ValueError("Body harus berisi 'scenario' dan 'ranges' (objek)")
+    missing = [f for f in features if f not in scenario or f not in ranges]
+    if missing:
+        raise ValueError(f"'scenario' dan 'ranges' harus mencakup semua fitur model; kurang: {', '.join(missing)}")
+    unknown = [f for f in ranges if f not in features]
+    if unknown:
+        raise ValueError(f"Fitur tidak dikenal di 'ranges': {', '.join(map(str, unknown))}")
+
+    try:
+        values = {f: float(scenario[f]) for f in features}
+        bounds = {f: tuple(float(v) for v in ranges[f]) for f in features}
+    except (TypeError, ValueError):
+        raise ValueError("Nilai 'scenario' dan 'ranges' harus berupa angka")
+    for f, bound in bounds.items():
+        if len(bound) != 2 or not bound[0] <= bound[1] or not np.isfinite(bound).all() or not np.isfinite(values[f]):
+            raise ValueError(f"Rentang {f} harus [min, max] berhingga dengan min <= max, dan nilainya berhingga")
+    return values, bounds
+
+
+class PredictionService:
+    """Aset per versi artefak + handler endpoint"""
+
+    def __init__(self, model_path=None, data_path=None, cache_size=DEFAULT_CACHE_SIZE, workers=DEFAULT_WORKERS):
+        # Path eksplisit dipakai apa adanya; jika tidak, ikuti versi aktif registry / artefak default
+        self._model_path, self._data_path = model_path, data_path
+        self.cache = ResultCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.slot = AssetSlot()
+        self.version = None
+
+    def artifact_paths(self):
+        default_model, default_data = resolve_artifact_paths()
+        return self._model_path or default_model, self._data_path or default_data
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def current_assets(self):
+        """Aset versi aktif; versi baru (artefak di disk / promosi registry) dimuat di latar tanpa menahan request"""
+        model_path, data_path = self.artifact_paths()
+        version = (artifact_version(model_path), artifact_version(data_path))
+        load = lambda: build_assets(model_path, data_path)
+        if self.slot.active is None:
+            # Hanya pemuatan pertama yang ditunggu, di thread pool agar event loop tetap berjalan
+            version, assets = await self.run_blocking(self.slot.get, version, load)
+        else:
+            version, assets = self.slot.get(version, load)
+        if version != self.version:
+            # Aset versi lama dilepas bersama hasil cache-nya
+            self.version = version
+            self.cache.clear()
+        return assets, version
+
+    async def cached(self, version, endpoint, params, func, *args):
+        key = (version, endpoint, json.dumps(params, sort_keys=True))
+        return await self.cache.get(key, lambda: self.run_blocking(func, *args))
+
+    # ------------------------------------------------------------------ endpoint
+    async def health(self, params, body):
+        assets, version = await self.current_assets()
+        model_path, data_path = self.artifact_paths()
+        return {
+            'status': 'ok',
+            'version': list(version),
+            'model': assets['model_info'],
+            'loading': self.slot.loading is not None,
+            'model_path': model_path,
+            'data_path': data_path,
+            'n_regions': len(assets['regions']),
+            'cache': self.cache.info(),
+        }
+
+    async def snapshot(self, params, body):
+        assets, version = await self.current_assets()
+        return await self.cached(version, 'snapshot', {}, snapshot_to_json, assets, version)
+
+    async def explain(self, params, body):
+        assets, version = await self.current_assets()
+        region = params.get('region')
+        if not region:
+            raise ValueError("Parameter 'region' wajib diisi")
+        contributions = assets['explanations']['contributions']
+        if region not in contributions.index:
+            raise NotFoundError(f"Wilayah tidak ditemukan: {region}")
+        invalid = assets['df_prediksi'].at[region, INVALID_COLUMN]
+        if invalid:
+            return {'region': region, 'base_value': assets['explanations']['base_value'], 'pred_ir': None,
+                    'contributions': None, INVALID_COLUMN: invalid.split(', ')}
+        return {
+            'region': region,
+            'base_value': assets['explanations']['base_value'],
+            'pred_ir': float(assets['df_prediksi'].at[region, 'pred_ir']),
+            'contributions': {f: float(v) for f, v in contributions.loc[region].items()},
+        }
+
+    async def leaderboard(self, params, body):
+        assets, version = await self.current_assets()
+        sort_key = params.get('sort', 'pred_ir')
+        if sort_key not in SORT_OPTIONS:
+            raise ValueError(f"sort harus salah satu dari: {', '.join(SORT_OPTIONS)}")
+        page, page_size = parse_page(params)
+        ascending = params.get('ascending', '0') in ('1', 'true')
+
+        def compute():
+            page_df = get_page(assets['ranking'], sort_key, page, page_size, ascending)
+            return {
+                'page': page,
+                'n_pages': n_pages(assets['ranking'], page_size),
+                'rows': json.loads(page_df.to_json(orient='records', double_precision=15)),
+            }
+
+        return await self.cached(version, 'leaderboard', [sort_key, page, page_size, ascending], compute)
+
+    async def predict(self, params, body):
+        assets, version = await self.current_assets()
+        rows = parse_rows(body)
+        uncertainty = bool(body.get('uncertainty', False))
+        bundle = assets['bundle']
+
+        def compute():
+            result = predict_frame(pd.DataFrame(rows), bundle['model'], bundle['features'], uncertainty=uncertainty)
+            return json.loads(result.to_json(orient='records', double_precision=15))
+
+        return await self.cached(version, 'predict', [rows, uncertainty], compute)
+
+    async def whatif(self, params, body):
+        assets, version = await self.current_assets()
+        features = assets['bundle']['features']
+        # Divalidasi sebelum dihitung: fitur yang kurang tidak boleh menjadi KeyError pandas di thread pool
+        scenario, ranges = parse_whatif(body, features)
+        model = assets['bundle']['model']
+
+        def compute():
+            pred, curves = sensitivity_sweep(model, scenario, list(features), ranges)
+            return {'pred_ir': float(pred), 'curves': frame_to_json(curves)}
+
+        return await self.cached(version, 'whatif', [scenario, ranges], compute)
+
+    ROUTES = {
+        ('GET', '/health'): health,
+        ('GET', '/snapshot'): snapshot,
+        ('GET', '/explain'): explain,
+        ('GET', '/leaderboard'): leaderboard,
+        ('POST', '/predict'): predict,
+        ('POST', '/whatif'): whatif,
+    }
+
+    async def dispatch(self, method, path, params, body):
+        handler = self.ROUTES.get((method, path))
+        if handler is None:
+            known = any(route_path == path for _, route_path in self.ROUTES)
+            return (405 if known else 404), {'error': f"{method} {path} tidak tersedia"}
+        try:
+            return 200, await handler(self, params, body)
+        except NotFoundError as exc:
+            return 404, {'error': str(exc)}
+        except (ValueError, TypeError) as exc:
+            return 400, {'error': str(exc)}
+
+    # ------------------------------------------------------------------ HTTP
+    async def handle_connection(self, reader, writer):
+        try:
+            status, payload = await self._read_and_dispatch(reader)
+        except Exception as exc:
+            status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode()
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_and_dispatch(self, reader):
+        request_line = (await reader.readline()).decode('latin-1').strip()
+        if not request_line:
+            return 400, {'error': 'request kosong'}
+        parts = request_line.split(' ', 2)
+        if len(parts) != 3:
+            return 400, {'error': f"request line tidak valid: {request_line[:100]}"}
+        method, target, _ = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            return 400, {'error': 'Content-Length tidak valid'}
+        if length < 0 or length > MAX_BODY_BYTES:
+            return 400, {'error': 'body terlalu besar'}
+        raw_body = await reader.readexactly(length) if length else b''
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+        except json.JSONDecodeError as exc:
+            return 400, {'error': f"body bukan JSON: {exc}"}
+        if not isinstance(body, dict):
+            return 400, {'error': "body harus berupa objek JSON"}
+
+        url = urllib.parse.urlsplit(target)
+        return await self.dispatch(method.upper(), url.path, dict(urllib.parse.parse_qsl(url.query)), body)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, **kwargs):
+    service = PredictionService(**kwargs)
+    # Aset dimuat sebelum menerima request pertama
+    await service.current_assets()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    model_path, data_path = service.artifact_paths()
+    print(f"Layanan prediksi DBD di http://{host}:{port} (model: {model_path}, data: {data_path})")
+    async with server:
+        await server.serve_forever()
+
+
+# ============================================================================
+# KLIEN
+# ============================================================================
+class ServiceClient:
+    """Klien HTTP sinkron (urllib) untuk dashboard & tools lain"""
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, path, params=None, payload=None):
+        url = self.base_url + path
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        data = None if payload is None else json.dumps(payload).encode()
+        request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            message = json.loads(exc.read() or b'{}').get('error', exc.reason)
+            raise RuntimeError(f"Layanan prediksi {path}: {exc.code} {message}") from None
+
+    def health(self):
+        return self._request('/health')
+
+    def version(self):
+        """Versi artefak yang sedang dilayani (model, data)"""
+        return tuple(self.health()['version'])
+
+    def assets(self):
+        """Aset dashboard (format sama dengan build_assets, tanpa model)"""
+        return snapshot_from_json(self._request('/snapshot'))
+
+    def explain(self, region):
+        return self._request('/explain', {'region': region})
+
+    def leaderboard(self, sort='pred_ir', page=1, page_size=50, ascending=False):
+        return self._request('/leaderboard', {
+            'sort': sort, 'page': page, 'page_size': page_size, 'ascending': int(ascending),
+        })
+
+    def predict(self, rows, uncertainty=False):
+        return pd.DataFrame(self._request('/predict', payload={'rows': rows, 'uncertainty': uncertainty}))
+
+    def whatif(self, scenario, ranges):
+        """Prediksi skenario & kurva sensitivitas (sama dengan whatif.sensitivity_sweep)"""
+        result = self._request('/whatif', payload={
+            'scenario': {f: float(v) for f, v in scenario.items()},
+            'ranges': {f: [float(lo), float(hi)] for f, (lo, hi) in ranges.items()},
+        })
+        return result['pred_ir'], frame_from_json(result['curves'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan prediksi DBD (HTTP/JSON, asyncio)")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model', default=None, help="Bundle model (default: array datar bila ada, jika tidak .pkl)")
+    parser.add_argument('--data', default=None, help="Tabel master (default: Parquet bila ada, jika tidak CSV)")
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help="Jumlah hasil di cache LRU")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Thread untuk pekerjaan CPU")
+    args = parser.parse_args(argv)
+    asyncio.run(serve(args.host, args.port, model_path=args.model, data_path=args.data,
+                      cache_size=args.cache_size, workers=args.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Indeks tetangga spasial antar wilayah dan fitur spatial lag (IR & curah hujan
+wilayah tetangga).
+
+DBD menyebar melintasi batas kabupaten/kota, sedangkan fitur model hanya
+melihat wilayah itu sendiri. Modul ini membangun matriks tetangga sekali dari
+titik pusat wilayah (centroid_wilayah.csv, dicocokkan lewat kode wilayah BPS):
+
+- tetangga = k wilayah terdekat (jarak great-circle, dicari dengan KD-tree
+  pada koordinat bola satuan), dibuat simetris: bila A tetangga B maka B
+  tetangga A. Kota di dalam kabupaten bernama sama otomatis bertetangga;
+- matriks disimpan sebagai scipy.sparse CSR (n_wilayah x n_wilayah), sehingga
+  memori dan waktu sebanding dengan jumlah pasangan tetangga, bukan n^2;
+- spatial lag = rata-rata nilai tetangga yang tersedia, dihitung untuk semua
+  tahun sekaligus sebagai satu perkalian matriks sparse dengan panel
+  wilayah x tahun (satu mat-vec per kolom tahun), tanpa loop per pasangan;
+- wilayah yang belum punya titik pusat tidak bertetangga dengan siapa pun,
+  sehingga fitur spatial lag-nya NaN (bukan error).
+
+Fitur dipakai feature_store.py (disimpan bersama fitur deret waktu) sehingga
+training dan dashboard membaca nilai yang sama.
+
+Pemakaian:
+    python spatial.py                     # daftar tetangga setiap wilayah
+    python spatial.py --k 4
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+CENTROID_FILE = 'centroid_wilayah.csv'
+N_NEIGHBORS = 5
+
+SPATIAL_COLUMNS = [
+    'IR_tetangga_tahun_lalu',
+    'curah_hujan_tetangga',
+]
+
+
+# ============================================================================
+# INDEKS TETANGGA
+# ============================================================================
+def centroid_path(data_dir='.'):
+    """File titik pusat di direktori data bila ada, jika tidak file di direktori kerja"""
+    path = os.path.join(data_dir, CENTROID_FILE)
+    return path if os.path.exists(path) else CENTROID_FILE
+
+
+def load_centroids(path=CENTROID_FILE):
+    """Titik pusat wilayah (lintang, bujur) diindeks dengan kode wilayah"""
+    centroids = pd.read_csv(path, dtype={'kode_wilayah': str}).set_index('kode_wilayah')
+    if centroids.index.duplicated().any():
+        raise ValueError(f"{path}: kode_wilayah duplikat")
+    return centroids[['lintang', 'bujur']]
+
+
+def unit_vectors(lat, lon):
+    """Koordinat 3D di bola satuan: jarak Euclid monoton terhadap jarak great-circle"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def neighbor_matrix(centroids, codes, k=N_NEIGHBORS):
+    """Matriks tetangga biner simetris (CSR) untuk wilayah `codes`, urutan baris = urutan codes
+
+    Wilayah tanpa titik pusat tidak punya tetangga (baris & kolom kosong), sehingga spatial lag-nya NaN.
+    """
+    codes = pd.Index(pd.Series(codes).astype(str))
+    n = len(codes)
+    known = np.flatnonzero(codes.isin(centroids.index))
+    k = min(k, len(known) - 1)
+    if k < 1:
+        return sparse.csr_matrix((n, n))
+
+    # k + 1 terdekat karena titik terdekat adalah wilayah itu sendiri
+    points = centroids.loc[codes[known]]
+    xyz = unit_vectors(points['lintang'], points['bujur'])
+    _, nearest = cKDTree(xyz).query(xyz, k=k + 1)
+    # Indeks di antara wilayah bertitik pusat dipetakan kembali ke urutan codes
+    rows = np.repeat(known, k)
+    cols = known[nearest[:, 1:].ravel()]
+    adjacency = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+    # Simetris: hubungan tetangga berlaku dua arah
+    adjacency = adjacency.maximum(adjacency.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency
+
+
+def spatial_lag(adjacency, panel):
+    """Rata-rata nilai tetangga yang tersedia untuk setiap sel panel (n_wilayah, n_tahun)"""
+    available = ~np.isnan(panel)
+    # Satu perkalian sparse untuk seluruh kolom tahun; tetangga tanpa data tidak ikut dirata-rata
+    total = adjacency @ np.where(available, panel, 0.0)
+    count = adjacency @ available.astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def neighbor_table(adjacency, names):
+    """Daftar tetangga per wilayah (untuk pemeriksaan)"""
+    names = np.asarray(names, dtype=object)
+    adjacency = adjacency.tocsr()
+    return pd.DataFrame({
+        'Kabupaten/Kota': names,
+        'n_tetangga': np.diff(adjacency.indptr),
+        'tetangga': [', '.join(names[adjacency.indices[start:stop]])
+                     for start, stop in zip(adjacency.indptr[:-1], adjacency.indptr[1:])],
+    })
+
+
+def main(argv=None):
+    from regions import load_registry, registry_path
+
+    parser = argparse.ArgumentParser(description="Tampilkan indeks tetangga spasial wilayah")
+    parser.add_argument('--data-dir', default='.', help="Direktori registry & titik pusat wilayah")
+    parser.add_argument('--k', type=int, default=N_NEIGHBORS, help="Jumlah tetangga terdekat per wilayah")
+    args = parser.parse_args(argv)
+
+    registry = load_registry(registry_path(args.data_dir))
+    adjacency = neighbor_matrix(load_centroids(centroid_path(args.data_dir)), registry['kode_wilayah'], args.k)
+    print(neighbor_table(adjacency, registry['Kabupaten/Kota']).to_string(index=False))
+    print(f"\n{adjacency.shape[0]} wilayah, {adjacency.nnz // 2} pasangan tetangga")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Generator data mentah sintetis skala provinsi/nasional untuk uji beban.
+
+Distribusi marginal dan korelasi tujuh variabel (curah hujan, timbulan sampah,
+penduduk, kepadatan, akses sanitasi, kasus DBD, hari hujan) dipelajari dari
+CSV mentah dengan Gaussian copula:
+
+- marginal = fungsi kuantil empiris setiap variabel (nilai sintetis selalu
+  berada dalam rentang data asli);
+- korelasi = matriks korelasi skor normal (rank -> N(0, 1)) antar variabel;
+- persistensi antar tahun = porsi varians skor normal yang dijelaskan oleh
+  wilayah, sehingga nilai tahun ke tahun suatu wilayah saling berkorelasi
+  seperti data asli (penting untuk fitur lag IR).
+
+Data ditulis per potongan wilayah ke lima file sumber pipeline dan
+hari_hujan_fix.csv (sumber feature store) dengan skema (nama kolom dan format
+nama wilayah) yang sama seperti CSV sumber, sehingga bisa langsung dipakai
+oleh `pipeline.py --data-dir` dan `feature_store.py` (beserta registry wilayah sintetis
+wilayah_bps.csv dengan kode 'S00001', ... dan titik pusat centroid_wilayah.csv yang
+diacak seragam dalam rentang lintang/bujur titik pusat asli). Granularitas tetap tahunan karena
+seluruh sumber dan kunci merge pipeline berbasis (Tahun, Kabupaten/Kota).
+
+Pemakaian:
+    python synthetic.py --regions 500 --years 10 --out-dir data_sintetis
+    python pipeline.py --data-dir data_sintetis --out-dir data_sintetis --cache-dir data_sintetis/.cache
+    python feature_store.py --master data_sintetis/df_final_dashboard.parquet
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr, ndtri
+
+import pipeline
+from feature_store import HARI_HUJAN, load_hari_hujan
+from regions import REGISTRY_FILE
+from spatial import CENTROID_FILE, centroid_path, load_centroids
+
+VARIABLES = [
+    'curah_hujan_mm', 'timbulan_sampah_ton', 'penduduk_ribu',
+    'kepadatan_penduduk_km2', 'akses_sanitasi_layak_persen', 'kasus_dbd', 'hari_hujan',
+]
+# Kolom sumber penduduk yang tidak dipakai pipeline, diambil ulang dari distribusi empirisnya
+EXTRA_COLUMNS = ['Laju Pertumbuhan Penduduk per Tahun', 'Rasio Jenis Kelamin Penduduk']
+# Pembulatan nilai sintetis mengikuti format di CSV sumber
+DECIMALS = {
+    'curah_hujan_mm': 0, 'timbulan_sampah_ton': 0, 'penduduk_ribu': 1,
+    'kepadatan_penduduk_km2': 0, 'akses_sanitasi_layak_persen': 2, 'kasus_dbd': 0, 'hari_hujan': 0,
+}
+# File output per sumber: lima sumber pipeline + sumber hari hujan feature store
+SOURCE_FILES = dict({name: spec['file'] for name, spec in pipeline.SOURCES.items()}, hari_hujan=HARI_HUJAN['file'])
+KOTA_EVERY = 6
+DEFAULT_CHUNK_REGIONS = 1000
+
+
+# ============================================================================
+# FIT GAUSSIAN COPULA
+# ============================================================================
+def normal_scores(values):
+    """Transformasi rank -> skor normal baku (per kolom)"""
+    ranks = pd.DataFrame(values).rank(method='average').to_numpy()
+    return ndtri((ranks - 0.5) / len(ranks))
+
+
+def load_training_frame(data_dir='.'):
+    """Gabungan sumber mentah (termasuk hari hujan) per (Tahun, wilayah) untuk dipelajari distribusinya"""
+    frames = {name: pipeline.load_source(name, data_dir) for name in pipeline.SOURCES}
+    return pipeline.merge_sources(frames).merge(load_hari_hujan(data_dir), on=pipeline.KEY)
+
+
+def fit_copula(df, extra=None):
+    """Estimasi marginal, korelasi, dan persistensi per wilayah dari tabel gabungan"""
+    values = df[VARIABLES].astype(float).to_numpy()
+    z = normal_scores(values)
+
+    # Porsi varians skor normal yang dijelaskan rata-rata wilayah (0 = acak tiap tahun, 1 = tetap)
+    region_means = pd.DataFrame(z, columns=VARIABLES).groupby(df['Kabupaten/Kota'].to_numpy()).transform('mean')
+    persistence = np.clip(region_means.var().to_numpy() / z.var(axis=0), 0.0, 0.99)
+
+    model = {
+        'marginals': {v: np.sort(values[:, i]) for i, v in enumerate(VARIABLES)},
+        'corr': np.corrcoef(z, rowvar=False),
+        'persistence': persistence,
+        'cfr': float(df['jumlah_meninggal'].sum() / df['kasus_dbd'].sum()),
+        'mean_penduduk_ribu': float(df['penduduk_ribu'].mean()),
+    }
+    if extra is not None:
+        model['extra'] = {col: extra[col].dropna().to_numpy() for col in EXTRA_COLUMNS}
+    return model
+
+
+def fit_from_sources(data_dir='.'):
+    """Fit copula langsung dari lima CSV mentah di data_dir (beserta rentang titik pusat wilayah)"""
+    extra = pd.read_csv(os.path.join(data_dir, pipeline.SOURCES['penduduk']['file']))
+    model = fit_copula(load_training_frame(data_dir), extra)
+    centroids = load_centroids(centroid_path(data_dir))
+    model['centroid_bounds'] = {col: (float(centroids[col].min()), float(centroids[col].max()))
+                                for col in ('lintang', 'bujur')}
+    return model
+
+
+# ============================================================================
+# SAMPLING
+# ============================================================================
+def quantile_transform(u, sorted_values):
+    """Fungsi kuantil empiris (interpolasi linear) untuk peluang u"""
+    n = len(sorted_values)
+    return np.interp(u, (np.arange(n) + 0.5) / n, sorted_values)
+
+
+def region_names(start, stop):
+    """Nama wilayah sintetis unik; setiap KOTA_EVERY wilayah berupa kota"""
+    ids = np.arange(start, stop) + 1
+    is_kota = ids % KOTA_EVERY == 0
+    return [f"Sintetis {i:05d}" for i in ids], is_kota
+
+
+def sample_chunk(model, start, stop, years, rng):
+    """Sampel wilayah [start, stop) untuk seluruh tahun, dalam skema tabel gabungan"""
+    n_regions, n_years, n_vars = stop - start, len(years), len(VARIABLES)
+    chol = np.linalg.cholesky(model['corr'] + 1e-9 * np.eye(n_vars))
+    p = model['persistence']
+
+    # Komponen tetap per wilayah + komponen tahunan, keduanya berkorelasi antar variabel
+    z_region = rng.standard_normal((n_regions, 1, n_vars)) @ chol.T
+    z_year = rng.standard_normal((n_regions, n_years, n_vars)) @ chol.T
+    u = ndtr(np.sqrt(p) * z_region + np.sqrt(1 - p) * z_year).reshape(-1, n_vars)
+
+    names, is_kota = region_names(start, stop)
+    chunk = pd.DataFrame({
+        'Tahun': np.tile(years, n_regions),
+        'Kabupaten/Kota': np.repeat(names, n_years),
+        'is_kota': np.repeat(is_kota, n_years),
+    })
+    for i, v in enumerate(VARIABLES):
+        chunk[v] = quantile_transform(u[:, i], model['marginals'][v]).round(DECIMALS[v])
+    chunk['kasus_dbd'] = chunk['kasus_dbd'].astype(np.int64)
+    chunk['jumlah_meninggal'] = rng.binomial(chunk['kasus_dbd'].to_numpy(), model['cfr'])
+    return chunk
+
+
+def iter_chunks(model, n_regions, years, chunk_regions=DEFAULT_CHUNK_REGIONS, seed=42):
+    """Hasilkan data sintetis per potongan wilayah (memori tetap kecil untuk jumlah wilayah besar)"""
+    rng = np.random.default_rng(seed)
+    years = np.asarray(years)
+    for start in range(0, n_regions, chunk_regions):
+        yield sample_chunk(model, start, min(start + chunk_regions, n_regions), years, rng)
+
+
+# ============================================================================
+# SKEMA SUMBER MENTAH
+# ============================================================================
+def to_source(chunk, name, model, n_regions, rng):
+    """Ubah potongan sintetis menjadi baris dengan skema CSV sumber `name`"""
+    base = chunk['Kabupaten/Kota']
+    kota = chunk['is_kota']
+    if name == 'dbd':
+        return pd.DataFrame({
+            'tahun_data': chunk['Tahun'],
+            'kab_kota': np.where(kota, 'Kota ' + base, 'Kab.' + base),
+            'jumlah': chunk['kasus_dbd'],
+            'jumlah_meninggal': chunk['jumlah_meninggal'],
+        })
+    if name == 'hujan':
+        return pd.DataFrame({
+            'Tahun': chunk['Tahun'],
+            'Kabupaten/Kota': np.where(kota, 'Kota ' + base, 'Kab. ' + base),
+            'jumlah (mm)': chunk['curah_hujan_mm'].astype(np.int64),
+        })
+    if name == 'sampah':
+        return pd.DataFrame({
+            'tahun_data': chunk['Tahun'],
+            'kab_kota': np.where(kota, 'Kota ' + base, 'Kab. ' + base),
+            'indikator': 'Timbulan Sampah',
+            'jumlah': chunk['timbulan_sampah_ton'].astype(np.int64),
+            'satuan': 'Ton',
+        })
+    if name == 'hari_hujan':
+        # Kolom nilai berlabel '2019 (Hari)' untuk semua tahun, seperti file sumber
+        return pd.DataFrame({
+            'Tahun': chunk['Tahun'],
+            'Kabupaten/Kota': np.where(kota, 'Kota ' + base, 'Kab. ' + base),
+            '2019 (Hari)': chunk['hari_hujan'].astype(np.int64),
+        })
+
+    # Penduduk & sanitasi: kabupaten tanpa awalan, kota dengan awalan 'Kota '
+    area = np.where(kota, 'Kota ' + base, base)
+    if name == 'penduduk':
+        extra = model.get('extra', {})
+        n = len(chunk)
+        sample = {col: rng.choice(values, n) if len(values) else np.full(n, np.nan) for col, values in extra.items()}
+        total_ribu = model['mean_penduduk_ribu'] * n_regions
+        return pd.DataFrame({
+            'Tahun': chunk['Tahun'],
+            'Kabupaten/Kota': area,
+            'Jumlah Penduduk (Ribu)': chunk['penduduk_ribu'],
+            'Laju Pertumbuhan Penduduk per Tahun': sample.get('Laju Pertumbuhan Penduduk per Tahun', np.nan),
+            'Persentase Penduduk': (chunk['penduduk_ribu'] / total_ribu * 100).round(4),
+            'Kepadatan Penduduk per km persegi (Km2)': chunk['kepadatan_penduduk_km2'].astype(np.int64),
+            'Rasio Jenis Kelamin Penduduk': sample.get('Rasio Jenis Kelamin Penduduk', np.nan),
+        })
+    return pd.DataFrame({
+        'Tahun': chunk['Tahun'],
+        'Kabupaten/Kota': area,
+        'Rumah Tangga yang Memiliki Akses Terhadap Sanitasi Layak': chunk['akses_sanitasi_layak_persen'],
+    })
+
+
+def write_registry(out_dir, n_regions, chunk_regions=DEFAULT_CHUNK_REGIONS):
+    """Tulis registry wilayah sintetis (kode, nama, jenis) agar nama wilayah bisa dicocokkan pipeline"""
+    path = os.path.join(out_dir, REGISTRY_FILE)
+    for start in range(0, n_regions, chunk_regions):
+        names, is_kota = region_names(start, min(start + chunk_regions, n_regions))
+        pd.DataFrame({
+            'kode_wilayah': [f"S{name.split()[-1]}" for name in names],
+            'nama': names,
+            'jenis': np.where(is_kota, 'Kota', 'Kabupaten'),
+        }).to_csv(path + '.tmp', mode='w' if start == 0 else 'a', header=(start == 0), index=False)
+    os.replace(path + '.tmp', path)
+
+
+def write_centroids(model, out_dir, n_regions, chunk_regions=DEFAULT_CHUNK_REGIONS, seed=42):
+    """Tulis titik pusat wilayah sintetis (acak seragam dalam rentang titik pusat asli) untuk fitur spatial lag"""
+    path = os.path.join(out_dir, CENTROID_FILE)
+    rng = np.random.default_rng(seed + 2)
+    for start in range(0, n_regions, chunk_regions):
+        names, _ = region_names(start, min(start + chunk_regions, n_regions))
+        frame = pd.DataFrame({'kode_wilayah': [f"S{name.split()[-1]}" for name in names]})
+        for col, (low, high) in model['centroid_bounds'].items():
+            frame[col] = rng.uniform(low, high, len(names)).round(4)
+        frame.to_csv(path + '.tmp', mode='w' if start == 0 else 'a', header=(start == 0), index=False)
+    os.replace(path + '.tmp', path)
+
+
+def write_sources(model, out_dir, n_regions, years, chunk_regions=DEFAULT_CHUNK_REGIONS, seed=42):
+    """Tulis CSV sumber sintetis (lima sumber + hari hujan) secara streaming; kembalikan jumlah baris per file"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {name: os.path.join(out_dir, file) for name, file in SOURCE_FILES.items()}
+    rng = np.random.default_rng(seed + 1)
+    n_rows = 0
+
+    for i, chunk in enumerate(iter_chunks(model, n_regions, years, chunk_regions, seed)):
+        for name, path in paths.items():
+            to_source(chunk, name, model, n_regions, rng).to_csv(
+                path + '.tmp', mode='w' if i == 0 else 'a', header=(i == 0), index=False
+            )
+        n_rows += len(chunk)
+
+    for path in paths.values():
+        os.replace(path + '.tmp', path)
+    write_registry(out_dir, n_regions, chunk_regions)
+    write_centroids(model, out_dir, n_regions, chunk_regions, seed)
+    return n_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangkitkan CSV mentah DBD sintetis untuk uji beban")
+    parser.add_argument('--data-dir', default='.', help="Direktori CSV mentah asli (sumber distribusi)")
+    parser.add_argument('--out-dir', default='data_sintetis', help="Direktori output CSV sintetis")
+    parser.add_argument('--regions', type=int, default=500, help="Jumlah kabupaten/kota sintetis")
+    parser.add_argument('--years', type=int, default=10, help="Jumlah tahun")
+    parser.add_argument('--start-year', type=int, default=2019, help="Tahun pertama")
+    parser.add_argument('--chunk-regions', type=int, default=DEFAULT_CHUNK_REGIONS, help="Wilayah per potongan tulis")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    model = fit_from_sources(args.data_dir)
+    years = np.arange(args.start_year, args.start_year + args.years)
+    n_rows = write_sources(model, args.out_dir, args.regions, years, args.chunk_regions, args.seed)
+    print(f"Data sintetis: {args.regions} wilayah x {args.years} tahun = {n_rows} baris per sumber -> {args.out_dir}/")
+
+
+if __name__ == '__main__':
+    main()
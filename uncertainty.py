@@ -0,0 +1,39 @@
+"""
+Ketidakpastian prediksi IR dari sebaran prediksi antar pohon Random Forest.
+
+Seluruh wilayah diprediksi sekaligus sebagai matriks (n_pohon x n_wilayah);
+interval prediksi dan peluang melewati batas risiko (IR > 20, IR > 50)
+dihitung dari matriks yang sama dengan operasi vektor NumPy, tanpa loop
+Python atas `model.estimators_`.
+"""
+import numpy as np
+
+from risk import HIGH_RISK_THRESHOLD, MEDIUM_RISK_THRESHOLD
+
+INTERVAL = (5, 95)
+UNCERTAINTY_COLUMNS = ['pi_bawah', 'pi_atas', 'prob_di_atas_50', 'prob_di_atas_20']
+
+# Batas peluang untuk label "kemungkinan besar" / "borderline" / "kemungkinan kecil"
+LIKELY = 0.8
+UNLIKELY = 0.2
+
+
+def summarize_per_tree(per_tree, interval=INTERVAL):
+    """Rata-rata, interval persentil, dan peluang melewati batas risiko per kolom (wilayah)"""
+    lower, upper = np.percentile(per_tree, interval, axis=0)
+    return {
+        'pred_ir': per_tree.mean(axis=0),
+        'pi_bawah': lower,
+        'pi_atas': upper,
+        'prob_di_atas_50': (per_tree > HIGH_RISK_THRESHOLD).mean(axis=0),
+        'prob_di_atas_20': (per_tree > MEDIUM_RISK_THRESHOLD).mean(axis=0),
+    }
+
+
+def confidence_label(prob):
+    """Label keyakinan dari peluang melewati suatu batas"""
+    if prob >= LIKELY:
+        return "kemungkinan besar"
+    if prob <= UNLIKELY:
+        return "kemungkinan kecil"
+    return "borderline"